@@ -0,0 +1,232 @@
+"""
+Estado de sincronização por calendário (alvo).
+
+Uma instância pode alimentar vários Google Calendars (família, torcidas).
+O calendário principal continua nos campos do próprio Jogo
+(criado_no_calendario, google_event_id, data_iso_anterior); cada alvo
+adicional tem o seu estado em um banco SQLite separado dos dados do
+scraping (ALVOS_SQLITE_PATH, padrão data/alvos.db): um scraping não mexe
+nas marcações dos alvos e uma marcação não reescreve o cache.
+
+- Tabela `marcacoes` com chave (alvo, jogo_id), agrupada por alvo
+- Em memória, cada alvo tem um dict jogo_id -> Marcacao, carregado uma
+  vez; as consultas por alvo (pendentes, limpeza) filtram a fatia do
+  snapshot com esse dict, sem I/O
+- A marcação guarda o horário do jogo quando o evento foi criado: um
+  reagendamento (jogo_id mantido, app.identidade) aparece para cada alvo
+  até que ele atualize o próprio evento
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+import logging
+import sqlite3
+import threading
+
+from app.config import get_settings
+from app.models import Jogo
+from app.storage import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Caminho padrão do banco de marcações por alvo
+ALVOS_FILE = DATA_DIR / "alvos.db"
+
+_SQL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS marcacoes (
+        alvo TEXT NOT NULL,
+        jogo_id TEXT NOT NULL,
+        google_event_id TEXT,
+        data_iso TEXT,
+        PRIMARY KEY (alvo, jogo_id)
+    ) WITHOUT ROWID;
+"""
+
+_SQL_MARCAR = (
+    "INSERT INTO marcacoes (alvo, jogo_id, google_event_id, data_iso) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(alvo, jogo_id) DO UPDATE SET "
+    "google_event_id = excluded.google_event_id, data_iso = excluded.data_iso"
+)
+
+_SQL_DESMARCAR = "DELETE FROM marcacoes WHERE alvo = ? AND jogo_id = ?"
+
+
+class Marcacao(NamedTuple):
+    """Jogo no calendário de um alvo."""
+
+    google_event_id: Optional[str]
+    data_iso: Optional[str]  # horário do jogo quando o evento foi criado/atualizado
+
+
+def com_marcacao(jogo: Jogo, marcacao: Optional[Marcacao]) -> Jogo:
+    """Cópia do jogo com o estado de sincronização de um alvo."""
+    return jogo.model_copy(update=_campos(jogo, marcacao))
+
+
+def _campos(jogo: Jogo, marcacao: Optional[Marcacao]) -> Dict[str, Any]:
+    if marcacao is None:
+        return {"criado_no_calendario": False, "google_event_id": None, "data_iso_anterior": None}
+    return {
+        "criado_no_calendario": True,
+        "google_event_id": marcacao.google_event_id,
+        "data_iso_anterior": marcacao.data_iso if marcacao.data_iso != jogo.data_iso else None,
+    }
+
+
+class EstadoCalendario:
+    """
+    Estado de sincronização dos jogos em um calendário.
+
+    Sem marcações (alvo None), lê os campos do próprio Jogo: é o
+    calendário principal. Com marcações, é uma cópia do estado do alvo no
+    momento da consulta.
+    """
+
+    def __init__(self, alvo: Optional[str] = None, marcacoes: Optional[Dict[str, Marcacao]] = None):
+        self.alvo = alvo
+        self.marcacoes = marcacoes
+
+    @property
+    def principal(self) -> bool:
+        """Se é o calendário principal (estado nos campos do Jogo)."""
+        return self.marcacoes is None
+
+    def no_calendario(self, jogo: Jogo) -> bool:
+        """Se o jogo já tem evento neste calendário."""
+        if self.marcacoes is None:
+            return jogo.criado_no_calendario
+        return jogo.jogo_id in self.marcacoes
+
+    def evento(self, jogo: Jogo) -> Optional[str]:
+        """google_event_id do jogo neste calendário."""
+        if self.marcacoes is None:
+            return jogo.google_event_id
+        marcacao = self.marcacoes.get(jogo.jogo_id)
+        return marcacao.google_event_id if marcacao else None
+
+    def anterior(self, jogo: Jogo) -> Optional[str]:
+        """Horário que está no evento, se o jogo foi reagendado depois da marcação."""
+        if self.marcacoes is None:
+            return jogo.data_iso_anterior
+        return _campos(jogo, self.marcacoes.get(jogo.jogo_id))["data_iso_anterior"]
+
+    def campos(self, jogo: Jogo) -> Dict[str, Any]:
+        """Campos de sincronização do jogo neste calendário (para as respostas)."""
+        if self.marcacoes is None:
+            return {
+                "criado_no_calendario": jogo.criado_no_calendario,
+                "google_event_id": jogo.google_event_id,
+                "data_iso_anterior": jogo.data_iso_anterior,
+            }
+        return _campos(jogo, self.marcacoes.get(jogo.jogo_id))
+
+    def aplicar(self, jogo: Jogo) -> Jogo:
+        """O jogo com o estado deste calendário (o próprio jogo no principal)."""
+        if self.marcacoes is None:
+            return jogo
+        return com_marcacao(jogo, self.marcacoes.get(jogo.jogo_id))
+
+
+# Calendário principal (campos do Jogo)
+PRINCIPAL = EstadoCalendario()
+
+
+class RegistroAlvos:
+    """
+    Marcações dos calendários adicionais (SQLite + índice em memória).
+
+    O banco é aberto e carregado na primeira consulta a um alvo; quem só
+    usa o calendário principal não cria o arquivo. Faz I/O: nas rotas, é
+    chamado pelo pool de threads (app.execucao.executar_io).
+    """
+
+    def __init__(self, caminho: Path = ALVOS_FILE):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._alvos: Dict[str, Dict[str, Marcacao]] = {}
+
+    def _abrir(self):
+        if self._conn is not None:
+            return
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.caminho), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SQL_SCHEMA)
+        total = 0
+        for alvo, jogo_id, google_event_id, data_iso in conn.execute(
+            "SELECT alvo, jogo_id, google_event_id, data_iso FROM marcacoes ORDER BY alvo"
+        ):
+            self._alvos.setdefault(alvo, {})[jogo_id] = Marcacao(google_event_id, data_iso)
+            total += 1
+        self._conn = conn
+        logger.info(f"📅 {total} marcação(ões) de {len(self._alvos)} calendário(s) carregada(s)")
+
+    def estado(self, alvo: Optional[str]) -> EstadoCalendario:
+        """
+        Estado de sincronização de um alvo.
+
+        Args:
+            alvo: ID do alvo (None ou vazio = calendário principal)
+
+        Returns:
+            EstadoCalendario com uma cópia das marcações do alvo
+        """
+        if not alvo:
+            return PRINCIPAL
+        with self._lock:
+            self._abrir()
+            return EstadoCalendario(alvo, dict(self._alvos.get(alvo, {})))
+
+    def estados(self, alvos: Iterable[Optional[str]]) -> Dict[Optional[str], EstadoCalendario]:
+        """Estado de cada alvo (consultas em lote)."""
+        return {alvo: self.estado(alvo) for alvo in set(alvos)}
+
+    def aplicar(self, alvo: str, alteracoes: Dict[str, Optional[Marcacao]]) -> Dict[str, Optional[Marcacao]]:
+        """
+        Marca/desmarca jogos de um alvo em uma transação.
+
+        Args:
+            alvo: ID do alvo
+            alteracoes: jogo_id -> nova marcação (None = desmarcar)
+
+        Returns:
+            jogo_id -> marcação anterior (None se o jogo não estava marcado)
+        """
+        with self._lock:
+            self._abrir()
+            marcacoes = self._alvos.get(alvo, {})
+            anteriores = {jogo_id: marcacoes.get(jogo_id) for jogo_id in alteracoes}
+            marcar = [
+                (alvo, jogo_id, m.google_event_id, m.data_iso)
+                for jogo_id, m in alteracoes.items() if m is not None
+            ]
+            desmarcar = [(alvo, jogo_id) for jogo_id, m in alteracoes.items() if m is None]
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(_SQL_MARCAR, marcar)
+                self._conn.executemany(_SQL_DESMARCAR, desmarcar)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            for jogo_id, marcacao in alteracoes.items():
+                if marcacao is None:
+                    marcacoes.pop(jogo_id, None)
+                else:
+                    marcacoes[jogo_id] = marcacao
+            if marcacoes:
+                self._alvos[alvo] = marcacoes
+            else:
+                self._alvos.pop(alvo, None)
+            return anteriores
+
+
+@lru_cache()
+def get_registro_alvos() -> RegistroAlvos:
+    """Retorna o registro de marcações por alvo (ALVOS_SQLITE_PATH)."""
+    caminho = get_settings().alvos_sqlite_path
+    return RegistroAlvos(Path(caminho) if caminho else ALVOS_FILE)
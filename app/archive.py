@@ -0,0 +1,339 @@
+"""
+Histórico de jogos por temporada.
+
+O cache de jogos é substituído a cada scraping; o histórico guarda todos
+os jogos já vistos (com o estado de sincronização do calendário), para
+dashboards com várias temporadas.
+
+Formato em disco (data/historico/):
+- <ano>.ndjson: temporada compactada, um jogo por linha, ordenada por data
+- <ano>.log.ndjson: registros novos/alterados, só com append
+
+O log é incorporado ao arquivo compactado quando passa de um limite de
+linhas. Cada temporada é um arquivo separado e fica em memória enquanto
+não muda, então consultas da temporada atual não dependem do tamanho do
+histórico.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import heapq
+import json
+import logging
+import os
+import threading
+
+from app.config import get_settings
+from app.fuso_horario import localizar
+from app.models import Jogo
+from app.storage import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Diretório do histórico
+ARCHIVE_DIR = DATA_DIR / "historico"
+
+# Linhas no log de uma temporada antes de compactar
+LIMITE_LOG_COMPACTACAO = 200
+
+
+class _Temporada:
+    """Conteúdo de uma temporada em memória."""
+
+    def __init__(self, registros: Dict[str, Dict[str, Any]], assinatura: Tuple):
+        self.registros = registros
+        self.assinatura = assinatura
+        self.ordenados = sorted(registros.values(), key=_chave_ordenacao)
+        self.chaves = [_chave_ordenacao(r) for r in self.ordenados]
+        self.linhas_log = 0
+
+
+def _chave_ordenacao(registro: Dict[str, Any]) -> Tuple[int, str]:
+    return registro["inicio_epoch"], registro["jogo_id"]
+
+
+def codificar_cursor(registro: Dict[str, Any]) -> str:
+    """Cursor de paginação: posição após o registro informado."""
+    return f"{registro['inicio_epoch']}_{registro['jogo_id']}"
+
+
+def decodificar_cursor(cursor: str) -> Tuple[int, str]:
+    """
+    Decodifica um cursor de paginação.
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    epoch, _, jogo_id = cursor.partition("_")
+    if not jogo_id:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return int(epoch), jogo_id
+
+
+class ArquivoHistorico:
+    """Histórico append-only de jogos, compactado por temporada."""
+
+    def __init__(self, diretorio: Path = ARCHIVE_DIR, retencao_temporadas: int = 0):
+        self.diretorio = diretorio
+        self.retencao_temporadas = retencao_temporadas
+        self._lock = threading.Lock()
+        self._temporadas: Dict[int, _Temporada] = {}
+
+    def _arquivo(self, ano: int) -> Path:
+        return self.diretorio / f"{ano}.ndjson"
+
+    def _arquivo_log(self, ano: int) -> Path:
+        return self.diretorio / f"{ano}.log.ndjson"
+
+    @staticmethod
+    def _ler_linhas(caminho: Path) -> Iterable[Dict[str, Any]]:
+        if not caminho.exists():
+            return
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                if linha.strip():
+                    yield json.loads(linha)
+
+    def _assinatura(self, ano: int) -> Tuple:
+        assinatura = []
+        for caminho in (self._arquivo(ano), self._arquivo_log(ano)):
+            try:
+                stat = caminho.stat()
+                assinatura.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                assinatura.append(None)
+        return tuple(assinatura)
+
+    def _temporada(self, ano: int) -> _Temporada:
+        """Carrega a temporada (reutiliza a versão em memória se os arquivos não mudaram)."""
+        assinatura = self._assinatura(ano)
+        temporada = self._temporadas.get(ano)
+        if temporada is not None and temporada.assinatura == assinatura:
+            return temporada
+
+        registros: Dict[str, Dict[str, Any]] = {}
+        for registro in self._ler_linhas(self._arquivo(ano)):
+            registros[registro["jogo_id"]] = registro
+        linhas_log = 0
+        for registro in self._ler_linhas(self._arquivo_log(ano)):
+            registros[registro["jogo_id"]] = registro
+            linhas_log += 1
+
+        temporada = _Temporada(registros, assinatura)
+        temporada.linhas_log = linhas_log
+        self._temporadas[ano] = temporada
+        return temporada
+
+    def _compactar(self, ano: int):
+        """Reescreve a temporada ordenada e descarta o log."""
+        temporada = self._temporada(ano)
+        temporario = self._arquivo(ano).with_suffix(".tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            for registro in temporada.ordenados:
+                f.write(json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(temporario, self._arquivo(ano))
+        self._arquivo_log(ano).unlink(missing_ok=True)
+        logger.info(f"🗜️ Histórico {ano} compactado: {len(temporada.ordenados)} jogos")
+
+    def arquivar(self, jogos: Iterable[Jogo]) -> int:
+        """
+        Registra jogos no histórico (só grava os novos ou alterados).
+
+        Args:
+            jogos: Jogos a arquivar; jogos sem data são ignorados
+
+        Returns:
+            Quantidade de registros gravados
+        """
+        por_temporada: Dict[int, List[Dict[str, Any]]] = {}
+        for jogo in jogos:
+            if jogo.inicio is None:
+                continue
+            registro = jogo.model_dump()
+            registro["inicio_epoch"] = jogo.inicio_epoch
+            por_temporada.setdefault(jogo.inicio.year, []).append(registro)
+
+        if not por_temporada:
+            return 0
+
+        gravados = 0
+        with self._lock:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            for ano, registros in por_temporada.items():
+                temporada = self._temporada(ano)
+                novos = [r for r in registros if temporada.registros.get(r["jogo_id"]) != r]
+                if not novos:
+                    continue
+                with open(self._arquivo_log(ano), "a", encoding="utf-8") as f:
+                    for registro in novos:
+                        f.write(json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n")
+                gravados += len(novos)
+                if temporada.linhas_log + len(novos) >= LIMITE_LOG_COMPACTACAO:
+                    self._compactar(ano)
+            self._aplicar_retencao()
+
+        if gravados:
+            logger.info(f"📚 Histórico: {gravados} registro(s) gravado(s)")
+        return gravados
+
+    def _aplicar_retencao(self):
+        """Remove temporadas mais antigas que a retenção configurada."""
+        if self.retencao_temporadas <= 0:
+            return
+        limite = datetime.now().year - self.retencao_temporadas + 1
+        for ano in self._anos():
+            if ano < limite:
+                self._arquivo(ano).unlink(missing_ok=True)
+                self._arquivo_log(ano).unlink(missing_ok=True)
+                self._temporadas.pop(ano, None)
+                logger.info(f"🗑️ Histórico {ano} removido (retenção de {self.retencao_temporadas} temporadas)")
+
+    def _anos(self) -> List[int]:
+        if not self.diretorio.exists():
+            return []
+        anos = set()
+        for caminho in self.diretorio.glob("*.ndjson"):
+            prefixo = caminho.name.split(".")[0]
+            if prefixo.isdigit():
+                anos.add(int(prefixo))
+        return sorted(anos)
+
+    def temporadas(self) -> List[Dict[str, Any]]:
+        """
+        Lista as temporadas do histórico.
+
+        Returns:
+            Lista de dicts com ano e total de jogos
+        """
+        with self._lock:
+            return [
+                {"temporada": ano, "total_jogos": len(self._temporada(ano).ordenados)}
+                for ano in self._anos()
+            ]
+
+    def consultar(
+        self,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        temporada: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limite: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Consulta o histórico por temporada e/ou intervalo de datas, paginado.
+
+        Args:
+            inicio: Data inicial (inclusiva; sem fuso = horário de São Paulo)
+            fim: Data final (exclusiva; sem fuso = horário de São Paulo)
+            temporada: Ano da temporada
+            cursor: Cursor retornado pela página anterior
+            limite: Máximo de jogos na página
+
+        Returns:
+            Tupla (registros da página, cursor da próxima página ou None)
+
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        apos = decodificar_cursor(cursor) if cursor else None
+        inicio_epoch = int(localizar(inicio).timestamp()) if inicio else None
+        fim_epoch = int(localizar(fim).timestamp()) if fim else None
+
+        with self._lock:
+            anos = self._anos()
+            if temporada is not None:
+                anos = [ano for ano in anos if ano == temporada]
+            if inicio:
+                anos = [ano for ano in anos if ano >= inicio.year]
+            if fim:
+                anos = [ano for ano in anos if ano <= fim.year]
+
+            pagina: List[Dict[str, Any]] = []
+            for ano in anos:
+                temporada_atual = self._temporada(ano)
+                chaves = temporada_atual.chaves
+                posicao = 0
+                if inicio_epoch is not None:
+                    posicao = bisect_left(chaves, (inicio_epoch, ""))
+                if apos is not None:
+                    posicao = max(posicao, bisect_right(chaves, apos))
+                for registro in temporada_atual.ordenados[posicao:]:
+                    if fim_epoch is not None and registro["inicio_epoch"] >= fim_epoch:
+                        break
+                    if len(pagina) == limite:
+                        return pagina, codificar_cursor(pagina[-1])
+                    pagina.append(registro)
+
+        return pagina, None
+
+    def iterar(
+        self,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre o histórico em ordem de data lendo direto dos arquivos.
+
+        Diferente de `consultar`, não carrega as temporadas em memória: o
+        arquivo compactado (já ordenado) é lido linha a linha e intercalado
+        com o log (limitado a LIMITE_LOG_COMPACTACAO linhas), então a
+        memória não cresce com o tamanho do histórico. Usado na exportação.
+
+        Args:
+            inicio: Data inicial (inclusiva; sem fuso = horário de São Paulo)
+            fim: Data final (exclusiva; sem fuso = horário de São Paulo)
+
+        Yields:
+            Registros do histórico
+        """
+        inicio_epoch = int(localizar(inicio).timestamp()) if inicio else None
+        fim_epoch = int(localizar(fim).timestamp()) if fim else None
+
+        with self._lock:
+            anos = self._anos()
+        if inicio:
+            anos = [ano for ano in anos if ano >= localizar(inicio).year]
+        if fim:
+            anos = [ano for ano in anos if ano <= localizar(fim).year]
+
+        for ano in anos:
+            # O log é lido antes do compactado: se uma compactação acontecer
+            # no meio, os registros do log continuam valendo sobre o arquivo novo
+            recentes: Dict[str, Dict[str, Any]] = {}
+            for registro in self._ler_linhas_tolerante(self._arquivo_log(ano)):
+                recentes[registro["jogo_id"]] = registro
+            do_log = sorted(recentes.values(), key=_chave_ordenacao)
+            compactados = (
+                r for r in self._ler_linhas_tolerante(self._arquivo(ano))
+                if r["jogo_id"] not in recentes
+            )
+            for registro in heapq.merge(compactados, do_log, key=_chave_ordenacao):
+                if inicio_epoch is not None and registro["inicio_epoch"] < inicio_epoch:
+                    continue
+                if fim_epoch is not None and registro["inicio_epoch"] >= fim_epoch:
+                    break
+                yield registro
+
+    @classmethod
+    def _ler_linhas_tolerante(cls, caminho: Path) -> Iterator[Dict[str, Any]]:
+        """Como _ler_linhas, ignorando uma linha incompleta (append em andamento)."""
+        try:
+            for registro in cls._ler_linhas(caminho):
+                yield registro
+        except json.JSONDecodeError:
+            return
+
+
+def registro_para_jogo(registro: Dict[str, Any]) -> Jogo:
+    """Converte um registro do histórico em Jogo."""
+    dados = {k: v for k, v in registro.items() if k != "inicio_epoch"}
+    return Jogo(**dados)
+
+
+@lru_cache()
+def get_historico() -> ArquivoHistorico:
+    """Retorna o histórico configurado (HISTORICO_RETENCAO_TEMPORADAS)."""
+    settings = get_settings()
+    return ArquivoHistorico(retencao_temporadas=settings.historico_retencao_temporadas)
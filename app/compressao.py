@@ -0,0 +1,115 @@
+"""
+Compressão negociada (gzip/brotli) das respostas pré-renderizadas.
+
+Os corpos das listagens são os mesmos bytes enquanto o cache não muda,
+então a versão comprimida é calculada uma vez por corpo e codificação e
+reutilizada nas requisições seguintes. Brotli é opcional: só é oferecido
+se o pacote `brotli` estiver instalado.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import gzip
+import threading
+
+from fastapi import Request
+
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Codificações suportadas, em ordem de preferência
+CODIFICACOES = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Máximo de corpos comprimidos em memória (LRU)
+MAX_VARIANTES = 128
+
+_variantes: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def negociar(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Escolhe a codificação a partir do header Accept-Encoding.
+
+    Args:
+        accept_encoding: Valor do header (ex: "gzip, deflate, br")
+
+    Returns:
+        "br", "gzip" ou None (sem compressão)
+    """
+    if not accept_encoding or not get_settings().compressao_ativa:
+        return None
+
+    aceitas: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        qualidade = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                qualidade = float(parametros[2:])
+            except ValueError:
+                qualidade = 0.0
+        aceitas[nome.strip().lower()] = qualidade
+
+    curinga = aceitas.get("*", 0.0)
+    for codificacao in CODIFICACOES:
+        if aceitas.get(codificacao, curinga) > 0:
+            return codificacao
+    return None
+
+
+async def codificacao_aceita(request: Request) -> Optional[str]:
+    """Dependência: codificação negociada para a requisição atual."""
+    return negociar(request.headers.get("accept-encoding"))
+
+
+def deve_comprimir(corpo: bytes) -> bool:
+    """Indica se o corpo é grande o suficiente para valer a compressão."""
+    return len(corpo) >= get_settings().compressao_min_bytes
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    """
+    Retorna o corpo comprimido, calculando só na primeira vez.
+
+    A chave é o próprio objeto bytes: o hash de um bytes fica guardado no
+    objeto, então para corpos pré-renderizados a busca não percorre o
+    conteúdo de novo.
+
+    Args:
+        corpo: Bytes da resposta
+        codificacao: "br" ou "gzip"
+
+    Returns:
+        Bytes comprimidos
+    """
+    chave = (codificacao, corpo)
+    with _lock:
+        comprimido = _variantes.get(chave)
+        if comprimido is not None:
+            _variantes.move_to_end(chave)
+            return comprimido
+
+    if codificacao == "br":
+        comprimido = brotli.compress(corpo, quality=11)
+    else:
+        # mtime=0: mesma entrada gera os mesmos bytes
+        comprimido = gzip.compress(corpo, compresslevel=9, mtime=0)
+
+    with _lock:
+        _variantes[chave] = comprimido
+        while len(_variantes) > MAX_VARIANTES:
+            _variantes.popitem(last=False)
+    return comprimido
+
+
+def aquecer(corpo: Optional[bytes]):
+    """Comprime um corpo em todas as codificações suportadas (usado no aquecimento)."""
+    if corpo is None or not get_settings().compressao_ativa or not deve_comprimir(corpo):
+        return
+    for codificacao in CODIFICACOES:
+        comprimir(corpo, codificacao)
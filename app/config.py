@@ -13,9 +13,11 @@ class Settings(BaseSettings):
     firecrawl_api_keys: str = ""  # Múltiplas keys separadas por vírgula
     firecrawl_max_retries: int = 3
     firecrawl_retry_delay: int = 5  # segundos
+    firecrawl_creditos_por_scrape: int = 87  # custo aproximado de um scraping
     
     # API Security
     api_key: str = ""
+    ics_token: str = ""  # Token do feed .ics (vazio = feed desativado; nunca a API_KEY)
     
     # Rate Limiting
     rate_limit_requests: int = 30  # requisições
@@ -30,6 +32,70 @@ class Settings(BaseSettings):
     # SPFC
     spfc_calendario_url: str = "https://www.saopaulofc.net/calendario-de-jogos/"
     
+    # Armazenamento: "json" (cache_jogos.json), "binario" (cache_jogos.bin) ou "sqlite"
+    storage_backend: str = "json"
+    sqlite_path: str = ""  # Vazio = data/jogos.db
+    
+    # Política de atualização do cache: "rodada" ou "ultimo_jogo"
+    refresh_politica: str = "rodada"
+    refresh_horas_antes_jogo: float = 6  # atualiza na janela de N horas antes de cada jogo
+    refresh_idade_maxima_horas: float = 168  # idade máxima dos dados (0 = sem limite)
+    refresh_orcamento_creditos: int = 1000  # créditos por período para atualizações opcionais (0 = sem limite)
+    refresh_periodo_dias: int = 30
+    
+    # Controle do force_refresh (protege os créditos de clientes em loop)
+    force_refresh_intervalo_minimo: float = 300  # segundos entre force_refresh admitidos
+    force_refresh_creditos_dia: int = 435  # créditos em 24h para force_refresh (0 = sem limite)
+    force_refresh_por_chamador_dia: int = 3  # force_refresh por IP em 24h (0 = sem limite)
+    trusted_proxies: str = ""  # IPs/redes dos proxies cujos headers de IP valem para a cota (separados por vírgula)
+    
+    # Reagendamentos: jogo com mesmo adversário e competição a até N dias mantém o jogo_id
+    reagendamento_janela_dias: int = 10
+    
+    # Calendários adicionais (?alvo=): marcações por alvo em um SQLite próprio
+    alvos_sqlite_path: str = ""  # Vazio = data/alvos.db
+    
+    # Persistência das marcações no calendário: "atrasada" (write-behind) ou "imediata"
+    persistencia_modo: str = "atrasada"
+    persistencia_janela: float = 0.5  # segundos para agrupar marcações em uma escrita
+
+    # Leituras/gravações do cache fora do event loop (pool de threads limitado)
+    io_threads: int = 4
+
+    # Logging (escrito por uma thread; "json" ou "texto")
+    log_formato: str = "json"
+    log_nivel: str = "INFO"
+    log_niveis: str = ""  # Nível por módulo: app.scraper.cache=WARNING,uvicorn.access=WARNING
+    log_max_caracteres: int = 2000  # Mensagens maiores são truncadas
+    log_payload_max_caracteres: int = 1000  # Payloads (resultado do Firecrawl) maiores são truncados
+    log_payload_amostragem: int = 10  # Payload em 1 de cada N registros (1 = todos, 0 = nunca)
+    log_fila_max: int = 10000  # Registros na fila; excedentes são descartados
+
+    # Monitor de travamentos do event loop
+    monitor_loop_ativo: bool = True
+    monitor_loop_limite_ms: float = 200  # travamentos acima disso são registrados
+
+    # Compressão (gzip/brotli) das respostas grandes
+    compressao_ativa: bool = True
+    compressao_min_bytes: int = 1024  # Respostas menores não são comprimidas
+    
+    # Webhooks de mudanças (assinaturas em data/webhooks.json)
+    webhooks_ativo: bool = True
+    webhooks_max_tentativas: int = 5
+    webhooks_timeout: int = 10  # segundos por tentativa
+    webhooks_janela_lote: float = 2.0  # segundos para agrupar eventos em um lote
+    webhooks_espera_shutdown: float = 3.0  # segundos aguardando entregas no shutdown (o resto é descartado)
+    
+    # Proxy dos escudos dos adversários (arquivos em data/logos)
+    logos_proxy_ativo: bool = True
+    logos_url_base: str = ""  # URL pública da API nos links reescritos (vazio = caminho relativo)
+    logos_timeout: int = 10  # segundos por download
+    logos_max_bytes: int = 2_000_000  # escudos maiores são recusados
+    
+    # Histórico de temporadas
+    historico_ativo: bool = True
+    historico_retencao_temporadas: int = 0  # 0 = manter todas
+    
     @property
     def firecrawl_api_key_list(self) -> List[str]:
         """Retorna lista de API keys do Firecrawl."""
@@ -0,0 +1,105 @@
+"""
+Consultas sobre o snapshot de jogos.
+
+Os jogos do snapshot já estão ordenados por data, então os filtros por
+período são feitos com bisect (sem parsear datas a cada requisição).
+Cada consulta retorna a fatia (início, fim) do snapshot, que também serve
+de chave para as respostas pré-renderizadas.
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from app.fuso_horario import agora as agora_sp, localizar
+from app.models import Jogo
+from app.snapshot import Snapshot
+
+# Um jogo é considerado "passado" para limpeza do calendário 5h após o início
+HORAS_PARA_LIMPEZA = 5
+
+
+def fatia_futuros(snapshot: Snapshot, agora: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Fatia com os jogos que ainda não começaram.
+
+    Args:
+        snapshot: Snapshot de jogos
+        agora: Datetime de referência (opcional, útil para testes)
+
+    Returns:
+        Tupla (início, fim) de posições em snapshot.jogos
+    """
+    agora = localizar(agora) if agora else agora_sp()
+    return snapshot.indice_apos(agora), snapshot.total_datados
+
+
+def fatia_semana(snapshot: Snapshot, semanas: int = 1, agora: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Fatia com os jogos das próximas N semanas.
+
+    Args:
+        snapshot: Snapshot de jogos
+        semanas: Número de semanas a considerar
+        agora: Datetime de referência (opcional, útil para testes)
+
+    Returns:
+        Tupla (início, fim) de posições em snapshot.jogos
+    """
+    agora = localizar(agora) if agora else agora_sp()
+    return snapshot.intervalo(agora, agora + timedelta(weeks=semanas))
+
+
+def fatia_passados_limpeza(snapshot: Snapshot, agora: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Fatia com os jogos que já passaram o suficiente para sair do calendário.
+
+    Args:
+        snapshot: Snapshot de jogos
+        agora: Datetime de referência (opcional, útil para testes)
+
+    Returns:
+        Tupla (início, fim) de posições em snapshot.jogos
+    """
+    agora = localizar(agora) if agora else agora_sp()
+    return 0, bisect_left(snapshot.inicios, agora - timedelta(hours=HORAS_PARA_LIMPEZA))
+
+
+def jogos_da_fatia(
+    snapshot: Snapshot,
+    fatia: Tuple[int, int],
+    apenas_pendentes: bool = False,
+    apenas_no_calendario: bool = False,
+) -> List[Jogo]:
+    """
+    Retorna os jogos de uma fatia, com filtro opcional de sincronização.
+
+    Args:
+        snapshot: Snapshot de jogos
+        fatia: Tupla (início, fim)
+        apenas_pendentes: Apenas jogos ainda não criados no calendário
+        apenas_no_calendario: Apenas jogos já criados no calendário
+
+    Returns:
+        Lista de jogos
+    """
+    jogos = snapshot.jogos[fatia[0]:fatia[1]]
+    if apenas_pendentes:
+        jogos = [j for j in jogos if not j.criado_no_calendario]
+    if apenas_no_calendario:
+        jogos = [j for j in jogos if j.criado_no_calendario]
+    return jogos
+
+
+def proximo_jogo(snapshot: Snapshot, agora: Optional[datetime] = None) -> Optional[Jogo]:
+    """
+    Retorna o próximo jogo que ainda não começou.
+
+    Args:
+        snapshot: Snapshot de jogos
+        agora: Datetime de referência (opcional, útil para testes)
+
+    Returns:
+        Próximo jogo ou None
+    """
+    inicio, fim = fatia_futuros(snapshot, agora)
+    return snapshot.jogos[inicio] if inicio < fim else None
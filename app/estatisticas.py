@@ -0,0 +1,269 @@
+"""
+Estatísticas materializadas dos jogos.
+
+Os agregados (jogos por competição e por mês, mando de campo, cobertura
+de sincronização com o Google Calendar e próximo jogo de cada competição)
+são mantidos incrementalmente: quando um snapshot novo é carregado, só as
+diferenças em relação ao anterior são aplicadas, e cada marcação no
+calendário ajusta os contadores do jogo alterado. A leitura não percorre
+a lista de jogos: o corpo da resposta fica pronto até a próxima mudança
+(dados ou início de um "próximo jogo").
+"""
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import math
+import threading
+
+from app.fuso_horario import agora as agora_sp, localizar
+from app.models import Jogo
+from app.rendering import serializar_json
+from app.snapshot import Snapshot
+
+# Chave em Snapshot.materializados
+CHAVE = "estatisticas"
+
+MANDO = {True: "casa", False: "fora", None: "indefinido"}
+
+
+class _Contribuicao(NamedTuple):
+    """O que um jogo soma aos contadores (permite desfazer sem o objeto Jogo)."""
+
+    competicao: str
+    mes: Optional[str]
+    mandante: Optional[bool]
+    no_calendario: bool
+    inicio_epoch: Optional[int]
+
+
+def _contribuicao(jogo: Jogo) -> _Contribuicao:
+    return _Contribuicao(
+        competicao=jogo.competicao,
+        mes=jogo.inicio.strftime("%Y-%m") if jogo.inicio else None,
+        mandante=jogo.mandante,
+        no_calendario=jogo.criado_no_calendario,
+        inicio_epoch=jogo.inicio_epoch,
+    )
+
+
+def _proporcao(parte: int, total: int) -> Optional[float]:
+    return round(parte / total, 4) if total else None
+
+
+class Estatisticas:
+    """
+    Agregados dos jogos, atualizados por diferença.
+
+    Atributos:
+        versao: Número da versão dos agregados (muda a cada alteração)
+    """
+
+    def __init__(self):
+        self.versao = 0
+        self._lock = threading.Lock()
+        self._contados: Dict[str, _Contribuicao] = {}
+        self._mando: Counter = Counter()
+        self._meses: Counter = Counter()
+        self._no_calendario = 0
+        self._competicoes: Dict[str, Dict[str, Counter]] = {}
+        # competição -> [(inicio_epoch, jogo_id)] ordenado (próximo jogo por bisect)
+        self._agenda: Dict[str, List[Tuple[int, str]]] = {}
+        # ((versão, versão do snapshot), válido de, válido até (epoch), bytes)
+        self._corpo: Optional[Tuple[Tuple[int, int], float, float, bytes]] = None
+
+    def _somar(self, jogo_id: str, item: _Contribuicao, sinal: int):
+        competicao = self._competicoes.setdefault(
+            item.competicao, {"totais": Counter(), "por_mes": Counter()}
+        )
+        competicao["totais"]["total"] += sinal
+        competicao["totais"][MANDO[item.mandante]] += sinal
+        self._mando[MANDO[item.mandante]] += sinal
+        if item.no_calendario:
+            competicao["totais"]["no_calendario"] += sinal
+            self._no_calendario += sinal
+        if item.mes:
+            competicao["por_mes"][item.mes] += sinal
+            self._meses[item.mes] += sinal
+        if item.inicio_epoch is not None:
+            agenda = self._agenda.setdefault(item.competicao, [])
+            if sinal > 0:
+                insort(agenda, (item.inicio_epoch, jogo_id))
+            else:
+                agenda.remove((item.inicio_epoch, jogo_id))
+
+        if competicao["totais"]["total"] == 0:
+            del self._competicoes[item.competicao]
+            self._agenda.pop(item.competicao, None)
+        # Counter aceita zeros; remove para não listar meses vazios
+        for contador in (competicao["por_mes"], self._meses):
+            if item.mes and contador[item.mes] == 0:
+                del contador[item.mes]
+
+    def sincronizar(self, snapshot: Snapshot) -> int:
+        """
+        Aplica as diferenças entre os jogos já contados e os do snapshot.
+
+        Args:
+            snapshot: Snapshot novo (ou alterado)
+
+        Returns:
+            Quantidade de jogos adicionados, removidos ou alterados
+        """
+        with self._lock:
+            alterados = 0
+            for jogo_id in [i for i in self._contados if i not in snapshot.por_id]:
+                self._somar(jogo_id, self._contados.pop(jogo_id), -1)
+                alterados += 1
+            for jogo_id, jogo in snapshot.por_id.items():
+                anterior = self._contados.get(jogo_id)
+                # Reagendamentos mantêm o jogo_id: compara também início e dados do confronto
+                if (
+                    anterior is not None
+                    and anterior.no_calendario == jogo.criado_no_calendario
+                    and anterior.inicio_epoch == jogo.inicio_epoch
+                    and anterior.competicao == jogo.competicao
+                    and anterior.mandante == jogo.mandante
+                ):
+                    continue
+                if anterior is not None:
+                    self._somar(jogo_id, anterior, -1)
+                item = _contribuicao(jogo)
+                self._somar(jogo_id, item, +1)
+                self._contados[jogo_id] = item
+                alterados += 1
+            if alterados:
+                self.versao += 1
+            return alterados
+
+    def registrar_calendario(self, jogo: Jogo):
+        """Ajusta a cobertura do calendário após marcar/desmarcar um jogo."""
+        with self._lock:
+            anterior = self._contados.get(jogo.jogo_id)
+            if anterior is None or anterior.no_calendario == jogo.criado_no_calendario:
+                return
+            self._somar(jogo.jogo_id, anterior, -1)
+            item = anterior._replace(no_calendario=jogo.criado_no_calendario)
+            self._somar(jogo.jogo_id, item, +1)
+            self._contados[jogo.jogo_id] = item
+            self.versao += 1
+
+    def _por_competicao(self, snapshot: Snapshot, momento: float) -> Tuple[list, float]:
+        """
+        Agregados por competição com o próximo jogo de cada uma.
+
+        Returns:
+            Tupla (lista por competição, epoch em que algum próximo jogo começa)
+        """
+        valido_ate = float("inf")
+        competicoes = []
+        # (k,) <= (k, jogo_id): primeiro jogo com inicio_epoch > momento
+        primeiro_futuro = (math.floor(momento) + 1,)
+        for nome, contadores in sorted(self._competicoes.items()):
+            totais = contadores["totais"]
+            agenda = self._agenda.get(nome, [])
+            posicao = bisect_left(agenda, primeiro_futuro)
+            proximo = None
+            if posicao < len(agenda):
+                inicio_epoch, jogo_id = agenda[posicao]
+                valido_ate = min(valido_ate, inicio_epoch)
+                proximo = snapshot.obter(jogo_id)
+            competicoes.append({
+                "competicao": nome,
+                "total": totais["total"],
+                "casa": totais["casa"],
+                "fora": totais["fora"],
+                "indefinido": totais["indefinido"],
+                "no_calendario": totais["no_calendario"],
+                "por_mes": dict(sorted(contadores["por_mes"].items())),
+                "proximo_jogo": proximo.model_dump(mode="json") if proximo else None,
+            })
+        return competicoes, valido_ate
+
+    def _montar(self, snapshot: Snapshot, momento: float) -> Tuple[dict, float]:
+        total = len(self._contados)
+        casa, fora = self._mando["casa"], self._mando["fora"]
+        competicoes, valido_ate = self._por_competicao(snapshot, momento)
+        return {
+            "sucesso": True,
+            "total_jogos": total,
+            "sem_data": total - sum(self._meses.values()),
+            "mando": {
+                "casa": casa,
+                "fora": fora,
+                "indefinido": self._mando["indefinido"],
+                "proporcao_casa": _proporcao(casa, casa + fora),
+            },
+            "calendario": {
+                "sincronizados": self._no_calendario,
+                "pendentes": total - self._no_calendario,
+                "cobertura": _proporcao(self._no_calendario, total),
+            },
+            "por_mes": dict(sorted(self._meses.items())),
+            "por_competicao": competicoes,
+            "atualizado_em": snapshot.ultima_atualizacao.isoformat(),
+        }, valido_ate
+
+    def corpo(self, snapshot: Snapshot, agora: Optional[datetime] = None) -> bytes:
+        """
+        Corpo JSON de GET /api/estatisticas.
+
+        Os bytes são reaproveitados enquanto os agregados não mudarem e
+        nenhum "próximo jogo" tiver começado.
+
+        Args:
+            snapshot: Snapshot atual (para montar o próximo jogo de cada competição)
+            agora: Datetime de referência (opcional, útil para testes)
+
+        Returns:
+            JSON com totais, mando de campo, cobertura do calendário,
+            jogos por mês e por competição
+        """
+        momento = (localizar(agora) if agora else agora_sp()).timestamp()
+        with self._lock:
+            chave = (self.versao, snapshot.versao)
+            pronto = self._corpo
+            if pronto is not None and pronto[0] == chave and pronto[1] <= momento < pronto[2]:
+                return pronto[3]
+            resumo, valido_ate = self._montar(snapshot, momento)
+            corpo = serializar_json(resumo)
+            self._corpo = (chave, momento, valido_ate, corpo)
+            return corpo
+
+
+def materializar(snapshot: Snapshot, anterior: Optional[Snapshot] = None) -> Estatisticas:
+    """
+    Materializa as estatísticas de um snapshot.
+
+    Se o snapshot anterior já tinha estatísticas, elas são transferidas e
+    só as diferenças são aplicadas (o snapshot anterior deixa de ser o atual).
+
+    Args:
+        snapshot: Snapshot novo
+        anterior: Snapshot substituído (opcional)
+
+    Returns:
+        Estatísticas do snapshot
+    """
+    estatisticas = snapshot.materializados.get(CHAVE)
+    if estatisticas is None:
+        herdadas = anterior.materializados.pop(CHAVE, None) if anterior is not None else None
+        estatisticas = herdadas or Estatisticas()
+        snapshot.materializados[CHAVE] = estatisticas
+    estatisticas.sincronizar(snapshot)
+    return estatisticas
+
+
+def obter_estatisticas(snapshot: Snapshot) -> Estatisticas:
+    """Estatísticas do snapshot (materializadas se ainda não existirem)."""
+    estatisticas = snapshot.materializados.get(CHAVE)
+    if estatisticas is None:
+        estatisticas = materializar(snapshot)
+    return estatisticas
+
+
+def registrar_calendario(snapshot: Snapshot, jogo: Jogo):
+    """Ajusta as estatísticas do snapshot após uma mudança no calendário."""
+    estatisticas = snapshot.materializados.get(CHAVE)
+    if estatisticas is not None:
+        estatisticas.registrar_calendario(jogo)
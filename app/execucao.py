@@ -0,0 +1,262 @@
+"""
+Execução de I/O fora do event loop e monitor de travamentos do loop.
+
+Leituras e gravações do cache (stat, carga, gravação atômica, limpeza)
+rodam em um pool de threads limitado (IO_THREADS): um volume lento atrasa
+só a requisição que depende do arquivo, não todas as requisições
+simultâneas. O limite evita que um disco travado acumule threads.
+
+O monitor mede o atraso do event loop com um batimento periódico. Quando
+o loop fica parado além de MONITOR_LOOP_LIMITE_MS, uma thread de vigia
+captura a pilha da thread do loop enquanto o travamento acontece; o
+registro (duração, handler da rota e linha que bloqueou) fica disponível
+em GET /api/diagnostico/loop.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+import asyncio
+import contextvars
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Intervalo do batimento do monitor (segundos)
+INTERVALO_BATIMENTO = 0.1
+
+# Travamentos guardados para o diagnóstico
+MAX_REGISTROS = 50
+
+# Frames deste diretório identificam o código da aplicação na pilha
+_DIRETORIO_APP = str(Path(__file__).resolve().parent)
+_DIRETORIO_ROTAS = str(Path(__file__).resolve().parent / "routes")
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_em_andamento = 0
+_executadas = 0
+
+
+def _obter_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=max(1, get_settings().io_threads),
+                thread_name_prefix="cache-io",
+            )
+        return _pool
+
+
+def _contabilizar(funcao: Callable[..., T]) -> T:
+    global _em_andamento, _executadas
+    with _pool_lock:
+        _em_andamento += 1
+    try:
+        return funcao()
+    finally:
+        with _pool_lock:
+            _em_andamento -= 1
+            _executadas += 1
+
+
+async def executar_io(funcao: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função de I/O síncrona no pool de threads do cache.
+
+    Como asyncio.to_thread, mas com número limitado de threads (IO_THREADS);
+    chamadas além do limite esperam na fila do pool.
+
+    Args:
+        funcao: Função síncrona (leitura/gravação de arquivo)
+        *args, **kwargs: Argumentos da função
+
+    Returns:
+        O retorno da função
+    """
+    loop = asyncio.get_running_loop()
+    chamada = partial(contextvars.copy_context().run, funcao, *args, **kwargs)
+    return await loop.run_in_executor(_obter_pool(), _contabilizar, chamada)
+
+
+def encerrar_pool():
+    """Aguarda as operações em andamento e encerra o pool (shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _descrever(frame: traceback.FrameSummary) -> str:
+    arquivo = Path(frame.filename)
+    try:
+        arquivo = arquivo.relative_to(Path(_DIRETORIO_APP).parent)
+    except ValueError:
+        # Bibliotecas: só pacote/arquivo
+        arquivo = Path(*arquivo.parts[-2:])
+    return f"{arquivo.as_posix()}:{frame.lineno} ({frame.name})"
+
+
+def _resumir_pilha(frame) -> Dict[str, Any]:
+    """
+    Resume a pilha da thread do loop no momento do travamento.
+
+    Returns:
+        Dict com o handler (função da rota mais externa), a origem (linha
+        mais interna do código da aplicação) e os últimos frames
+    """
+    pilha = traceback.extract_stack(frame)
+    da_app = [f for f in pilha if f.filename.startswith(_DIRETORIO_APP)]
+    rotas = [f for f in da_app if f.filename.startswith(_DIRETORIO_ROTAS)]
+    handler = (rotas or da_app or pilha[-1:])[0]
+    origem = (da_app or pilha)[-1]
+    return {
+        "handler": f"{Path(handler.filename).stem}.{handler.name}",
+        "origem": _descrever(origem),
+        "pilha": [_descrever(f) for f in pilha[-8:]],
+    }
+
+
+class MonitorLoop:
+    """
+    Detecta travamentos do event loop.
+
+    Uma tarefa no loop registra um batimento a cada INTERVALO_BATIMENTO;
+    o atraso de cada batimento é o tempo em que o loop ficou bloqueado.
+    Uma thread de vigia percebe o batimento atrasado e guarda a pilha da
+    thread do loop enquanto ele ainda está bloqueado (depois seria tarde:
+    o handler culpado já terminou).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._registros: Deque[Dict[str, Any]] = deque(maxlen=MAX_REGISTROS)
+        self._batida = time.monotonic()
+        self._pilha: Optional[Dict[str, Any]] = None
+        self._thread_loop: Optional[int] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._vigia: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self.travamentos = 0
+        self.maior_ms = 0.0
+
+    @property
+    def limite(self) -> float:
+        """Atraso mínimo (segundos) para registrar um travamento."""
+        return get_settings().monitor_loop_limite_ms / 1000
+
+    def iniciar(self):
+        """Inicia o batimento e a thread de vigia (chamado no lifespan)."""
+        if not get_settings().monitor_loop_ativo or self._tarefa is not None:
+            return
+        self._thread_loop = threading.get_ident()
+        self._batida = time.monotonic()
+        self._parar.clear()
+        self._tarefa = asyncio.create_task(self._batimento())
+        self._vigia = threading.Thread(target=self._vigiar, name="monitor-loop", daemon=True)
+        self._vigia.start()
+
+    async def parar(self):
+        """Encerra o batimento e a thread de vigia."""
+        if self._tarefa is None:
+            return
+        self._parar.set()
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+        self._vigia.join(timeout=1)
+        self._vigia = None
+
+    async def _batimento(self):
+        while True:
+            esperado = time.monotonic() + INTERVALO_BATIMENTO
+            await asyncio.sleep(INTERVALO_BATIMENTO)
+            agora = time.monotonic()
+            self._batida = agora
+            atraso = agora - esperado
+            with self._lock:
+                pilha, self._pilha = self._pilha, None
+            if atraso >= self.limite:
+                self._registrar(atraso, pilha)
+
+    def _vigiar(self):
+        while not self._parar.wait(INTERVALO_BATIMENTO):
+            parado = time.monotonic() - self._batida - INTERVALO_BATIMENTO
+            if parado < self.limite:
+                continue
+            with self._lock:
+                if self._pilha is not None:
+                    continue
+            frame = sys._current_frames().get(self._thread_loop)
+            if frame is not None:
+                pilha = _resumir_pilha(frame)
+                with self._lock:
+                    self._pilha = pilha
+
+    def _registrar(self, atraso: float, pilha: Optional[Dict[str, Any]]):
+        duracao_ms = round(atraso * 1000, 1)
+        registro = {
+            "momento": datetime.now().isoformat(),
+            "duracao_ms": duracao_ms,
+            "handler": pilha["handler"] if pilha else None,
+            "origem": pilha["origem"] if pilha else None,
+            "pilha": pilha["pilha"] if pilha else [],
+        }
+        with self._lock:
+            self._registros.append(registro)
+            self.travamentos += 1
+            self.maior_ms = max(self.maior_ms, duracao_ms)
+        if pilha:
+            logger.warning(
+                f"🐢 Event loop travado por {duracao_ms:.0f}ms em {pilha['handler']} ({pilha['origem']})"
+            )
+        else:
+            logger.warning(f"🐢 Event loop travado por {duracao_ms:.0f}ms")
+
+    def relatorio(self) -> Dict[str, Any]:
+        """
+        Retorna os travamentos registrados e o estado do pool de I/O.
+
+        Returns:
+            Dict com limite, total de travamentos, maior duração,
+            travamentos recentes (mais novo primeiro) e uso do pool
+        """
+        settings = get_settings()
+        with self._lock:
+            recentes: List[Dict[str, Any]] = list(reversed(self._registros))
+            travamentos, maior_ms = self.travamentos, self.maior_ms
+        with _pool_lock:
+            pool = {
+                "threads": max(1, settings.io_threads),
+                "em_andamento": _em_andamento,
+                "executadas": _executadas,
+            }
+        return {
+            "ativo": self._tarefa is not None,
+            "limite_ms": settings.monitor_loop_limite_ms,
+            "travamentos": travamentos,
+            "maior_ms": maior_ms,
+            "recentes": recentes,
+            "pool_io": pool,
+        }
+
+
+@lru_cache()
+def get_monitor_loop() -> MonitorLoop:
+    """Retorna o monitor de travamentos do event loop."""
+    return MonitorLoop()
@@ -0,0 +1,112 @@
+"""
+Exportação dos jogos em NDJSON ou CSV, em streaming.
+
+Os jogos são lidos um a um (do snapshot ou direto dos arquivos do
+histórico) e escritos em blocos, sem montar a resposta inteira em
+memória: o consumo de memória não depende de quantos jogos existem.
+
+Os escudos saem com a URL original do site nas duas fontes (o histórico
+guarda a original): um arquivo exportado não depende do proxy de logos.
+"""
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+import csv
+import io
+
+from app.archive import get_historico
+from app.fuso_horario import localizar
+from app.rendering import CAMPOS_JOGO, serializar_json
+from app.snapshot import Snapshot
+
+FORMATOS = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Jogos por bloco enviado ao cliente
+JOGOS_POR_BLOCO = 200
+
+# Sem a reescrita dos escudos para /api/logos (igual ao histórico)
+CONTEXTO_EXPORTACAO = {"logos_originais": True}
+
+
+def _projetar(registro: Dict[str, Any]) -> Dict[str, Any]:
+    """Mesmos campos (e ordem) das listagens, para cache e histórico."""
+    return {campo: registro.get(campo) for campo in CAMPOS_JOGO}
+
+
+def jogos_do_snapshot(
+    snapshot: Snapshot,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre os jogos do snapshot no intervalo [inicio, fim).
+
+    Jogos sem data só entram quando não há filtro de datas.
+    """
+    inicios = snapshot.inicios
+    primeiro = bisect_left(inicios, localizar(inicio)) if inicio else 0
+    ultimo = bisect_left(inicios, localizar(fim)) if fim else len(inicios)
+    for posicao in range(primeiro, ultimo):
+        yield snapshot.jogos[posicao].model_dump(mode="json", context=CONTEXTO_EXPORTACAO)
+    if inicio is None and fim is None:
+        for jogo in snapshot.jogos[len(inicios):]:
+            yield jogo.model_dump(mode="json", context=CONTEXTO_EXPORTACAO)
+
+
+def jogos_do_historico(
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Percorre todos os jogos do histórico no intervalo [inicio, fim), lendo dos arquivos."""
+    return get_historico().iterar(inicio=inicio, fim=fim)
+
+
+def _ndjson(registros: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    bloco = []
+    for registro in registros:
+        bloco.append(serializar_json(_projetar(registro)))
+        if len(bloco) == JOGOS_POR_BLOCO:
+            yield b"\n".join(bloco) + b"\n"
+            bloco = []
+    if bloco:
+        yield b"\n".join(bloco) + b"\n"
+
+
+def _csv(registros: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\r\n")
+    escritor.writerow(CAMPOS_JOGO)
+    pendentes = 0
+    for registro in registros:
+        escritor.writerow(["" if valor is None else valor for valor in _projetar(registro).values()])
+        pendentes += 1
+        if pendentes == JOGOS_POR_BLOCO:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pendentes = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def exportar(registros: Iterable[Dict[str, Any]], formato: str) -> Iterator[bytes]:
+    """
+    Serializa os jogos no formato pedido, em blocos.
+
+    Args:
+        registros: Jogos (dicts) a exportar
+        formato: "ndjson" ou "csv"
+
+    Returns:
+        Iterador de blocos de bytes
+
+    Raises:
+        ValueError: Se o formato não for suportado
+    """
+    if formato == "ndjson":
+        return _ndjson(registros)
+    if formato == "csv":
+        return _csv(registros)
+    raise ValueError(f"Formato inválido: {formato}. Use: {', '.join(FORMATOS)}")
@@ -0,0 +1,74 @@
+"""
+Fuso horário dos jogos (America/Sao_Paulo).
+
+Os horários do site são horários de Brasília. Todas as comparações de
+data usam instantes com fuso, então o resultado não depende do fuso do
+servidor (o container normalmente roda em UTC).
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+FUSO_SP = ZoneInfo("America/Sao_Paulo")
+
+# Duração estimada de um jogo (quando não há data de fim)
+DURACAO_JOGO = timedelta(hours=2)
+
+
+def agora() -> datetime:
+    """Momento atual no fuso de São Paulo."""
+    return datetime.now(FUSO_SP)
+
+
+def localizar(momento: datetime) -> datetime:
+    """
+    Converte um datetime para o fuso de São Paulo.
+
+    Datetimes sem fuso são interpretados como horário de São Paulo.
+    """
+    if momento.tzinfo is None:
+        return momento.replace(tzinfo=FUSO_SP)
+    return momento.astimezone(FUSO_SP)
+
+
+def parse_iso(valor: Optional[str]) -> Optional[datetime]:
+    """
+    Converte uma string ISO 8601 em datetime no fuso de São Paulo.
+
+    Returns:
+        datetime com fuso ou None se vazio/inválido
+    """
+    if not valor:
+        return None
+    try:
+        return localizar(datetime.fromisoformat(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_data_horario(data: Optional[str], horario: Optional[str]) -> Optional[datetime]:
+    """
+    Converte data DD/MM/YYYY e horário HH:MM (ou HHhMM) em datetime com fuso.
+
+    Se o horário não puder ser lido, usa meia-noite.
+
+    Returns:
+        datetime com fuso ou None se a data for inválida
+    """
+    if not data:
+        return None
+    partes = data.strip().split("/")
+    if len(partes) != 3:
+        return None
+    hora = minuto = 0
+    if horario:
+        try:
+            h_parts = horario.strip().replace("h", ":").replace("H", ":").split(":")
+            hora = int(h_parts[0])
+            minuto = int(h_parts[1]) if len(h_parts) > 1 and h_parts[1] else 0
+        except ValueError:
+            hora = minuto = 0
+    try:
+        return datetime(int(partes[2]), int(partes[1]), int(partes[0]), hora, minuto, tzinfo=FUSO_SP)
+    except ValueError:
+        return None
@@ -0,0 +1,134 @@
+"""
+Geração do feed iCalendar (.ics) dos jogos.
+
+O feed é gerado a partir do snapshot e fica em memória até a versão do
+cache mudar; assinantes recebem os mesmos bytes (e o mesmo ETag) até lá.
+"""
+from datetime import datetime, timezone
+from typing import List, Tuple
+import hashlib
+
+from app.indices import normalizar_texto
+from app.models import Jogo
+from app.snapshot import Snapshot
+
+# Domínio usado nos UIDs dos eventos (UID estável por jogo_id)
+UID_DOMINIO = "api-spfc"
+
+# Intervalo sugerido aos clientes para buscar o feed de novo
+INTERVALO_ATUALIZACAO = "PT6H"
+
+
+def _escapar(texto: str) -> str:
+    """Escapa texto conforme a RFC 5545."""
+    return (
+        texto.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _dobrar(linha: str) -> str:
+    """Quebra linhas com mais de 75 octetos (RFC 5545, seção 3.1)."""
+    dados = linha.encode("utf-8")
+    if len(dados) <= 75:
+        return linha
+    partes = []
+    atual = b""
+    limite = 75
+    for caractere in linha:
+        codificado = caractere.encode("utf-8")
+        if len(atual) + len(codificado) > limite:
+            partes.append(atual.decode("utf-8"))
+            atual = b""
+            limite = 74  # linhas de continuação começam com um espaço
+        atual += codificado
+    partes.append(atual.decode("utf-8"))
+    return "\r\n ".join(partes)
+
+
+def _formatar_utc(momento: datetime) -> str:
+    return momento.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _evento(jogo: Jogo, dtstamp: str) -> List[str]:
+    if jogo.inicio is None:
+        return []
+
+    if jogo.mandante is False:
+        resumo = f"{jogo.adversario} x São Paulo"
+    else:
+        resumo = f"São Paulo x {jogo.adversario}"
+
+    linhas = [
+        "BEGIN:VEVENT",
+        f"UID:{jogo.jogo_id}@{UID_DOMINIO}",
+        f"DTSTAMP:{dtstamp}",
+        f"DTSTART:{_formatar_utc(jogo.inicio)}",
+        f"DTEND:{_formatar_utc(jogo.fim)}",
+    ]
+    linhas.append(f"SUMMARY:{_escapar(resumo)}")
+    if jogo.local:
+        linhas.append(f"LOCATION:{_escapar(jogo.local)}")
+    linhas.append(f"DESCRIPTION:{_escapar(jogo.competicao)}")
+    linhas.append(f"CATEGORIES:{_escapar(jogo.competicao)}")
+    linhas.append("END:VEVENT")
+    return linhas
+
+
+def gerar_ics(jogos: List[Jogo], atualizado_em: datetime) -> bytes:
+    """
+    Gera o conteúdo .ics para uma lista de jogos.
+
+    Args:
+        jogos: Jogos a incluir (jogos sem data_iso são ignorados)
+        atualizado_em: Momento da última atualização dos dados (DTSTAMP)
+
+    Returns:
+        Bytes do calendário (UTF-8, linhas CRLF)
+    """
+    dtstamp = _formatar_utc(atualizado_em)
+    linhas = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//API Calendario SPFC//PT-BR",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:Jogos do São Paulo FC",
+        "X-WR-TIMEZONE:America/Sao_Paulo",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{INTERVALO_ATUALIZACAO}",
+        f"X-PUBLISHED-TTL:{INTERVALO_ATUALIZACAO}",
+    ]
+    for jogo in jogos:
+        linhas.extend(_evento(jogo, dtstamp))
+    linhas.append("END:VCALENDAR")
+    return ("\r\n".join(_dobrar(linha) for linha in linhas) + "\r\n").encode("utf-8")
+
+
+def feed_ics(snapshot: Snapshot, competicoes: Tuple[str, ...] = ()) -> Tuple[bytes, str]:
+    """
+    Retorna o feed .ics do snapshot (gerado uma vez por versão e filtro).
+
+    Args:
+        snapshot: Snapshot de jogos
+        competicoes: Filtros de competição (trecho do nome, sem diferenciar acentos)
+
+    Returns:
+        Tupla (bytes do feed, ETag fraco: o mesmo para as variantes gzip/br)
+    """
+    filtros = tuple(sorted({normalizar_texto(c) for c in competicoes if c.strip()}))
+
+    def gerar() -> Tuple[bytes, str]:
+        jogos = snapshot.jogos
+        if filtros:
+            jogos = [
+                jogo for jogo in jogos
+                if any(filtro in normalizar_texto(jogo.competicao) for filtro in filtros)
+            ]
+        conteudo = gerar_ics(jogos, snapshot.ultima_atualizacao)
+        etag = 'W/"' + hashlib.sha1(conteudo).hexdigest() + '"'
+        return conteudo, etag
+
+    return snapshot.resposta(("ics", filtros), gerar)
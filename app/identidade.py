@@ -0,0 +1,161 @@
+"""
+Identidade estável dos jogos entre scrapings.
+
+O jogo_id de um jogo novo é o hash de data, horário, adversário e
+competição; quando o clube muda o horário, o hash muda. Para que o jogo
+continue o mesmo (com o estado do Google Calendar), cada scraping é casado
+com os jogos já conhecidos:
+
+1. Mesmos dados (mesma chave natural): o jogo não mudou
+2. Mesmo adversário e mesma competição (nomes normalizados) com início a
+   até REAGENDAMENTO_JANELA_DIAS do jogo conhecido: reagendamento. O jogo
+   novo herda o jogo_id e o estado do calendário, e `data_iso_anterior`
+   guarda o horário que está no evento do Calendar até a próxima marcação
+
+Com isso, um reagendamento vira uma atualização do evento existente (uma
+chamada à API do Google) em vez de remover um evento e criar outro.
+"""
+from datetime import timedelta
+from typing import Dict, Iterable, List, Set, Tuple
+import logging
+
+from app.indices import normalizar_texto
+from app.models import Jogo
+
+logger = logging.getLogger(__name__)
+
+# Palavras que não identificam o time ("São Paulo FC" = "São Paulo")
+PALAVRAS_IGNORADAS = {
+    "fc", "ec", "sc", "ac", "afc", "fbpa", "club", "clube", "esporte", "sport",
+    "futebol", "foot", "ball", "de", "do", "da", "dos", "das", "e",
+}
+
+# Nomes normalizados diferentes para o mesmo time
+APELIDOS = {
+    "atletico mineiro": "atletico mg",
+    "athletico paranaense": "athletico pr",
+    "atletico paranaense": "athletico pr",
+    "red bull bragantino": "bragantino",
+    "vasco gama": "vasco",
+    "gremio porto alegrense": "gremio",
+    "america mineiro": "america mg",
+    "corinthians paulista": "corinthians",
+}
+
+
+def _palavras(texto: str) -> List[str]:
+    normalizado = normalizar_texto(texto)
+    return "".join(c if c.isalnum() else " " for c in normalizado).split()
+
+
+def normalizar_time(nome: str) -> str:
+    """
+    Nome do time para comparação ("Atlético-MG" = "Clube Atlético Mineiro").
+
+    Remove acentos, pontuação e palavras genéricas (FC, Clube, de...) e
+    aplica os apelidos conhecidos.
+    """
+    palavras = _palavras(nome)
+    relevantes = [p for p in palavras if p not in PALAVRAS_IGNORADAS] or palavras
+    normalizado = " ".join(relevantes)
+    return APELIDOS.get(normalizado, normalizado)
+
+
+def normalizar_competicao(nome: str) -> str:
+    """Nome da competição para comparação (sem acentos e sem o ano)."""
+    return " ".join(p for p in _palavras(nome) if not (p.isdigit() and len(p) == 4))
+
+
+def _chave_confronto(jogo: Jogo) -> Tuple[str, str]:
+    return normalizar_time(jogo.adversario), normalizar_competicao(jogo.competicao)
+
+
+def _herdar(jogo: Jogo, conhecido: Jogo):
+    """Copia identidade e estado do calendário do jogo conhecido."""
+    jogo.jogo_id = conhecido.jogo_id
+    herdar_estado(jogo, conhecido)
+
+
+def herdar_estado(jogo: Jogo, conhecido: Jogo):
+    """
+    Copia o estado do calendário de outra cópia do mesmo jogo.
+
+    Usado também para reaplicar marcações ainda não gravadas em um
+    snapshot relido ou recém-extraído.
+    """
+    jogo.criado_no_calendario = conhecido.criado_no_calendario
+    jogo.google_event_id = conhecido.google_event_id
+    # Horário que está no evento do Calendar (o original, se houve
+    # reagendamentos seguidos sem marcação no meio)
+    no_calendario = conhecido.data_iso_anterior or conhecido.data_iso
+    jogo.data_iso_anterior = no_calendario if no_calendario != jogo.data_iso else None
+
+
+def reconciliar(jogos_novos: List[Jogo], conhecidos: Iterable[Jogo], janela: timedelta) -> int:
+    """
+    Casa os jogos de um scraping com os jogos conhecidos (altera `jogos_novos`).
+
+    Jogos casados herdam jogo_id, criado_no_calendario e google_event_id;
+    os demais ficam com o jogo_id calculado dos próprios dados.
+
+    Args:
+        jogos_novos: Jogos recém-extraídos
+        conhecidos: Jogos do cache anterior
+        janela: Distância máxima entre os inícios para considerar reagendamento
+
+    Returns:
+        Quantidade de jogos reagendados (casados por proximidade de data)
+    """
+    por_chave: Dict[str, Jogo] = {}
+    for conhecido in conhecidos:
+        por_chave.setdefault(conhecido.chave_natural, conhecido)
+
+    # 1. Jogos sem mudança
+    usados: Set[str] = set()
+    sem_par: List[Jogo] = []
+    for jogo in jogos_novos:
+        conhecido = por_chave.get(jogo.chave_natural)
+        if conhecido is not None and conhecido.jogo_id not in usados:
+            usados.add(conhecido.jogo_id)
+            _herdar(jogo, conhecido)
+        else:
+            sem_par.append(jogo)
+
+    # 2. Reagendamentos: pares mais próximos primeiro (jogos de ida e volta
+    # contra o mesmo time ficam cada um com o seu)
+    candidatos: Dict[Tuple[str, str], List[Jogo]] = {}
+    for conhecido in por_chave.values():
+        if conhecido.jogo_id not in usados and conhecido.inicio is not None:
+            candidatos.setdefault(_chave_confronto(conhecido), []).append(conhecido)
+
+    pares = []
+    for i, jogo in enumerate(sem_par):
+        if jogo.inicio is None:
+            continue
+        for conhecido in candidatos.get(_chave_confronto(jogo), ()):
+            distancia = abs(jogo.inicio - conhecido.inicio)
+            if distancia <= janela:
+                pares.append((distancia, i, conhecido))
+
+    ids_em_uso = {jogo.jogo_id for jogo in jogos_novos}
+    casados: Set[int] = set()
+    reagendados = 0
+    for _, i, conhecido in sorted(pares, key=lambda par: (par[0], par[1])):
+        jogo = sem_par[i]
+        if i in casados or conhecido.jogo_id in usados:
+            continue
+        # Outro jogo do scraping já tem esse id (nasceu no horário original)
+        if conhecido.jogo_id in ids_em_uso and conhecido.jogo_id != jogo.jogo_id:
+            continue
+        ids_em_uso.discard(jogo.jogo_id)
+        ids_em_uso.add(conhecido.jogo_id)
+        casados.add(i)
+        usados.add(conhecido.jogo_id)
+        _herdar(jogo, conhecido)
+        reagendados += 1
+        logger.info(
+            f"🔁 Jogo {conhecido.jogo_id} reagendado: {conhecido.data_iso} -> {jogo.data_iso} "
+            f"({jogo.adversario}, {jogo.competicao})"
+        )
+
+    return reagendados
@@ -0,0 +1,191 @@
+"""
+Índices invertidos do snapshot para buscas por competição, adversário e
+mando de campo.
+
+Os índices são montados uma vez por versão do cache (`Snapshot.derivado`)
+e guardam, para cada termo, a lista ordenada de posições em
+`snapshot.jogos`. Como as posições seguem a ordem de data, o filtro de
+período é uma busca binária na própria lista de posições: uma consulta
+custa proporcional ao resultado, não ao total de jogos.
+"""
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from heapq import merge
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import unicodedata
+
+from app.fuso_horario import FUSO_SP
+from app.snapshot import Snapshot
+
+# Limite de buscas por prefixo memorizadas por índice (termos vêm do cliente)
+MAX_BUSCAS = 256
+
+
+def normalizar_texto(texto: str) -> str:
+    """Remove acentos e normaliza caixa (para comparações)."""
+    sem_acento = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in sem_acento if not unicodedata.combining(c)).casefold().strip()
+
+
+def _tokens(texto: str) -> List[str]:
+    normalizado = normalizar_texto(texto)
+    return "".join(c if c.isalnum() else " " for c in normalizado).split()
+
+
+class Filtros(NamedTuple):
+    """Filtros de busca das listagens (hashable: faz parte da chave das respostas)."""
+
+    competicao: Optional[str] = None
+    adversario: Optional[str] = None
+    mandante: Optional[bool] = None
+    de: Optional[date] = None
+    ate: Optional[date] = None
+
+    @property
+    def ativos(self) -> bool:
+        return any(valor is not None for valor in self)
+
+
+def criar_filtros(
+    competicao: Optional[str] = None,
+    adversario: Optional[str] = None,
+    mandante: Optional[bool] = None,
+    de: Optional[date] = None,
+    ate: Optional[date] = None,
+) -> Filtros:
+    """
+    Normaliza os filtros (textos sem acento/caixa; vazio = sem filtro).
+
+    Raises:
+        ValueError: Se `de` for posterior a `ate`
+    """
+    if de and ate and de > ate:
+        raise ValueError("'de' deve ser anterior ou igual a 'ate'")
+    competicao = " ".join(_tokens(competicao)) if competicao else None
+    adversario = normalizar_texto(adversario) if adversario else None
+    return Filtros(competicao or None, adversario or None, mandante, de, ate)
+
+
+class _Termos:
+    """Termos normalizados ordenados -> posições (permite busca por prefixo)."""
+
+    def __init__(self, postings: Dict[str, List[int]]):
+        self.termos = sorted(postings)
+        self.postings = postings
+
+    def prefixo(self, prefixo: str) -> Iterable[List[int]]:
+        """Listas de posições dos termos que começam com `prefixo`."""
+        posicao = bisect_left(self.termos, prefixo)
+        while posicao < len(self.termos) and self.termos[posicao].startswith(prefixo):
+            yield self.postings[self.termos[posicao]]
+            posicao += 1
+
+
+class Indices:
+    """Índices invertidos de um snapshot."""
+
+    def __init__(self, snapshot: Snapshot):
+        competicao: Dict[str, List[int]] = {}
+        adversario: Dict[str, List[int]] = {}
+        self.mandante: Dict[Optional[bool], List[int]] = {True: [], False: [], None: []}
+        for posicao, jogo in enumerate(snapshot.jogos):
+            for token in set(_tokens(jogo.competicao)):
+                competicao.setdefault(token, []).append(posicao)
+            adversario.setdefault(normalizar_texto(jogo.adversario), []).append(posicao)
+            self.mandante[jogo.mandante].append(posicao)
+        self.competicao = _Termos(competicao)
+        self.adversario = _Termos(adversario)
+        self._buscas: Dict[Tuple[str, str], List[int]] = {}
+
+    def _prefixo(self, campo: str, prefixo: str) -> List[int]:
+        """Posições de todos os termos com o prefixo (calculado uma vez por busca)."""
+        chave = (campo, prefixo)
+        resultado = self._buscas.get(chave)
+        if resultado is not None:
+            return resultado
+        # Tokens diferentes do mesmo nome de competição repetem a posição
+        resultado = []
+        for posicao in merge(*getattr(self, campo).prefixo(prefixo)):
+            if not resultado or resultado[-1] != posicao:
+                resultado.append(posicao)
+        if len(self._buscas) >= MAX_BUSCAS:
+            self._buscas.clear()
+        self._buscas[chave] = resultado
+        return resultado
+
+    def candidatos(self, filtros: Filtros) -> List[List[int]]:
+        """
+        Listas de posições que satisfazem cada filtro de texto/mando.
+
+        Returns:
+            Uma lista ordenada de posições por filtro ativo
+        """
+        listas = []
+        if filtros.competicao:
+            # Cada palavra da busca é prefixo de alguma palavra da competição
+            for token in filtros.competicao.split():
+                listas.append(self._prefixo("competicao", token))
+        if filtros.adversario:
+            listas.append(self._prefixo("adversario", filtros.adversario))
+        if filtros.mandante is not None:
+            listas.append(self.mandante[filtros.mandante])
+        return listas
+
+
+def obter_indices(snapshot: Snapshot) -> Indices:
+    """Índices do snapshot (montados uma vez por versão)."""
+    return snapshot.derivado("indices", lambda: Indices(snapshot))
+
+
+def _fatia_datas(snapshot: Snapshot, filtros: Filtros) -> Tuple[int, int]:
+    """Posições dos jogos com data em [de, ate] (jogos sem data ficam de fora)."""
+    inicio = 0
+    fim = snapshot.total_datados
+    if filtros.de:
+        inicio = bisect_left(snapshot.inicios, datetime.combine(filtros.de, time.min, tzinfo=FUSO_SP))
+    if filtros.ate:
+        limite = datetime.combine(filtros.ate + timedelta(days=1), time.min, tzinfo=FUSO_SP)
+        fim = bisect_left(snapshot.inicios, limite)
+    return inicio, fim
+
+
+def filtrar_fatia(snapshot: Snapshot, fatia: Tuple[int, int], filtros: Filtros) -> List[int]:
+    """
+    Posições da fatia que satisfazem os filtros, em ordem de data.
+
+    A fatia é intersectada com o período (de/ate) e depois com a menor
+    lista de posições dos índices, recortada por busca binária; as demais
+    listas só são consultadas (também por busca binária) para os
+    candidatos restantes.
+
+    Args:
+        snapshot: Snapshot de jogos
+        fatia: Tupla (início, fim) de posições
+        filtros: Filtros da busca
+
+    Returns:
+        Lista ordenada de posições
+    """
+    inicio, fim = fatia
+    if filtros.de or filtros.ate:
+        datas = _fatia_datas(snapshot, filtros)
+        inicio, fim = max(inicio, datas[0]), min(fim, datas[1])
+    if inicio >= fim:
+        return []
+
+    listas = obter_indices(snapshot).candidatos(filtros)
+    if not listas:
+        return list(range(inicio, fim))
+
+    limites = [(lista, bisect_left(lista, inicio), bisect_left(lista, fim)) for lista in listas]
+    limites.sort(key=lambda item: item[2] - item[1])
+    menor, de, ate = limites[0]
+    return [
+        posicao for posicao in menor[de:ate]
+        if all(_contem(lista, posicao) for lista, _, _ in limites[1:])
+    ]
+
+
+def _contem(lista: List[int], posicao: int) -> bool:
+    indice = bisect_left(lista, posicao)
+    return indice < len(lista) and lista[indice] == posicao
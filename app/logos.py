@@ -0,0 +1,280 @@
+"""
+Cache local dos escudos dos adversários.
+
+O campo `adversario_logo` aponta para imagens hospedadas no site do clube;
+sem o proxy, cada widget/dashboard baixa os escudos de lá a cada
+renderização. Com o proxy ativo, as respostas da API trazem links para
+`/api/logos/{chave}` (a chave é derivada da URL original) e:
+
+- cada escudo é baixado uma única vez (requisições simultâneas aguardam o
+  mesmo download) e guardado em data/logos pelo hash do conteúdo
+- miniaturas (32, 64 e 128 px) são geradas sob demanda com o Pillow; se a
+  conversão falhar, a imagem original é servida
+- só formatos raster (PNG, JPEG, GIF, WebP): um SVG servido pela origem da
+  API poderia executar scripts, então é recusado e a rota redireciona para
+  a URL original
+- as respostas podem ser guardadas pelo navegador/CDN para sempre
+  (`Cache-Control: immutable`), pois o conteúdo de uma chave nunca muda
+
+Só são baixadas URLs que aparecem nos jogos (o proxy não busca URLs
+arbitrárias).
+"""
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+
+from app.config import get_settings
+from app.execucao import executar_io
+from app.storage import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Diretório dos escudos (volume Docker em /app/data)
+LOGOS_DIR = DATA_DIR / "logos"
+
+# Tamanhos das miniaturas (lado maior, em pixels)
+TAMANHOS = (32, 64, 128)
+
+# Assinaturas dos formatos aceitos (qualquer outro conteúdo, inclusive SVG, é recusado)
+ASSINATURAS = (
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+)
+
+# Tipos servidos pelo proxy (escudos antigos de outros tipos são baixados de novo)
+TIPOS_ACEITOS = frozenset(tipo for _, tipo, _ in ASSINATURAS) | {"image/webp"}
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Depois de uma falha, a URL só é tentada de novo após este intervalo
+ESPERA_APOS_FALHA = 300  # segundos
+
+
+class Logo(NamedTuple):
+    """Arquivo pronto para servir."""
+
+    caminho: Path
+    tipo: str
+    etag: str
+
+
+def chave_logo(url: str) -> str:
+    """Chave estável do escudo (hash da URL original)."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def url_proxy(url: Optional[str]) -> Optional[str]:
+    """
+    URL do escudo no proxy (a própria URL se o proxy estiver desligado).
+
+    Args:
+        url: URL original do escudo
+
+    Returns:
+        Link para /api/logos/{chave} ou a URL original
+    """
+    settings = get_settings()
+    if not url or not settings.logos_proxy_ativo or not url.startswith(("http://", "https://")):
+        return url
+    return f"{settings.logos_url_base.rstrip('/')}/api/logos/{chave_logo(url)}"
+
+
+def _detectar_tipo(conteudo: bytes) -> Optional[Tuple[str, str]]:
+    """(content-type, extensão) pelo conteúdo; None se não for uma imagem aceita."""
+    for assinatura, tipo, extensao in ASSINATURAS:
+        if conteudo.startswith(assinatura):
+            return tipo, extensao
+    if conteudo[:4] == b"RIFF" and conteudo[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    return None
+
+
+def _baixar(url: str, timeout: float, max_bytes: int) -> bytes:
+    """Download síncrono (executado no pool de I/O)."""
+    requisicao = urllib.request.Request(url, headers={"User-Agent": "API-SPFC-Logos"})
+    with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+        conteudo = resposta.read(max_bytes + 1)
+    if len(conteudo) > max_bytes:
+        raise ValueError(f"escudo maior que {max_bytes} bytes")
+    return conteudo
+
+
+def _miniatura(conteudo: bytes, tamanho: int) -> Optional[bytes]:
+    """
+    Reduz a imagem para caber em `tamanho` x `tamanho` (PNG).
+
+    Returns:
+        Bytes da miniatura, ou None se a conversão falhar (ou sem Pillow)
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(conteudo)) as imagem:
+            imagem.thumbnail((tamanho, tamanho))
+            if imagem.mode not in ("RGB", "RGBA"):
+                imagem = imagem.convert("RGBA")
+            saida = io.BytesIO()
+            imagem.save(saida, format="PNG", optimize=True)
+            return saida.getvalue()
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível gerar miniatura de {tamanho}px: {e}")
+        return None
+
+
+class CacheLogos:
+    """
+    Escudos guardados em disco pelo hash do conteúdo.
+
+    O índice (data/logos/indice.json) liga a chave de cada URL ao hash do
+    conteúdo baixado; escudos iguais em URLs diferentes ocupam um só arquivo.
+    """
+
+    def __init__(self, diretorio: Path = LOGOS_DIR):
+        self.diretorio = diretorio
+        self.caminho_indice = diretorio / "indice.json"
+        self._lock = threading.Lock()
+        self._indice: Optional[Dict[str, Dict[str, Any]]] = None
+        self._downloads: Dict[str, "asyncio.Future[Optional[Logo]]"] = {}
+        self._falhas: Dict[str, float] = {}
+
+    def _carregar(self) -> Dict[str, Dict[str, Any]]:
+        if self._indice is None:
+            try:
+                with open(self.caminho_indice, "r", encoding="utf-8") as f:
+                    self._indice = json.load(f).get("logos", {})
+            except FileNotFoundError:
+                self._indice = {}
+            except Exception as e:
+                logger.error(f"Erro ao ler índice de escudos: {e}")
+                self._indice = {}
+        return self._indice
+
+    def _salvar(self):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho_indice.with_suffix(".tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"logos": self._indice}, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho_indice)
+
+    def _gravar(self, nome: str, conteudo: bytes) -> Path:
+        caminho = self.diretorio / nome
+        if not caminho.exists():
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+            temporario.write_bytes(conteudo)
+            os.replace(temporario, caminho)
+        return caminho
+
+    def url_conhecida(self, chave: str) -> Optional[str]:
+        """URL original de um escudo já baixado."""
+        with self._lock:
+            registro = self._carregar().get(chave)
+        return registro["url"] if registro else None
+
+    def obter_local(self, chave: str, tamanho: Optional[int] = None) -> Optional[Logo]:
+        """
+        Escudo já baixado, no tamanho pedido (a miniatura é gerada na primeira vez).
+
+        Args:
+            chave: Chave do escudo
+            tamanho: Um de TAMANHOS, ou None para a imagem original
+
+        Returns:
+            Arquivo a servir ou None se o escudo ainda não foi baixado
+        """
+        with self._lock:
+            registro = self._carregar().get(chave)
+        if registro is None or registro["tipo"] not in TIPOS_ACEITOS:
+            return None
+        original = self.diretorio / f"{registro['hash']}{registro['extensao']}"
+        if not original.exists():
+            return None
+        if tamanho is None:
+            return Logo(original, registro["tipo"], registro["hash"])
+
+        etag = f"{registro['hash']}-{tamanho}"
+        miniatura = self.diretorio / f"{etag}.png"
+        if miniatura.exists():
+            return Logo(miniatura, "image/png", etag)
+        conteudo = _miniatura(original.read_bytes(), tamanho)
+        if conteudo is None:
+            return Logo(original, registro["tipo"], registro["hash"])
+        return Logo(self._gravar(miniatura.name, conteudo), "image/png", etag)
+
+    def _baixar_e_guardar(self, chave: str, url: str) -> Optional[Logo]:
+        """Baixa o escudo e registra no índice (executado no pool de I/O)."""
+        settings = get_settings()
+        try:
+            conteudo = _baixar(url, settings.logos_timeout, settings.logos_max_bytes)
+            detectado = _detectar_tipo(conteudo)
+            if detectado is None:
+                raise ValueError("conteúdo não é uma imagem suportada")
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao baixar escudo {url}: {e}")
+            self._falhas[chave] = time.monotonic()
+            return None
+
+        tipo, extensao = detectado
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+        self._gravar(f"{hash_conteudo}{extensao}", conteudo)
+        with self._lock:
+            self._carregar()[chave] = {
+                "url": url,
+                "hash": hash_conteudo,
+                "tipo": tipo,
+                "extensao": extensao,
+                "baixado_em": datetime.now().isoformat(),
+            }
+            self._salvar()
+        self._falhas.pop(chave, None)
+        logger.info(f"🖼️ Escudo {chave} guardado ({len(conteudo)} bytes, {tipo})")
+        return Logo(self.diretorio / f"{hash_conteudo}{extensao}", tipo, hash_conteudo)
+
+    async def obter(self, chave: str, url: str, tamanho: Optional[int] = None) -> Optional[Logo]:
+        """
+        Escudo no tamanho pedido, baixando-o na primeira vez.
+
+        Args:
+            chave: Chave do escudo (chave_logo(url))
+            url: URL original
+            tamanho: Um de TAMANHOS, ou None para a imagem original
+
+        Returns:
+            Arquivo a servir, ou None se o download falhou
+        """
+        logo = await executar_io(self.obter_local, chave, tamanho)
+        if logo is not None:
+            return logo
+
+        falha = self._falhas.get(chave)
+        if falha is not None and time.monotonic() - falha < ESPERA_APOS_FALHA:
+            return None
+
+        download = self._downloads.get(chave)
+        if download is None:
+            download = asyncio.ensure_future(executar_io(self._baixar_e_guardar, chave, url))
+            self._downloads[chave] = download
+            download.add_done_callback(lambda _: self._downloads.pop(chave, None))
+        if await asyncio.shield(download) is None:
+            return None
+        return await executar_io(self.obter_local, chave, tamanho)
+
+
+@lru_cache()
+def get_cache_logos() -> CacheLogos:
+    """Retorna o cache de escudos (arquivos em data/logos)."""
+    return CacheLogos()
@@ -0,0 +1,232 @@
+"""
+Logging assíncrono e estruturado.
+
+Os loggers da aplicação (e do uvicorn) só colocam o registro em uma fila;
+a formatação e a escrita no stdout são feitas por uma thread
+(QueueListener). Uma escrita lenta no stdout (pipe do Docker cheio, por
+exemplo) não trava os handlers das rotas; se a fila lotar, os registros
+excedentes são descartados e contados.
+
+- LOG_FORMATO: "json" (uma linha JSON por registro) ou "texto"
+- Mensagens longas são truncadas em LOG_MAX_CARACTERES
+- Payloads grandes (resultado do Firecrawl, dados extraídos) vão em
+  `extra={"payload": ...}`: são serializados na thread de escrita,
+  truncados em LOG_PAYLOAD_MAX_CARACTERES e registrados em 1 de cada
+  LOG_PAYLOAD_AMOSTRAGEM mensagens do mesmo ponto do código
+- LOG_NIVEIS ajusta o nível por módulo sem mudar o código, por exemplo
+  `app.scraper.cache=WARNING` desliga os logs de cada checagem do cache
+"""
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Loggers do uvicorn que têm handlers próprios (passam a usar a fila)
+LOGGERS_UVICORN = ("uvicorn", "uvicorn.access", "uvicorn.error")
+
+# Atributos de todo LogRecord (o resto veio de `extra`)
+_CAMPOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "taskName", "payload", "color_message",
+}
+
+_listener: Optional[QueueListener] = None
+
+
+def _truncar(texto: str, limite: int) -> str:
+    if limite <= 0 or len(texto) <= limite:
+        return texto
+    return f"{texto[:limite]}… (+{len(texto) - limite} caracteres)"
+
+
+def _serializar_payload(payload: Any) -> str:
+    """Texto do payload (JSON quando possível)."""
+    if hasattr(payload, "model_dump"):
+        try:
+            payload = payload.model_dump()
+        except Exception:
+            pass
+    try:
+        return json.dumps(payload, ensure_ascii=False, default=str)
+    except Exception:
+        return repr(payload)
+
+
+def parse_niveis(texto: str) -> Dict[str, int]:
+    """
+    Interpreta LOG_NIVEIS ("modulo=NIVEL,modulo=NIVEL").
+
+    Args:
+        texto: Pares separados por vírgula
+
+    Returns:
+        Dict nome do logger -> nível (pares inválidos são ignorados)
+    """
+    niveis: Dict[str, int] = {}
+    for par in texto.split(","):
+        nome, _, nivel = par.partition("=")
+        nome, nivel = nome.strip(), nivel.strip().upper()
+        if not nome or not nivel:
+            continue
+        valor = logging.getLevelName(nivel)
+        if isinstance(valor, int):
+            niveis[nome] = valor
+        else:
+            logger.warning(f"⚠️ Nível de log inválido em LOG_NIVEIS: {par.strip()}")
+    return niveis
+
+
+class HandlerFila(QueueHandler):
+    """
+    Coloca os registros na fila sem bloquear.
+
+    Só a mensagem é montada na thread que loga (os argumentos podem mudar
+    depois); payload e traceback são formatados pela thread de escrita.
+    """
+
+    def __init__(self, fila: "queue.Queue[logging.LogRecord]"):
+        super().__init__(fila)
+        self.descartados = 0
+        self._lock_descartados = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        with self._lock_descartados:
+            descartados, self.descartados = self.descartados, 0
+        if descartados:
+            record.logs_descartados = descartados
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_descartados:
+                self.descartados += 1 + descartados
+
+
+class FiltroPayload(logging.Filter):
+    """
+    Amostra e trunca o payload dos registros (executado na thread de escrita).
+
+    O payload é mantido em 1 de cada `amostragem` registros do mesmo ponto
+    do código (logger + linha); nos demais, só a mensagem é registrada.
+    """
+
+    def __init__(self, max_caracteres: int, amostragem: int):
+        super().__init__()
+        self.max_caracteres = max_caracteres
+        self.amostragem = amostragem
+        self._contagem: Dict[Tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "payload"):
+            return True
+        origem = (record.name, record.lineno)
+        vez = self._contagem.get(origem, 0)
+        self._contagem[origem] = vez + 1
+        if self.amostragem > 0 and vez % self.amostragem == 0:
+            record.payload_texto = _truncar(_serializar_payload(record.payload), self.max_caracteres)
+        else:
+            record.payload_omitido = True
+        del record.payload
+        return True
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro (campos de `extra` incluídos)."""
+
+    def __init__(self, max_caracteres: int):
+        super().__init__()
+        self.max_caracteres = max_caracteres
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados: Dict[str, Any] = {
+            "momento": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "modulo": record.name,
+            "mensagem": _truncar(record.getMessage(), self.max_caracteres),
+        }
+        for chave, valor in record.__dict__.items():
+            if chave not in _CAMPOS_PADRAO:
+                dados[chave] = valor
+        if record.exc_text:
+            dados["excecao"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """Formato do logging.basicConfig, com payload e mensagem truncados."""
+
+    def __init__(self, max_caracteres: int):
+        super().__init__("%(levelname)s:%(name)s:%(message)s")
+        self.max_caracteres = max_caracteres
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = _truncar(record.message, self.max_caracteres)
+        texto = super().formatMessage(record)
+        if hasattr(record, "payload_texto"):
+            texto += f" | payload: {record.payload_texto}"
+        return texto
+
+
+def configurar_logs():
+    """
+    Liga o logging assíncrono (chamado uma vez, no import de app.main).
+
+    Substitui os handlers do logger raiz e do uvicorn por um HandlerFila
+    e inicia a thread que formata e escreve no stdout.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    settings = get_settings()
+
+    saida = logging.StreamHandler(sys.stdout)
+    if settings.log_formato == "texto":
+        saida.setFormatter(FormatadorTexto(settings.log_max_caracteres))
+    else:
+        saida.setFormatter(FormatadorJSON(settings.log_max_caracteres))
+    saida.addFilter(FiltroPayload(settings.log_payload_max_caracteres, settings.log_payload_amostragem))
+
+    fila: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.log_fila_max)
+    handler = HandlerFila(fila)
+
+    raiz = logging.getLogger()
+    for antigo in list(raiz.handlers):
+        raiz.removeHandler(antigo)
+    raiz.addHandler(handler)
+    nivel = logging.getLevelName(settings.log_nivel.upper())
+    raiz.setLevel(nivel if isinstance(nivel, int) else logging.INFO)
+    for nome in LOGGERS_UVICORN:
+        logger_uvicorn = logging.getLogger(nome)
+        logger_uvicorn.handlers.clear()
+        logger_uvicorn.propagate = True
+    for nome, nivel in parse_niveis(settings.log_niveis).items():
+        logging.getLogger(nome).setLevel(nivel)
+
+    _listener = QueueListener(fila, saida, respect_handler_level=True)
+    _listener.start()
+    atexit.register(parar_logs)
+
+
+def parar_logs():
+    """Escreve o que estiver na fila e encerra a thread de escrita."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
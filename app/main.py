@@ -10,20 +10,48 @@ Segurança:
 - Autenticação via Bearer Token
 - Compatível com Cloudflare Proxy
 """
-from fastapi import FastAPI, Response
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from app.startup import medir_import, registrar_pronto, esta_pronto
+
+with medir_import("fastapi"):
+    from fastapi import FastAPI, Response
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 from datetime import datetime
-import json
 import logging
 
-from app.routes.calendario import router as calendario_router
-from app.models import HealthResponse
-from app.config import get_settings
-from app.middleware import RateLimitMiddleware, SecurityHeadersMiddleware, TrustedHostMiddleware
+with medir_import("app.routes"):
+    from app.routes.calendario import router as calendario_router
+    from app.routes.diagnostico import router as diagnostico_router
+    from app.routes.estatisticas import router as estatisticas_router
+    from app.routes.exportacao import router as exportacao_router
+    from app.routes.historico import router as historico_router
+    from app.routes.logos import router as logos_router
+    from app.routes.feed import router as feed_router
+    from app.routes.lote import router as lote_router
+    from app.routes.reconciliacao import router as reconciliacao_router
+    from app.routes.webhooks import router as webhooks_router
+with medir_import("app.models"):
+    from app.models import HealthResponse
+with medir_import("app.config"):
+    from app.config import get_settings
+    from app.logs import configurar_logs
+with medir_import("app.scraper"):
+    from app.scraper import aquecer_cache, get_persistencia
+    from app.rendering import serializar_json, prerenderizar
+    from app.webhooks import get_despachante
+    from app.execucao import encerrar_pool, executar_io, get_monitor_loop
+with medir_import("app.middleware"):
+    from app.middleware import (
+        RateLimitMiddleware,
+        SecurityHeadersMiddleware,
+        TrustedHostMiddleware,
+        StartupTimingMiddleware,
+        ForceRefreshHeaderMiddleware,
+    )
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (fila + thread de escrita, veja app.logs)
+configurar_logs()
 logger = logging.getLogger(__name__)
 
 # Versão da API
@@ -35,19 +63,42 @@ class UTF8JSONResponse(JSONResponse):
     media_type = "application/json; charset=utf-8"
     
     def render(self, content) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-            default=str,
-        ).encode("utf-8")
+        return serializar_json(content)
 
 
 # Carregar configurações
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da aplicação (startup/shutdown).
+    
+    No startup, aquece o cache: carrega o arquivo, monta o snapshot em
+    memória e pré-renderiza as respostas mais usadas. O /ready só responde
+    200 depois disso. Também inicia a entrega de webhooks e a persistência
+    atrasada das marcações, que gravam/enviam o que estiver pendente no
+    shutdown, e o monitor de travamentos do event loop.
+    """
+    try:
+        snapshot = await executar_io(aquecer_cache)
+        if snapshot:
+            prerenderizar(snapshot)
+    except Exception as e:
+        logger.error(f"Erro ao aquecer cache: {e}")
+    get_despachante().iniciar()
+    get_persistencia().iniciar()
+    get_monitor_loop().iniciar()
+    registrar_pronto()
+    yield
+    # Marcações pendentes são gravadas antes de sair
+    await get_persistencia().parar()
+    await get_despachante().parar()
+    await get_monitor_loop().parar()
+    encerrar_pool()
+
+
 # Criar app FastAPI
 app = FastAPI(
     title="API Calendário SPFC",
@@ -89,6 +140,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     default_response_class=UTF8JSONResponse,
+    lifespan=lifespan,
 )
 
 # Middlewares de segurança (ordem importa: primeiro a ser adicionado é o último a executar)
@@ -122,8 +174,23 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 
+# 5. Tempo até a primeira requisição (relatório de inicialização)
+app.add_middleware(StartupTimingMiddleware)
+
+# 6. Motivo de recusa do force_refresh (header X-Force-Refresh-Negado)
+app.add_middleware(ForceRefreshHeaderMiddleware)
+
 # Incluir rotas
 app.include_router(calendario_router)
+app.include_router(feed_router)
+app.include_router(lote_router)
+app.include_router(reconciliacao_router)
+app.include_router(webhooks_router)
+app.include_router(historico_router)
+app.include_router(exportacao_router)
+app.include_router(estatisticas_router)
+app.include_router(logos_router)
+app.include_router(diagnostico_router)
 
 
 @app.get(
@@ -142,6 +209,30 @@ async def health_check():
     )
 
 
+@app.get(
+    "/ready",
+    response_model=HealthResponse,
+    responses={503: {"model": HealthResponse, "description": "Aquecimento em andamento"}},
+    tags=["Health"],
+    summary="Readiness Check",
+    description="""
+    Verifica se a API está pronta para receber tráfego (cache aquecido).
+    Retorna 503 enquanto o aquecimento não terminou. Não requer autenticação.
+    """
+)
+async def readiness_check():
+    """Endpoint de readiness (usado pelo healthcheck do Docker)."""
+    pronto = esta_pronto()
+    resposta = HealthResponse(
+        status="ready" if pronto else "warming_up",
+        versao=API_VERSION,
+        timestamp=datetime.now()
+    )
+    if not pronto:
+        return UTF8JSONResponse(status_code=503, content=resposta.model_dump(mode="json"))
+    return resposta
+
+
 @app.get(
     "/",
     tags=["Root"],
@@ -154,5 +245,6 @@ async def root():
         "nome": "API Calendário SPFC",
         "versao": API_VERSION,
         "documentacao": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
@@ -1,11 +1,15 @@
 """
 Middlewares da aplicação.
 """
+from app.middleware.force_refresh import ForceRefreshHeaderMiddleware
 from app.middleware.rate_limiter import RateLimitMiddleware
 from app.middleware.security import SecurityHeadersMiddleware, TrustedHostMiddleware
+from app.middleware.startup import StartupTimingMiddleware
 
 __all__ = [
     "RateLimitMiddleware",
     "SecurityHeadersMiddleware", 
-    "TrustedHostMiddleware"
+    "TrustedHostMiddleware",
+    "StartupTimingMiddleware",
+    "ForceRefreshHeaderMiddleware",
 ]
@@ -0,0 +1,34 @@
+"""
+Middleware que informa ao cliente quando um force_refresh foi recusado.
+"""
+
+# Header com o motivo da recusa (a resposta traz o snapshot atual)
+HEADER_FORCE_REFRESH_NEGADO = "X-Force-Refresh-Negado"
+
+
+class ForceRefreshHeaderMiddleware:
+    """
+    Middleware ASGI que adiciona o header X-Force-Refresh-Negado.
+
+    As rotas registram o motivo em `request.state.force_refresh_negado`
+    (ver app.routes.calendario.admitir_force_refresh); o estado fica no
+    scope, compartilhado com este middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                motivo = scope.get("state", {}).get("force_refresh_negado")
+                if motivo:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (HEADER_FORCE_REFRESH_NEGADO.lower().encode("latin-1"), motivo.encode("latin-1"))
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, enviar)
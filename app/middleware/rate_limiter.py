@@ -5,12 +5,79 @@ from fastapi import Request, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Union
 import asyncio
+import ipaddress
 import logging
 
+from app.config import get_settings
+
 logger = logging.getLogger(__name__)
 
 
+def obter_ip_cliente(request: Request) -> str:
+    """
+    Obtém o IP real do cliente, considerando proxies (Cloudflare, nginx).
+    """
+    # Cloudflare
+    cf_connecting_ip = request.headers.get("CF-Connecting-IP")
+    if cf_connecting_ip:
+        return cf_connecting_ip
+    
+    # Proxy padrão
+    x_forwarded_for = request.headers.get("X-Forwarded-For")
+    if x_forwarded_for:
+        # Pega o primeiro IP da lista (IP original do cliente)
+        return x_forwarded_for.split(",")[0].strip()
+    
+    x_real_ip = request.headers.get("X-Real-IP")
+    if x_real_ip:
+        return x_real_ip
+    
+    # IP direto
+    return request.client.host if request.client else "unknown"
+
+
+Rede = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@lru_cache()
+def _proxies_confiaveis(valor: str) -> List[Rede]:
+    """Converte TRUSTED_PROXIES (IPs ou redes CIDR) em redes."""
+    redes = []
+    for item in valor.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            redes.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.warning(f"⚠️ TRUSTED_PROXIES: '{item}' não é um IP/rede válido (ignorado)")
+    return redes
+
+
+def obter_ip_chamador(request: Request) -> str:
+    """
+    Obtém o IP do chamador para cotas que o cliente não pode contornar.
+    
+    Os headers de proxy (CF-Connecting-IP, X-Forwarded-For, X-Real-IP) são
+    definidos pelo cliente: só valem quando a conexão direta vem de um
+    proxy listado em TRUSTED_PROXIES. Caso contrário, vale o IP da conexão.
+    """
+    direto = request.client.host if request.client else "unknown"
+    redes = _proxies_confiaveis(get_settings().trusted_proxies)
+    if not redes:
+        return direto
+    try:
+        ip = ipaddress.ip_address(direto)
+    except ValueError:
+        return direto
+    if any(ip in rede for rede in redes):
+        return obter_ip_cliente(request)
+    return direto
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Middleware para limitar requisições por IP.
@@ -26,26 +93,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         self._lock = asyncio.Lock()
     
     def _get_client_ip(self, request: Request) -> str:
-        """
-        Obtém o IP real do cliente, considerando proxies (Cloudflare, nginx).
-        """
-        # Cloudflare
-        cf_connecting_ip = request.headers.get("CF-Connecting-IP")
-        if cf_connecting_ip:
-            return cf_connecting_ip
-        
-        # Proxy padrão
-        x_forwarded_for = request.headers.get("X-Forwarded-For")
-        if x_forwarded_for:
-            # Pega o primeiro IP da lista (IP original do cliente)
-            return x_forwarded_for.split(",")[0].strip()
-        
-        x_real_ip = request.headers.get("X-Real-IP")
-        if x_real_ip:
-            return x_real_ip
-        
-        # IP direto
-        return request.client.host if request.client else "unknown"
+        """Obtém o IP real do cliente (ver obter_ip_cliente)."""
+        return obter_ip_cliente(request)
     
     async def _cleanup_old_requests(self, client_ip: str):
         """Remove requisições antigas fora da janela de tempo."""
@@ -56,8 +105,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         ]
     
     async def dispatch(self, request: Request, call_next):
-        # Não aplicar rate limit em health check
-        if request.url.path == "/health":
+        # Não aplicar rate limit em health/readiness check e nos escudos
+        # (imagens imutáveis, baixadas uma vez por navegador)
+        if request.url.path in ("/health", "/ready") or request.url.path.startswith("/api/logos/"):
             return await call_next(request)
         
         client_ip = self._get_client_ip(request)
@@ -55,8 +55,8 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         # Não expor versão do Python/FastAPI
         response.headers["X-Powered-By"] = "SPFC-API"
         
-        # Cache control para dados sensíveis
-        if "/api/" in str(request.url.path):
+        # Cache control para dados sensíveis (a menos que a rota defina o seu)
+        if "/api/" in str(request.url.path) and "cache-control" not in response.headers:
             response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
             response.headers["Pragma"] = "no-cache"
         
@@ -0,0 +1,23 @@
+"""
+Middleware para registrar a primeira requisição atendida após o start.
+"""
+from app.startup import registrar_primeira_requisicao, primeira_requisicao_registrada
+
+
+class StartupTimingMiddleware:
+    """
+    Middleware ASGI que registra o tempo até a primeira requisição.
+
+    Implementado como ASGI puro (sem BaseHTTPMiddleware) para que, depois
+    da primeira requisição, o custo por requisição seja só uma checagem.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or primeira_requisicao_registrada():
+            return await self.app(scope, receive, send)
+
+        await self.app(scope, receive, send)
+        registrar_primeira_requisicao(scope.get("path", ""))
@@ -1,11 +1,22 @@
 """
 Models Pydantic para a API de Calendário do SPFC.
 """
-from pydantic import BaseModel, Field, computed_field
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, datetime
 import hashlib
 
+from app.fuso_horario import DURACAO_JOGO, parse_data_horario, parse_iso
+
+# ID de um calendário adicional (alvo) nas rotas e consultas
+PADRAO_ALVO = r"^[A-Za-z0-9_.-]{1,64}$"
+
+
+def gerar_jogo_id(data: str, horario: str, adversario: str, competicao: str) -> str:
+    """ID derivado dos dados do jogo (data + horário + adversário + competição)."""
+    unique_str = f"{data}_{horario}_{adversario}_{competicao}"
+    return hashlib.md5(unique_str.encode()).hexdigest()[:12]
+
 
 class Jogo(BaseModel):
     """Representa um jogo do São Paulo FC."""
@@ -26,13 +37,89 @@ class Jogo(BaseModel):
     # Controle de sincronização com calendário
     criado_no_calendario: bool = Field(False, description="Se o jogo já foi adicionado ao Google Calendar")
     google_event_id: Optional[str] = Field(None, description="ID do evento no Google Calendar (para remoção)")
+    data_iso_anterior: Optional[str] = Field(
+        None,
+        description="Data/hora ISO antes do reagendamento (horário ainda no evento do Calendar; limpo ao marcar)",
+    )
+    
+    # Identidade estável: mantida quando o jogo é reagendado (app.identidade)
+    jogo_id: str = Field("", description="ID único do jogo (mantido em reagendamentos)")
+    
+    # Início/fim com fuso (America/Sao_Paulo), calculados uma vez na criação
+    _inicio: Optional[datetime] = PrivateAttr(None)
+    _fim: Optional[datetime] = PrivateAttr(None)
+    
+    def model_post_init(self, __context) -> None:
+        if not self.jogo_id:
+            self.__dict__["jogo_id"] = self.chave_natural
+        inicio = parse_iso(self.data_iso) or parse_data_horario(self.data, self.horario)
+        self._inicio = inicio
+        self._fim = parse_iso(self.data_fim_iso) or (inicio + DURACAO_JOGO if inicio else None)
+    
+    @classmethod
+    def construir_confiavel(
+        cls,
+        dados: Dict[str, Any],
+        inicio: Optional[datetime],
+        fim: Optional[datetime],
+    ) -> "Jogo":
+        """
+        Cria um Jogo sem validação nem parsing de datas.
+        
+        Só para dados gravados pela própria API: `dados` deve ter todos os
+        campos do modelo e `inicio`/`fim` os valores calculados quando o
+        jogo foi salvo. Equivale ao `model_construct` sem preencher
+        defaults nem chamar `model_post_init`.
+        """
+        jogo = cls.__new__(cls)
+        object.__setattr__(jogo, "__dict__", dados)
+        object.__setattr__(jogo, "__pydantic_fields_set__", set(dados))
+        object.__setattr__(jogo, "__pydantic_extra__", None)
+        object.__setattr__(jogo, "__pydantic_private__", {"_inicio": inicio, "_fim": fim})
+        return jogo
+    
+    # Os atributos privados são lidos direto de __pydantic_private__: o
+    # acesso por self._inicio passa pelo __getattr__ do pydantic (lento
+    # em laços sobre milhares de jogos)
+    
+    @property
+    def inicio(self) -> Optional[datetime]:
+        """Início do jogo (com fuso de São Paulo) ou None se a data for inválida."""
+        return self.__pydantic_private__["_inicio"]
+    
+    @property
+    def fim(self) -> Optional[datetime]:
+        """Fim do jogo (data_fim_iso ou início + 2h)."""
+        return self.__pydantic_private__["_fim"]
+    
+    @property
+    def inicio_epoch(self) -> Optional[int]:
+        """Início do jogo em segundos desde a época (usado nos índices)."""
+        inicio = self.__pydantic_private__["_inicio"]
+        return int(inicio.timestamp()) if inicio else None
+    
+    @field_serializer("adversario_logo", when_used="json")
+    def _serializar_logo(self, url: Optional[str], info) -> Optional[str]:
+        """
+        Nas respostas JSON, aponta o escudo para o proxy local (/api/logos).
+        
+        Use context={"logos_originais": True} para manter a URL do site.
+        """
+        if info.context and info.context.get("logos_originais"):
+            return url
+        # Import tardio: app.logos -> app.storage -> app.models
+        from app.logos import url_proxy
+        return url_proxy(url)
     
-    @computed_field
     @property
-    def jogo_id(self) -> str:
-        """ID único do jogo baseado em data + adversário + competição."""
-        unique_str = f"{self.data}_{self.horario}_{self.adversario}_{self.competicao}"
-        return hashlib.md5(unique_str.encode()).hexdigest()[:12]
+    def chave_natural(self) -> str:
+        """
+        ID derivado dos dados atuais do jogo.
+        
+        É o jogo_id de um jogo novo; depois de um reagendamento, o jogo_id
+        continua o original e só a chave natural muda.
+        """
+        return gerar_jogo_id(self.data, self.horario, self.adversario, self.competicao)
 
 
 class MarcarJogoRequest(BaseModel):
@@ -46,9 +133,13 @@ class CalendarioResponse(BaseModel):
     
     sucesso: bool = Field(..., description="Indica se a requisição foi bem sucedida")
     total_jogos: int = Field(..., description="Quantidade total de jogos retornados")
-    jogos: List[Jogo] = Field(..., description="Lista de jogos")
+    jogos: List[Jogo] = Field(..., description="Lista de jogos (apenas os campos pedidos em fields)")
     atualizado_em: datetime = Field(..., description="Timestamp da última atualização")
     cache: bool = Field(False, description="Indica se os dados vieram do cache")
+    proximo_cursor: Optional[str] = Field(
+        None,
+        description="Cursor da próxima página (apenas com limit; None se for a última)"
+    )
 
 
 class ProximoJogoResponse(BaseModel):
@@ -77,6 +168,152 @@ class JogoAoVivoResponse(BaseModel):
     cache: bool = Field(False, description="Indica se os dados vieram do cache")
 
 
+class HistoricoResponse(BaseModel):
+    """Response paginada do histórico de jogos."""
+    
+    sucesso: bool = Field(..., description="Indica se a requisição foi bem sucedida")
+    total_jogos: int = Field(..., description="Quantidade de jogos nesta página")
+    jogos: List[Jogo] = Field(..., description="Jogos da página, ordenados por data")
+    proximo_cursor: Optional[str] = Field(None, description="Cursor da próxima página (None se for a última)")
+
+
+class TemporadaHistorico(BaseModel):
+    """Resumo de uma temporada do histórico."""
+    
+    temporada: int = Field(..., description="Ano da temporada")
+    total_jogos: int = Field(..., description="Quantidade de jogos arquivados")
+
+
+class ConsultaLote(BaseModel):
+    """Uma consulta nomeada do endpoint de lote (mesmos filtros das rotas GET)."""
+    
+    tipo: Literal[
+        "jogos",
+        "semana",
+        "semana_pendentes",
+        "pendentes",
+        "proximo_jogo",
+        "calendario",
+        "calendario_limpar",
+    ] = Field(..., description="Rota equivalente (ex: semana_pendentes = GET /api/jogos/semana/pendentes)")
+    apenas_futuros: bool = Field(True, description="Apenas para tipo=jogos")
+    semanas: Optional[int] = Field(
+        None,
+        ge=1,
+        le=8,
+        description="Para semana/semana_pendentes (padrão 1) e pendentes (padrão 4)"
+    )
+    limit: Optional[int] = Field(None, ge=1, le=500, description="Máximo de jogos por página")
+    cursor: Optional[str] = Field(None, description="Cursor da próxima página")
+    fields: Optional[str] = Field(None, description="Campos de cada jogo, separados por vírgula")
+    competicao: Optional[str] = Field(None, description="Palavras do nome da competição (sem acento, prefixo)")
+    adversario: Optional[str] = Field(None, description="Início do nome do adversário (sem acento)")
+    mandante: Optional[bool] = Field(None, description="True = jogos em casa, False = fora")
+    de: Optional[date] = Field(None, description="Data inicial (inclusiva)")
+    ate: Optional[date] = Field(None, description="Data final (inclusiva)")
+    alvo: Optional[str] = Field(
+        None,
+        pattern=PADRAO_ALVO,
+        description="Calendário adicional (vazio = calendário principal)"
+    )
+
+
+class LoteRequest(BaseModel):
+    """Request do endpoint de lote."""
+    
+    consultas: Dict[str, ConsultaLote] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="Consultas nomeadas (o nome vira a chave em resultados)"
+    )
+    force_refresh: bool = Field(False, description="Se True, ignora o cache e faz novo scraping")
+
+
+class LoteResponse(BaseModel):
+    """Response do endpoint de lote."""
+    
+    sucesso: bool = Field(..., description="Indica se a requisição foi bem sucedida")
+    atualizado_em: datetime = Field(..., description="Timestamp da última atualização (o mesmo para todas as consultas)")
+    cache: bool = Field(False, description="Indica se os dados vieram do cache")
+    resultados: Dict[str, Any] = Field(
+        ...,
+        description="Resultado de cada consulta, no mesmo formato da rota GET equivalente"
+    )
+
+
+class EventoCalendario(BaseModel):
+    """Evento que existe no Google Calendar (enviado na reconciliação)."""
+
+    google_event_id: str = Field(..., min_length=1, description="ID do evento no Google Calendar")
+    inicio: Optional[datetime] = Field(None, description="Início do evento (ISO 8601; sem fuso = Brasília)")
+    jogo_id: Optional[str] = Field(None, description="jogo_id guardado no evento, se houver")
+
+
+class ReconciliarRequest(BaseModel):
+    """Request do endpoint de reconciliação do calendário."""
+
+    eventos: List[EventoCalendario] = Field(
+        ...,
+        max_length=5000,
+        description="Eventos que existem no calendário (lista vazia = calendário vazio)"
+    )
+    semanas: int = Field(4, ge=1, le=8, description="Jogos a criar: os das próximas N semanas")
+    de: Optional[date] = Field(
+        None,
+        description="Início do período listado em eventos (jogos fora do período não são criados nem desmarcados)"
+    )
+    ate: Optional[date] = Field(None, description="Fim do período listado em eventos (inclusivo)")
+    fields: Optional[str] = Field(None, description="Campos de cada jogo em criar/atualizar, separados por vírgula")
+    aplicar: bool = Field(False, description="Se True, aplica as correções de estado (todas juntas)")
+    alvo: Optional[str] = Field(
+        None,
+        pattern=PADRAO_ALVO,
+        description="Calendário adicional (vazio = calendário principal)"
+    )
+
+
+class ReconciliacaoResponse(BaseModel):
+    """Plano de sincronização do calendário."""
+
+    sucesso: bool = Field(..., description="Indica se a requisição foi bem sucedida")
+    atualizado_em: datetime = Field(..., description="Timestamp da última atualização dos jogos")
+    aplicado: bool = Field(False, description="Se houve correções e elas foram aplicadas")
+    resumo: Dict[str, int] = Field(..., description="Quantidade de itens em cada lista e de jogos sem mudança")
+    criar: List[Dict[str, Any]] = Field(..., description="Jogos sem evento (criar e depois marcar)")
+    atualizar: List[Dict[str, Any]] = Field(..., description="Eventos fora do horário: google_event_id e jogo")
+    remover: List[Dict[str, Any]] = Field(
+        ...,
+        description="Eventos a apagar: google_event_id, jogo_id e motivo (jogo_passado, duplicado, desconhecido)"
+    )
+    corrigir: List[Dict[str, Any]] = Field(
+        ...,
+        description="Mudanças de estado: jogo_id, acao (marcar/desmarcar), google_event_id e motivo"
+    )
+
+
+class WebhookRequest(BaseModel):
+    """Request para registrar um webhook."""
+    
+    url: str = Field(..., description="URL que receberá os eventos (http/https)")
+    eventos: List[str] = Field(
+        [],
+        description="Eventos de interesse (vazio = todos): jogo.adicionado, jogo.reagendado, "
+                    "jogo.removido, calendario.marcado, calendario.desmarcado"
+    )
+    segredo: Optional[str] = Field(None, description="Segredo para assinar o corpo (HMAC-SHA256)")
+
+
+class WebhookResponse(BaseModel):
+    """Webhook registrado (o segredo não é retornado)."""
+    
+    id: str = Field(..., description="ID do webhook")
+    url: str = Field(..., description="URL de entrega")
+    eventos: List[str] = Field(..., description="Eventos de interesse (vazio = todos)")
+    assinado: bool = Field(False, description="Se o corpo é assinado com segredo")
+    criado_em: str = Field(..., description="Quando o webhook foi registrado")
+
+
 class ErrorResponse(BaseModel):
     """Response de erro."""
     
@@ -0,0 +1,151 @@
+"""
+Persistência atrasada (write-behind) do estado de sincronização.
+
+Marcar/desmarcar um jogo no calendário altera só a memória; as alterações
+feitas dentro de uma janela curta viram uma única gravação atômica, feita
+em thread fora do caminho da requisição. Quando o n8n marca 40 jogos em
+sequência, o arquivo é gravado uma vez, não 40.
+
+Modos (PERSISTENCIA_MODO):
+- atrasada: write-behind com janela de PERSISTENCIA_JANELA segundos (padrão).
+  Em uma queda do processo, as marcações da última janela podem se perder;
+  no shutdown normal tudo o que estiver pendente é gravado (lifespan).
+- imediata: cada marcação é gravada dentro da requisição
+
+As alterações pendentes são jogos (pelo jogo_id), não um snapshot: quem
+grava (app.scraper) relê o armazenamento se outro processo gravou no
+meio e aplica as alterações por cima, e um scraping as reaplica no
+snapshot novo antes de gravá-lo.
+"""
+from typing import Callable, Dict, List, Optional
+import asyncio
+import logging
+import threading
+
+from app.config import get_settings
+from app.execucao import executar_io
+from app.models import Jogo
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("atrasada", "imediata")
+
+# Espera antes de tentar de novo um lote que falhou (disco cheio, permissão)
+ESPERA_APOS_FALHA = 5.0
+
+
+class PersistenciaAtrasada:
+    """
+    Agrupa alterações de jogos e as grava em lote.
+
+    `agendar` só registra a alteração (pode ser chamado de qualquer
+    thread); a tarefa iniciada no lifespan espera a janela e chama
+    `gravar(jogos)` uma vez com todos os jogos alterados; se `gravar`
+    retornar False (ou levantar), os jogos voltam ao lote. Uma gravação
+    completa (scraping) que já inclui as alterações de `pendentes()`
+    chama `descartar` em seguida.
+    """
+
+    def __init__(self, gravar: Callable[[List[Jogo]], bool]):
+        self._gravar = gravar
+        self._lock = threading.Lock()
+        # Serializa os lotes (a tarefa e o descarregar do shutdown)
+        self._escrita = threading.Lock()
+        self._pendentes: Dict[str, Jogo] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sinal: Optional[asyncio.Event] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self.alteracoes = 0
+        self.gravacoes = 0
+
+    @property
+    def ativa(self) -> bool:
+        """Se as alterações estão sendo agrupadas (modo atrasada com a tarefa rodando)."""
+        return self._tarefa is not None and get_settings().persistencia_modo == "atrasada"
+
+    def pendentes(self) -> List[Jogo]:
+        """Jogos alterados ainda não gravados (o estado mais recente de cada um)."""
+        with self._lock:
+            return list(self._pendentes.values())
+
+    def agendar(self, jogos: List[Jogo]) -> bool:
+        """
+        Registra a alteração de jogos para o próximo lote.
+
+        Os jogos de uma mesma chamada são gravados juntos (mesmo lote).
+
+        Returns:
+            False se a persistência atrasada não está ativa (o chamador
+            deve gravar na hora)
+        """
+        if not self.ativa:
+            return False
+        with self._lock:
+            for jogo in jogos:
+                self._pendentes[jogo.jogo_id] = jogo
+            self.alteracoes += len(jogos)
+        self._loop.call_soon_threadsafe(self._sinal.set)
+        return True
+
+    def descartar(self):
+        """Descarta as alterações pendentes (já gravadas por inteiro, ou cache limpo)."""
+        with self._lock:
+            self._pendentes.clear()
+
+    def _gravar_lote(self) -> bool:
+        """Grava o lote pendente; False se falhou (os jogos continuam pendentes)."""
+        with self._escrita:
+            with self._lock:
+                jogos = list(self._pendentes.values())
+                self._pendentes.clear()
+            if not jogos:
+                return True
+            try:
+                gravou = self._gravar(jogos)
+            except Exception as e:
+                logger.error(f"Erro ao gravar alterações pendentes: {e}")
+                gravou = False
+            if gravou:
+                self.gravacoes += 1
+                logger.info(f"💾 {len(jogos)} alteração(ões) gravada(s) em uma escrita")
+                return True
+            logger.warning(f"⚠️ {len(jogos)} alteração(ões) mantida(s) pendente(s) para a próxima escrita")
+            # Devolve ao lote (alterações mais novas têm prioridade)
+            with self._lock:
+                for jogo in jogos:
+                    self._pendentes.setdefault(jogo.jogo_id, jogo)
+            return False
+
+    async def descarregar(self) -> bool:
+        """Grava agora o que estiver pendente (False se a escrita falhou)."""
+        return await executar_io(self._gravar_lote)
+
+    def iniciar(self):
+        """Inicia a tarefa de gravação (chamado no lifespan)."""
+        self._loop = asyncio.get_running_loop()
+        self._sinal = asyncio.Event()
+        self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self):
+        """Encerra a tarefa e grava o que estiver pendente."""
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+        await self.descarregar()
+
+    async def _executar(self):
+        settings = get_settings()
+        while True:
+            await self._sinal.wait()
+            # Janela para agrupar as marcações de um mesmo workflow
+            await asyncio.sleep(settings.persistencia_janela)
+            self._sinal.clear()
+            if not await self.descarregar():
+                # Tenta de novo mesmo sem novas marcações
+                await asyncio.sleep(ESPERA_APOS_FALHA)
+                self._sinal.set()
@@ -0,0 +1,206 @@
+"""
+Reconciliação do estado do calendário com os eventos do cliente.
+
+O n8n envia os eventos que existem no Google Calendar (google_event_id e
+início); em uma passada sobre o snapshot, a API calcula o plano completo
+da sincronização:
+
+- criar: jogos futuros (próximas N semanas) sem evento
+- atualizar: eventos com horário diferente do jogo (reagendamentos)
+- remover: eventos de jogos passados, duplicados ou desconhecidos
+- corrigir: marcações da API que não batem com o calendário depois do
+  plano (evento que existe sem marcação, evento trocado, marcação de
+  evento que não existe mais)
+
+Cada evento é associado a um jogo pelo google_event_id marcado, pelo
+jogo_id (se o cliente o guardou no evento) ou, por último, pelo início
+igual ao de um jogo sem evento.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from app.alvos import PRINCIPAL, EstadoCalendario
+from app.consultas import HORAS_PARA_LIMPEZA
+from app.fuso_horario import agora as agora_sp, localizar
+from app.models import EventoCalendario, Jogo
+from app.snapshot import Snapshot
+
+
+class Atualizacao(NamedTuple):
+    """Evento que deve ir para o horário atual do jogo."""
+
+    google_event_id: str
+    jogo: Jogo
+
+
+class Remocao(NamedTuple):
+    """Evento que deve ser apagado do calendário."""
+
+    google_event_id: str
+    jogo_id: Optional[str]
+    motivo: str  # jogo_passado, duplicado ou desconhecido
+
+
+class Correcao(NamedTuple):
+    """Mudança no estado de sincronização de um jogo."""
+
+    jogo: Jogo
+    acao: str  # marcar ou desmarcar
+    google_event_id: Optional[str]
+    motivo: str
+
+
+class Plano(NamedTuple):
+    """Resultado da reconciliação (criar, atualizar e corrigir na ordem do snapshot)."""
+
+    criar: List[Jogo]
+    atualizar: List[Atualizacao]
+    remover: List[Remocao]
+    corrigir: List[Correcao]
+    sem_mudanca: int
+
+
+def _epoch(momento: Optional[datetime]) -> Optional[int]:
+    return int(localizar(momento).timestamp()) if momento else None
+
+
+def _periodo(de: Optional[date], ate: Optional[date]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    inicio = localizar(datetime.combine(de, time.min)) if de else None
+    fim = localizar(datetime.combine(ate, time.max)) if ate else None
+    return inicio, fim
+
+
+def _associar(
+    pares: Dict[str, EventoCalendario],
+    remover: List[Remocao],
+    jogo: Jogo,
+    evento: EventoCalendario,
+    conhecido: Optional[str],
+):
+    """Associa o evento ao jogo; um segundo evento do mesmo jogo é duplicado."""
+    atual = pares.get(jogo.jogo_id)
+    if atual is None:
+        pares[jogo.jogo_id] = evento
+        return
+    # Fica o evento que a API já conhecia; o outro é duplicado
+    if evento.google_event_id == conhecido:
+        pares[jogo.jogo_id], evento = evento, atual
+    remover.append(Remocao(evento.google_event_id, jogo.jogo_id, "duplicado"))
+
+
+def planejar(
+    snapshot: Snapshot,
+    eventos: List[EventoCalendario],
+    semanas: int = 4,
+    de: Optional[date] = None,
+    ate: Optional[date] = None,
+    agora: Optional[datetime] = None,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> Plano:
+    """
+    Calcula o plano de sincronização entre o snapshot e os eventos do cliente.
+
+    Args:
+        snapshot: Snapshot de jogos
+        eventos: Eventos que existem no Google Calendar
+        semanas: Jogos a criar: os que começam nas próximas N semanas
+        de: Início do período coberto pela lista de eventos (inclusivo)
+        ate: Fim do período coberto pela lista de eventos (inclusivo)
+        agora: Datetime de referência (opcional, útil para testes)
+        estado: Estado de sincronização do calendário (alvo)
+
+    Returns:
+        Plano com os eventos a criar, atualizar e remover e as correções
+        de estado. Jogos fora do período (`de`/`ate`) não são criados nem
+        desmarcados: o cliente pode ter listado só parte do calendário.
+    """
+    agora = localizar(agora) if agora else agora_sp()
+    limite_criacao = agora + timedelta(weeks=semanas)
+    limite_limpeza = agora - timedelta(hours=HORAS_PARA_LIMPEZA)
+    periodo_inicio, periodo_fim = _periodo(de, ate)
+
+    por_evento: Dict[str, Jogo] = {}
+    for jogo in snapshot.jogos:
+        google_event_id = estado.evento(jogo)
+        if google_event_id and estado.no_calendario(jogo):
+            por_evento[google_event_id] = jogo
+
+    # 1. Eventos já conhecidos (google_event_id marcado ou jogo_id no evento)
+    pares: Dict[str, EventoCalendario] = {}
+    remover: List[Remocao] = []
+    sem_jogo: List[EventoCalendario] = []
+    vistos: Set[str] = set()
+    for evento in eventos:
+        if evento.google_event_id in vistos:
+            continue
+        vistos.add(evento.google_event_id)
+        jogo = por_evento.get(evento.google_event_id)
+        if jogo is None and evento.jogo_id:
+            jogo = snapshot.obter(evento.jogo_id)
+        if jogo is None:
+            sem_jogo.append(evento)
+        else:
+            _associar(pares, remover, jogo, evento, estado.evento(jogo))
+
+    # 2. Eventos sem vínculo: jogo sem evento que começa no mesmo horário
+    por_inicio: Dict[int, List[Jogo]] = {}
+    if sem_jogo:
+        for jogo in snapshot.jogos:
+            if jogo.jogo_id not in pares and jogo.inicio is not None:
+                por_inicio.setdefault(jogo.inicio_epoch, []).append(jogo)
+    for evento in sem_jogo:
+        candidatos = [
+            jogo for jogo in por_inicio.get(_epoch(evento.inicio), ())
+            if jogo.jogo_id not in pares
+        ]
+        if candidatos:
+            pares[candidatos[0].jogo_id] = evento
+        else:
+            remover.append(Remocao(evento.google_event_id, None, "desconhecido"))
+
+    # 3. Uma passada pelos jogos: o que fazer com cada um
+    criar: List[Jogo] = []
+    atualizar: List[Atualizacao] = []
+    corrigir: List[Correcao] = []
+    sem_mudanca = 0
+    for jogo in snapshot.jogos:
+        inicio = jogo.inicio
+        evento = pares.get(jogo.jogo_id)
+        no_calendario = estado.no_calendario(jogo)
+        if evento is None:
+            no_periodo = inicio is None or (
+                (periodo_inicio is None or inicio >= periodo_inicio)
+                and (periodo_fim is None or inicio <= periodo_fim)
+            )
+            if not no_periodo:
+                continue
+            if no_calendario:
+                corrigir.append(Correcao(jogo, "desmarcar", None, "evento_ausente"))
+            if inicio is not None and agora < inicio <= limite_criacao:
+                criar.append(jogo)
+            continue
+
+        if inicio is not None and inicio < limite_limpeza:
+            remover.append(Remocao(evento.google_event_id, jogo.jogo_id, "jogo_passado"))
+            if no_calendario:
+                corrigir.append(Correcao(jogo, "desmarcar", None, "jogo_passado"))
+            continue
+
+        desatualizado = (
+            evento.inicio is not None and inicio is not None
+            and _epoch(evento.inicio) != jogo.inicio_epoch
+        )
+        if desatualizado:
+            atualizar.append(Atualizacao(evento.google_event_id, jogo))
+
+        if not no_calendario:
+            corrigir.append(Correcao(jogo, "marcar", evento.google_event_id, "evento_existente"))
+        elif estado.evento(jogo) != evento.google_event_id:
+            corrigir.append(Correcao(jogo, "marcar", evento.google_event_id, "evento_trocado"))
+        elif estado.anterior(jogo):
+            # Depois do plano o evento está no horário atual
+            corrigir.append(Correcao(jogo, "marcar", evento.google_event_id, "reagendamento"))
+        elif not desatualizado:
+            sem_mudanca += 1
+
+    return Plano(criar, atualizar, remover, corrigir, sem_mudanca)
@@ -0,0 +1,413 @@
+"""
+Políticas de atualização do cache (quando fazer scraping no Firecrawl).
+
+Cada scraping custa ~87 créditos. A política decide, a cada requisição,
+se o snapshot atual ainda serve ou se vale gastar créditos:
+
+- ultimo_jogo: atualiza só quando o último jogo do cache já passou
+  (comportamento original; pode ficar semanas sem ver reagendamentos)
+- rodada: além disso, atualiza algumas horas antes de cada jogo e quando
+  os dados passam da idade máxima, respeitando um orçamento de créditos
+  por período
+
+Atualizações obrigatórias (sem cache, último jogo passou) sempre
+acontecem; as opcionais (pré-jogo, idade máxima) só se couberem no
+orçamento. As métricas mostram a idade dos dados e os créditos gastos.
+
+O force_refresh passa por um controle de admissão próprio (intervalo
+mínimo, orçamento diário e cota por chamador): um cliente em loop não
+consegue esgotar as keys do Firecrawl.
+"""
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+import json
+import logging
+import os
+import threading
+
+from app.config import get_settings
+from app.fuso_horario import localizar
+from app.snapshot import Snapshot
+from app.storage import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Registro de scrapings feitos (volume Docker em /app/data)
+CREDITOS_FILE = DATA_DIR / "creditos.json"
+
+# Margem após o último jogo para considerar que ele terminou
+HORAS_APOS_ULTIMO_JOGO = 3
+
+# Motivos que não dependem do orçamento
+MOTIVOS_OBRIGATORIOS = {"sem_cache", "ultimo_jogo_passou"}
+
+# Motivo registrado para atualizações pedidas pelo cliente
+MOTIVO_FORCE_REFRESH = "force_refresh"
+
+
+class Decisao(NamedTuple):
+    """Resultado da política para um momento."""
+
+    atualizar: bool
+    motivo: str
+
+
+class RegistroCreditos:
+    """
+    Scrapings feitos e créditos gastos.
+
+    Com `caminho`, o registro é persistido em JSON (sobrevive a restarts);
+    sem caminho fica só em memória (usado pelo simulador).
+    """
+
+    def __init__(self, caminho: Optional[Path] = None, retencao_dias: int = 90):
+        self.caminho = caminho
+        self.retencao_dias = retencao_dias
+        self._lock = threading.Lock()
+        self._registros: Optional[List[Dict[str, Any]]] = None
+
+    def _carregar(self) -> List[Dict[str, Any]]:
+        if self._registros is None:
+            self._registros = []
+            if self.caminho is not None:
+                try:
+                    with open(self.caminho, "r", encoding="utf-8") as f:
+                        self._registros = json.load(f).get("scrapings", [])
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.error(f"Erro ao ler registro de créditos: {e}")
+        return self._registros
+
+    def _salvar(self):
+        if self.caminho is None:
+            return
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho.with_suffix(".tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"scrapings": self._registros}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+    def registrar(self, creditos: int, motivo: str, momento: datetime):
+        """
+        Registra um scraping.
+
+        Args:
+            creditos: Créditos gastos
+            motivo: Motivo da atualização (da Decisao)
+            momento: Quando aconteceu
+        """
+        momento = localizar(momento)
+        limite = momento - timedelta(days=self.retencao_dias)
+        with self._lock:
+            registros = [
+                r for r in self._carregar()
+                if datetime.fromisoformat(r["em"]) >= limite
+            ]
+            registros.append({"em": momento.isoformat(), "creditos": creditos, "motivo": motivo})
+            self._registros = registros
+            self._salvar()
+
+    def no_periodo(self, momento: datetime, dias: int) -> List[Dict[str, Any]]:
+        """Scrapings dos últimos `dias` dias até `momento`."""
+        inicio = localizar(momento) - timedelta(days=dias)
+        with self._lock:
+            return [r for r in self._carregar() if datetime.fromisoformat(r["em"]) >= inicio]
+
+    def creditos_no_periodo(self, momento: datetime, dias: int) -> int:
+        """Créditos gastos nos últimos `dias` dias."""
+        return sum(r["creditos"] for r in self.no_periodo(momento, dias))
+
+
+def _atualizado_em(snapshot: Snapshot) -> datetime:
+    """Momento dos dados com fuso (ultima_atualizacao sem fuso = horário do servidor)."""
+    return localizar(snapshot.ultima_atualizacao.astimezone())
+
+
+class PoliticaAtualizacao:
+    """Interface das políticas de atualização."""
+
+    nome = ""
+
+    def __init__(
+        self,
+        creditos_por_scrape: int = 87,
+        orcamento_creditos: int = 0,
+        periodo_dias: int = 30,
+    ):
+        self.creditos_por_scrape = creditos_por_scrape
+        self.orcamento_creditos = orcamento_creditos
+        self.periodo_dias = periodo_dias
+
+    def avaliar(self, snapshot: Optional[Snapshot], agora: datetime) -> Decisao:
+        """Decide sem considerar o orçamento."""
+        raise NotImplementedError
+
+    def decidir(
+        self,
+        snapshot: Optional[Snapshot],
+        agora: datetime,
+        creditos: RegistroCreditos,
+    ) -> Decisao:
+        """
+        Decide se o cache deve ser atualizado agora.
+
+        Args:
+            snapshot: Snapshot atual (None se não houver cache)
+            agora: Momento de referência
+            creditos: Registro de créditos (para o orçamento)
+
+        Returns:
+            Decisao com o motivo
+        """
+        agora = localizar(agora)
+        decisao = self.avaliar(snapshot, agora)
+        if not decisao.atualizar or decisao.motivo in MOTIVOS_OBRIGATORIOS:
+            return decisao
+        if self.orcamento_creditos > 0:
+            gastos = creditos.creditos_no_periodo(agora, self.periodo_dias)
+            if gastos + self.creditos_por_scrape > self.orcamento_creditos:
+                return Decisao(False, f"orcamento_esgotado ({decisao.motivo})")
+        return decisao
+
+    @staticmethod
+    def _ultimo_jogo_passou(snapshot: Snapshot, agora: datetime) -> bool:
+        ultimo = snapshot.ultimo_inicio
+        return ultimo is None or ultimo + timedelta(hours=HORAS_APOS_ULTIMO_JOGO) <= agora
+
+
+class PoliticaUltimoJogo(PoliticaAtualizacao):
+    """Atualiza só quando o último jogo do cache já passou."""
+
+    nome = "ultimo_jogo"
+
+    def avaliar(self, snapshot: Optional[Snapshot], agora: datetime) -> Decisao:
+        if snapshot is None or not snapshot.jogos:
+            return Decisao(True, "sem_cache")
+        if self._ultimo_jogo_passou(snapshot, agora):
+            return Decisao(True, "ultimo_jogo_passou")
+        return Decisao(False, "cache_valido")
+
+
+class PoliticaRodada(PoliticaUltimoJogo):
+    """
+    Atualiza antes de cada jogo e quando os dados ficam velhos demais.
+
+    Um scraping feito antes de a janela pré-jogo abrir não vale para
+    aquele jogo: dentro da janela, a primeira requisição busca dados novos
+    (pega reagendamentos de última hora).
+    """
+
+    nome = "rodada"
+
+    def __init__(self, horas_antes_jogo: float = 6, idade_maxima_horas: float = 168, **kwargs):
+        super().__init__(**kwargs)
+        self.horas_antes_jogo = horas_antes_jogo
+        self.idade_maxima_horas = idade_maxima_horas
+
+    def avaliar(self, snapshot: Optional[Snapshot], agora: datetime) -> Decisao:
+        decisao = super().avaliar(snapshot, agora)
+        if decisao.atualizar:
+            return decisao
+
+        atualizado_em = _atualizado_em(snapshot)
+
+        if self.idade_maxima_horas > 0 and agora - atualizado_em >= timedelta(hours=self.idade_maxima_horas):
+            return Decisao(True, "idade_maxima")
+
+        if self.horas_antes_jogo > 0:
+            posicao = snapshot.indice_apos(agora)
+            if posicao < snapshot.total_datados:
+                abertura = snapshot.inicios[posicao] - timedelta(hours=self.horas_antes_jogo)
+                if agora >= abertura and atualizado_em < abertura:
+                    return Decisao(True, "pre_jogo")
+
+        return Decisao(False, "cache_valido")
+
+
+POLITICAS = {
+    PoliticaUltimoJogo.nome: PoliticaUltimoJogo,
+    PoliticaRodada.nome: PoliticaRodada,
+}
+
+
+def criar_politica(nome: str, **parametros) -> PoliticaAtualizacao:
+    """
+    Cria uma política pelo nome.
+
+    Raises:
+        ValueError: Se a política não existir
+    """
+    if nome not in POLITICAS:
+        raise ValueError(f"Política de atualização inválida: {nome}. Disponíveis: {', '.join(POLITICAS)}")
+    classe = POLITICAS[nome]
+    if classe is PoliticaUltimoJogo:
+        parametros.pop("horas_antes_jogo", None)
+        parametros.pop("idade_maxima_horas", None)
+    return classe(**parametros)
+
+
+class ControleForceRefresh:
+    """
+    Admissão dos pedidos de force_refresh.
+
+    Um pedido só vira scraping se:
+    - passou o intervalo mínimo desde o último force_refresh admitido
+    - os force_refresh das últimas 24h cabem no orçamento diário de créditos
+    - o chamador não passou da sua cota nas últimas 24h
+
+    A vaga é reservada no momento da admissão, então pedidos simultâneos
+    não passam juntos pelo intervalo mínimo.
+    """
+
+    def __init__(
+        self,
+        creditos: RegistroCreditos,
+        creditos_por_scrape: int = 87,
+        intervalo_minimo: float = 300,
+        creditos_dia: int = 0,
+        por_chamador_dia: int = 0,
+    ):
+        self.creditos = creditos
+        self.creditos_por_scrape = creditos_por_scrape
+        self.intervalo_minimo = intervalo_minimo
+        self.creditos_dia = creditos_dia
+        self.por_chamador_dia = por_chamador_dia
+        self._lock = threading.Lock()
+        self._ultimo: Optional[datetime] = None
+        self._por_chamador: Dict[str, Deque[datetime]] = defaultdict(deque)
+        self.negados: Counter = Counter()
+
+    def admitir(self, chamador: str, agora: datetime) -> Decisao:
+        """
+        Decide se um force_refresh pode gastar créditos agora.
+
+        Args:
+            chamador: Identificação do cliente (IP)
+            agora: Momento do pedido
+
+        Returns:
+            Decisao (motivo explica a recusa)
+        """
+        agora = localizar(agora)
+        dia = timedelta(days=1)
+        with self._lock:
+            pedidos = self._por_chamador[chamador]
+            while pedidos and pedidos[0] <= agora - dia:
+                pedidos.popleft()
+
+            decisao = Decisao(True, MOTIVO_FORCE_REFRESH)
+            if self._ultimo is not None and self.intervalo_minimo > 0:
+                espera = self.intervalo_minimo - (agora - self._ultimo).total_seconds()
+                if espera > 0:
+                    decisao = Decisao(False, f"intervalo_minimo (tente em {int(espera) + 1}s)")
+            if decisao.atualizar and self.creditos_dia > 0:
+                gastos = sum(
+                    r["creditos"] for r in self.creditos.no_periodo(agora, 1)
+                    if r["motivo"] == MOTIVO_FORCE_REFRESH
+                )
+                if gastos + self.creditos_por_scrape > self.creditos_dia:
+                    decisao = Decisao(False, "orcamento_diario_esgotado")
+            if decisao.atualizar and self.por_chamador_dia > 0 and len(pedidos) >= self.por_chamador_dia:
+                decisao = Decisao(False, "cota_do_chamador_esgotada")
+
+            if decisao.atualizar:
+                self._ultimo = agora
+                pedidos.append(agora)
+            else:
+                self.negados[decisao.motivo.split(" ")[0]] += 1
+                # Não deixa o dicionário crescer com chamadores sem pedidos recentes
+                if not pedidos:
+                    del self._por_chamador[chamador]
+            return decisao
+
+
+@lru_cache()
+def get_politica() -> PoliticaAtualizacao:
+    """Retorna a política configurada (REFRESH_*)."""
+    settings = get_settings()
+    return criar_politica(
+        settings.refresh_politica,
+        horas_antes_jogo=settings.refresh_horas_antes_jogo,
+        idade_maxima_horas=settings.refresh_idade_maxima_horas,
+        creditos_por_scrape=settings.firecrawl_creditos_por_scrape,
+        orcamento_creditos=settings.refresh_orcamento_creditos,
+        periodo_dias=settings.refresh_periodo_dias,
+    )
+
+
+@lru_cache()
+def get_registro_creditos() -> RegistroCreditos:
+    """Retorna o registro de créditos persistido em data/creditos.json."""
+    return RegistroCreditos(CREDITOS_FILE)
+
+
+@lru_cache()
+def get_controle_force_refresh() -> ControleForceRefresh:
+    """Retorna o controle de admissão do force_refresh (FORCE_REFRESH_*)."""
+    settings = get_settings()
+    return ControleForceRefresh(
+        get_registro_creditos(),
+        creditos_por_scrape=settings.firecrawl_creditos_por_scrape,
+        intervalo_minimo=settings.force_refresh_intervalo_minimo,
+        creditos_dia=settings.force_refresh_creditos_dia,
+        por_chamador_dia=settings.force_refresh_por_chamador_dia,
+    )
+
+
+# Contadores desde o start (métricas)
+_decisoes: Counter = Counter()
+_ultima_decisao: Dict[str, Any] = {}
+
+
+def decidir_atualizacao(snapshot: Optional[Snapshot], agora: datetime) -> Decisao:
+    """Aplica a política configurada e registra a decisão nas métricas."""
+    decisao = get_politica().decidir(snapshot, agora, get_registro_creditos())
+    _decisoes[decisao.motivo] += 1
+    _ultima_decisao.update({"atualizar": decisao.atualizar, "motivo": decisao.motivo, "em": agora.isoformat()})
+    return decisao
+
+
+def registrar_scraping(motivo: str, agora: datetime):
+    """Registra os créditos de um scraping bem sucedido."""
+    get_registro_creditos().registrar(get_settings().firecrawl_creditos_por_scrape, motivo, agora)
+
+
+def obter_metricas(snapshot: Optional[Snapshot], agora: datetime) -> Dict[str, Any]:
+    """
+    Métricas de frescor dos dados x créditos gastos.
+
+    Returns:
+        Dict com política, idade dos dados, créditos no período e decisões
+    """
+    politica = get_politica()
+    registro = get_registro_creditos()
+    scrapings = registro.no_periodo(agora, politica.periodo_dias)
+    gastos = sum(r["creditos"] for r in scrapings)
+
+    idade_horas = None
+    atualizado_em = None
+    if snapshot is not None and snapshot.jogos:
+        atualizado_em = snapshot.ultima_atualizacao.isoformat()
+        idade = localizar(agora) - _atualizado_em(snapshot)
+        idade_horas = round(idade.total_seconds() / 3600, 2)
+
+    return {
+        "politica": politica.nome,
+        "dados_atualizados_em": atualizado_em,
+        "idade_dados_horas": idade_horas,
+        "periodo_dias": politica.periodo_dias,
+        "scrapings_no_periodo": len(scrapings),
+        "creditos_no_periodo": gastos,
+        "orcamento_creditos": politica.orcamento_creditos or None,
+        "creditos_restantes": (
+            max(politica.orcamento_creditos - gastos, 0) if politica.orcamento_creditos else None
+        ),
+        "scrapings_por_motivo": dict(Counter(r["motivo"] for r in scrapings)),
+        "decisoes_desde_start": dict(_decisoes),
+        "force_refresh_negados": dict(get_controle_force_refresh().negados),
+        "ultima_decisao": dict(_ultima_decisao) or None,
+    }
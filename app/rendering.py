@@ -0,0 +1,525 @@
+"""
+Renderização das respostas JSON a partir do snapshot.
+
+As respostas das rotas de listagem são serializadas uma única vez por
+versão do snapshot, fatia de jogos e página/projeção pedida; requisições
+seguintes reutilizam os bytes prontos. O campo `atualizado_em` dessas
+respostas é o momento em que os dados foram obtidos do site, o que mantém
+o corpo estável. Os corpos ficam no LRU de respostas do snapshot
+(Snapshot.resposta), separado das estruturas base (dicts, posições,
+índices): combinações de parâmetros do cliente não descartam as bases.
+
+Consultas de um calendário adicional (?alvo=) não são memorizadas: o
+estado do alvo muda sem nova versão do snapshot. Elas filtram a fatia com
+as marcações do alvo e aplicam o estado só nos jogos da página.
+"""
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import json
+
+from fastapi import Response
+
+from app import compressao, consultas
+from app.alvos import PRINCIPAL, EstadoCalendario
+from app.fuso_horario import agora as agora_sp
+from app.indices import Filtros, criar_filtros, filtrar_fatia
+from app.models import ConsultaLote, Jogo, ProximoJogoResponse
+from app.reconciliacao import Plano
+from app.snapshot import Snapshot
+
+MEDIA_TYPE_JSON = "application/json; charset=utf-8"
+
+# Campos que podem ser pedidos em `fields` (ordem do modelo)
+CAMPOS_JOGO = list(Jogo.model_fields)
+
+
+class Pagina(NamedTuple):
+    """Paginação e projeção de campos de uma listagem."""
+
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    campos: Optional[Tuple[str, ...]] = None
+
+
+def serializar_json(content: Any) -> bytes:
+    """Serializa em JSON compacto UTF-8 (mesmo formato da resposta padrão da API)."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=str,
+    ).encode("utf-8")
+
+
+def resposta_bytes(
+    corpo: bytes,
+    media_type: str,
+    status_code: int = 200,
+    codificacao: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Cria uma resposta a partir de bytes já renderizados.
+
+    Se uma codificação foi negociada e o corpo passa do limite mínimo,
+    envia a variante comprimida (calculada uma vez por corpo).
+    """
+    headers = dict(headers or {})
+    if compressao.deve_comprimir(corpo):
+        headers["Vary"] = "Accept-Encoding"
+        if codificacao:
+            corpo = compressao.comprimir(corpo, codificacao)
+            headers["Content-Encoding"] = codificacao
+    return Response(content=corpo, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Se o header If-None-Match cita o ETag (comparação fraca, como pede o HTTP).
+
+    O header é uma lista separada por vírgulas (ou "*"); W/"x" e "x" são
+    o mesmo ETag nessa comparação.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag.removeprefix("W/")
+    return any(
+        candidato.strip().removeprefix("W/") == alvo
+        for candidato in if_none_match.split(",")
+    )
+
+
+def resposta_json(corpo: bytes, status_code: int = 200, codificacao: Optional[str] = None) -> Response:
+    """Cria uma resposta a partir de bytes JSON já renderizados."""
+    return resposta_bytes(corpo, MEDIA_TYPE_JSON, status_code=status_code, codificacao=codificacao)
+
+
+def _dicts_jogos(snapshot: Snapshot) -> List[Dict[str, Any]]:
+    """Jogos do snapshot já convertidos para dict JSON (uma vez por versão)."""
+    return snapshot.derivado(
+        "dicts_jogos",
+        lambda: [jogo.model_dump(mode="json") for jogo in snapshot.jogos],
+    )
+
+
+def _posicoes(snapshot: Snapshot) -> Dict[str, int]:
+    """Mapa jogo_id -> posição no snapshot (usado pelos cursores)."""
+    return snapshot.derivado(
+        "posicoes",
+        lambda: {jogo.jogo_id: posicao for posicao, jogo in enumerate(snapshot.jogos)},
+    )
+
+
+def validar_campos(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Valida o parâmetro `fields` (lista de campos separada por vírgula).
+
+    Returns:
+        Tupla de campos na ordem do modelo, ou None para todos
+
+    Raises:
+        ValueError: Se algum campo não existir
+    """
+    if not fields:
+        return None
+    pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    invalidos = pedidos - set(CAMPOS_JOGO)
+    if invalidos:
+        raise ValueError(
+            f"Campos inválidos: {', '.join(sorted(invalidos))}. "
+            f"Disponíveis: {', '.join(CAMPOS_JOGO)}"
+        )
+    return tuple(campo for campo in CAMPOS_JOGO if campo in pedidos)
+
+
+def _renderizar_calendario(
+    snapshot: Snapshot,
+    posicoes: List[int],
+    from_cache: bool,
+    pagina: Optional[Pagina] = None,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> bytes:
+    """
+    Renderiza um CalendarioResponse a partir de posições do snapshot.
+
+    A paginação e a projeção de campos são aplicadas antes da serialização:
+    só os jogos da página e os campos pedidos são codificados.
+    """
+    pagina = pagina or Pagina()
+    proximo_cursor = None
+
+    if pagina.cursor:
+        posicao_cursor = _posicoes(snapshot).get(pagina.cursor)
+        if posicao_cursor is None:
+            raise ValueError("Cursor inválido ou expirado (os dados foram atualizados)")
+        posicoes = posicoes[bisect_right(posicoes, posicao_cursor):]
+
+    if pagina.limit is not None and len(posicoes) > pagina.limit:
+        posicoes = posicoes[:pagina.limit]
+        proximo_cursor = snapshot.jogos[posicoes[-1]].jogo_id
+
+    dicts = _dicts_jogos(snapshot)
+    if estado.principal:
+        completos = [dicts[p] for p in posicoes]
+    else:
+        # Estado do alvo por cima dos dicts do snapshot (mesma ordem de campos)
+        completos = [{**dicts[p], **estado.campos(snapshot.jogos[p])} for p in posicoes]
+    if pagina.campos is None:
+        jogos = completos
+    else:
+        jogos = [{campo: dados[campo] for campo in pagina.campos} for dados in completos]
+
+    # Mesma estrutura (e ordem de campos) de CalendarioResponse
+    return serializar_json({
+        "sucesso": True,
+        "total_jogos": len(jogos),
+        "jogos": jogos,
+        "atualizado_em": snapshot.ultima_atualizacao.isoformat(),
+        "cache": from_cache,
+        "proximo_cursor": proximo_cursor,
+    })
+
+
+def _posicoes_da_fatia(
+    snapshot: Snapshot,
+    fatia: Tuple[int, int],
+    apenas_pendentes: bool = False,
+    apenas_no_calendario: bool = False,
+    filtros: Optional[Filtros] = None,
+    apenas_reagendados: bool = False,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> List[int]:
+    if filtros is not None:
+        posicoes = filtrar_fatia(snapshot, fatia, filtros)
+    else:
+        posicoes = range(fatia[0], fatia[1])
+    jogos = snapshot.jogos
+    if apenas_pendentes:
+        return [p for p in posicoes if not estado.no_calendario(jogos[p])]
+    if apenas_reagendados:
+        return [p for p in posicoes if estado.no_calendario(jogos[p]) and estado.anterior(jogos[p])]
+    if apenas_no_calendario:
+        return [p for p in posicoes if estado.no_calendario(jogos[p])]
+    return list(posicoes)
+
+
+def _memorizar(snapshot: Snapshot, chave: Any, estado: EstadoCalendario, fabrica: Callable[[], bytes]) -> bytes:
+    """Memoriza o corpo por versão do snapshot (só no calendário principal)."""
+    if estado.principal:
+        return snapshot.resposta(chave, fabrica)
+    return fabrica()
+
+
+def _filtros_ativos(filtros: Optional[Filtros]) -> Optional[Filtros]:
+    """Filtros vazios = sem filtro (mesma chave das respostas pré-renderizadas)."""
+    return filtros if filtros is not None and filtros.ativos else None
+
+
+def corpo_jogos(
+    snapshot: Snapshot,
+    from_cache: bool,
+    apenas_futuros: bool = True,
+    pagina: Optional[Pagina] = None,
+    agora=None,
+    filtros: Optional[Filtros] = None,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> bytes:
+    """Corpo de GET /api/jogos."""
+    filtros = _filtros_ativos(filtros)
+    if apenas_futuros:
+        fatia = consultas.fatia_futuros(snapshot, agora)
+    else:
+        fatia = (0, len(snapshot.jogos))
+    return _memorizar(
+        snapshot,
+        ("jogos", fatia, from_cache, pagina, filtros),
+        estado,
+        lambda: _renderizar_calendario(
+            snapshot, _posicoes_da_fatia(snapshot, fatia, filtros=filtros), from_cache, pagina, estado
+        ),
+    )
+
+
+def corpo_semana(
+    snapshot: Snapshot,
+    from_cache: bool,
+    semanas: int = 1,
+    apenas_pendentes: bool = False,
+    pagina: Optional[Pagina] = None,
+    agora=None,
+    filtros: Optional[Filtros] = None,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> bytes:
+    """Corpo de GET /api/jogos/semana, /api/jogos/semana/pendentes e /api/jogos/pendentes."""
+    filtros = _filtros_ativos(filtros)
+    fatia = consultas.fatia_semana(snapshot, semanas, agora)
+    return _memorizar(
+        snapshot,
+        ("semana", fatia, apenas_pendentes, from_cache, pagina, filtros),
+        estado,
+        lambda: _renderizar_calendario(
+            snapshot,
+            _posicoes_da_fatia(
+                snapshot, fatia, apenas_pendentes=apenas_pendentes, filtros=filtros, estado=estado
+            ),
+            from_cache,
+            pagina,
+            estado,
+        ),
+    )
+
+
+def corpo_calendario(
+    snapshot: Snapshot,
+    apenas_passados: bool = False,
+    pagina: Optional[Pagina] = None,
+    agora=None,
+    filtros: Optional[Filtros] = None,
+    apenas_reagendados: bool = False,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> bytes:
+    """Corpo de GET /api/jogos/calendario, /api/jogos/calendario/limpar e /api/jogos/reagendados."""
+    filtros = _filtros_ativos(filtros)
+    if apenas_passados:
+        fatia = consultas.fatia_passados_limpeza(snapshot, agora)
+    else:
+        fatia = (0, len(snapshot.jogos))
+    return _memorizar(
+        snapshot,
+        ("calendario", fatia, apenas_reagendados, pagina, filtros),
+        estado,
+        lambda: _renderizar_calendario(
+            snapshot,
+            _posicoes_da_fatia(
+                snapshot,
+                fatia,
+                apenas_no_calendario=True,
+                filtros=filtros,
+                apenas_reagendados=apenas_reagendados,
+                estado=estado,
+            ),
+            True,
+            pagina,
+            estado,
+        ),
+    )
+
+
+def corpo_proximo_jogo(
+    snapshot: Snapshot,
+    from_cache: bool,
+    agora=None,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> Optional[bytes]:
+    """Corpo de GET /api/proximo-jogo (None se não houver jogo futuro)."""
+    jogo = consultas.proximo_jogo(snapshot, agora)
+    if jogo is None:
+        return None
+    return _memorizar(
+        snapshot,
+        ("proximo", jogo.jogo_id, from_cache),
+        estado,
+        lambda: serializar_json(ProximoJogoResponse(
+            sucesso=True,
+            jogo=estado.aplicar(jogo),
+            atualizado_em=snapshot.ultima_atualizacao,
+            cache=from_cache,
+        ).model_dump(mode="json")),
+    )
+
+
+def corpo_consulta(
+    snapshot: Snapshot,
+    from_cache: bool,
+    consulta: ConsultaLote,
+    agora=None,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> bytes:
+    """
+    Corpo de uma consulta do lote (os mesmos bytes da rota GET equivalente).
+
+    Raises:
+        ValueError: Se fields, cursor ou filtros forem inválidos
+    """
+    pagina = Pagina(limit=consulta.limit, cursor=consulta.cursor, campos=validar_campos(consulta.fields))
+    filtros = criar_filtros(consulta.competicao, consulta.adversario, consulta.mandante, consulta.de, consulta.ate)
+    tipo = consulta.tipo
+
+    if tipo == "jogos":
+        return corpo_jogos(
+            snapshot, from_cache, apenas_futuros=consulta.apenas_futuros, pagina=pagina, agora=agora,
+            filtros=filtros, estado=estado,
+        )
+    if tipo == "semana":
+        return corpo_semana(
+            snapshot, from_cache, semanas=consulta.semanas or 1, pagina=pagina, agora=agora,
+            filtros=filtros, estado=estado,
+        )
+    if tipo == "semana_pendentes":
+        return corpo_semana(
+            snapshot, from_cache, semanas=consulta.semanas or 1, apenas_pendentes=True, pagina=pagina,
+            agora=agora, filtros=filtros, estado=estado,
+        )
+    if tipo == "pendentes":
+        return corpo_semana(
+            snapshot, True, semanas=consulta.semanas or 4, apenas_pendentes=True, pagina=pagina,
+            agora=agora, filtros=filtros, estado=estado,
+        )
+    if tipo == "calendario":
+        return corpo_calendario(snapshot, pagina=pagina, agora=agora, filtros=filtros, estado=estado)
+    if tipo == "calendario_limpar":
+        return corpo_calendario(
+            snapshot, apenas_passados=True, pagina=pagina, agora=agora, filtros=filtros, estado=estado
+        )
+
+    # proximo_jogo: sem jogo futuro retorna jogo=null (a rota GET retorna 404)
+    corpo = corpo_proximo_jogo(snapshot, from_cache, agora=agora, estado=estado)
+    if corpo is None:
+        corpo = snapshot.resposta(
+            ("proximo", None, from_cache),
+            lambda: serializar_json(ProximoJogoResponse(
+                sucesso=True,
+                jogo=None,
+                atualizado_em=snapshot.ultima_atualizacao,
+                cache=from_cache,
+            ).model_dump(mode="json")),
+        )
+    return corpo
+
+
+def validar_lote(consultas_lote: Dict[str, ConsultaLote]):
+    """
+    Valida fields e filtros de todas as consultas, antes de buscar o snapshot.
+
+    Raises:
+        ValueError: Se alguma consulta tiver fields ou filtros inválidos
+    """
+    for nome, consulta in consultas_lote.items():
+        try:
+            validar_campos(consulta.fields)
+            criar_filtros(consulta.competicao, consulta.adversario, consulta.mandante, consulta.de, consulta.ate)
+        except ValueError as e:
+            raise ValueError(f"Consulta '{nome}': {e}")
+
+
+def corpo_lote(
+    snapshot: Snapshot,
+    from_cache: bool,
+    consultas_lote: Dict[str, ConsultaLote],
+    agora=None,
+    estados: Optional[Dict[Optional[str], EstadoCalendario]] = None,
+) -> bytes:
+    """
+    Corpo de POST /api/lote.
+
+    Todas as consultas usam o mesmo snapshot e o mesmo "agora", então os
+    resultados são consistentes entre si. Cada resultado reaproveita os
+    bytes já renderizados da rota equivalente. `estados` traz o estado de
+    cada alvo pedido nas consultas (ausente = calendário principal).
+
+    Raises:
+        ValueError: Se alguma consulta tiver fields ou cursor inválidos
+    """
+    agora = agora or agora_sp()
+    corpos = []
+    memorizavel = True
+    for nome, consulta in consultas_lote.items():
+        try:
+            estado = (estados or {}).get(consulta.alvo, PRINCIPAL)
+            memorizavel = memorizavel and estado.principal
+            corpos.append((nome, corpo_consulta(snapshot, from_cache, consulta, agora=agora, estado=estado)))
+        except ValueError as e:
+            raise ValueError(f"Consulta '{nome}': {e}")
+
+    def renderizar() -> bytes:
+        resultados = b",".join(serializar_json(nome) + b":" + corpo for nome, corpo in corpos)
+        return (
+            b'{"sucesso":true,"atualizado_em":'
+            + serializar_json(snapshot.ultima_atualizacao.isoformat())
+            + b',"cache":' + serializar_json(from_cache)
+            + b',"resultados":{' + resultados + b"}}"
+        )
+
+    # Estado de alvo muda sem nova versão do snapshot: não memoriza
+    if not memorizavel:
+        return renderizar()
+    # Chave com os próprios corpos: mesma combinação de resultados, mesmos bytes
+    return snapshot.resposta(("lote", tuple(corpos), from_cache), renderizar)
+
+
+def corpo_reconciliacao(
+    snapshot: Snapshot,
+    plano: Plano,
+    aplicado: bool = False,
+    campos: Optional[Tuple[str, ...]] = None,
+    estado: EstadoCalendario = PRINCIPAL,
+) -> bytes:
+    """
+    Corpo de POST /api/calendario/reconciliar.
+
+    Os jogos de criar/atualizar reaproveitam os dicts do snapshot (com a
+    projeção de `campos`); remoções e correções levam só os IDs.
+    """
+    dicts = _dicts_jogos(snapshot)
+    posicoes = _posicoes(snapshot)
+
+    def jogo_json(jogo: Jogo) -> Dict[str, Any]:
+        dados = dicts[posicoes[jogo.jogo_id]]
+        if not estado.principal:
+            dados = {**dados, **estado.campos(jogo)}
+        if campos is None:
+            return dados
+        return {campo: dados[campo] for campo in campos}
+
+    # Mesma estrutura (e ordem de campos) de ReconciliacaoResponse
+    return serializar_json({
+        "sucesso": True,
+        "atualizado_em": snapshot.ultima_atualizacao.isoformat(),
+        "aplicado": aplicado,
+        "resumo": {
+            "criar": len(plano.criar),
+            "atualizar": len(plano.atualizar),
+            "remover": len(plano.remover),
+            "corrigir": len(plano.corrigir),
+            "sem_mudanca": plano.sem_mudanca,
+        },
+        "criar": [jogo_json(jogo) for jogo in plano.criar],
+        "atualizar": [
+            {"google_event_id": item.google_event_id, "jogo": jogo_json(item.jogo)}
+            for item in plano.atualizar
+        ],
+        "remover": [item._asdict() for item in plano.remover],
+        "corrigir": [
+            {
+                "jogo_id": item.jogo.jogo_id,
+                "acao": item.acao,
+                "google_event_id": item.google_event_id,
+                "motivo": item.motivo,
+            }
+            for item in plano.corrigir
+        ],
+    })
+
+
+def prerenderizar(snapshot: Snapshot):
+    """
+    Renderiza as respostas mais usadas (chamado no aquecimento).
+
+    Args:
+        snapshot: Snapshot recém-carregado
+    """
+    corpos = [
+        corpo_jogos(snapshot, from_cache=True),
+        corpo_semana(snapshot, from_cache=True),
+        corpo_semana(snapshot, from_cache=True, apenas_pendentes=True),
+        corpo_semana(snapshot, from_cache=True, semanas=4, apenas_pendentes=True),
+        corpo_proximo_jogo(snapshot, from_cache=True),
+        corpo_calendario(snapshot),
+        corpo_calendario(snapshot, apenas_passados=True),
+    ]
+    for corpo in corpos:
+        compressao.aquecer(corpo)
@@ -1,12 +1,19 @@
 """
 Rotas da API de Calendário do SPFC.
 """
-from fastapi import APIRouter, Depends, HTTPException, Security, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Request, Security, Query, Path
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
+import logging
 
+from app.alvos import PRINCIPAL, EstadoCalendario, get_registro_alvos
+from app.compressao import codificacao_aceita
 from app.config import get_settings, Settings
+from app.execucao import executar_io
+from app.fuso_horario import agora as agora_sp
+from app.indices import Filtros, criar_filtros
+from app.middleware.rate_limiter import obter_ip_chamador
 from app.models import (
     CalendarioResponse,
     ProximoJogoResponse,
@@ -14,20 +21,30 @@ from app.models import (
     ErrorResponse,
     CacheInfoResponse,
     MarcarJogoRequest,
+    PADRAO_ALVO,
 )
 from app.scraper import (
-    scrape_calendario, 
+    obter_snapshot,
+    obter_snapshot_cache,
     limpar_cache, 
     obter_info_cache,
-    ordenar_jogos,
-    filtrar_jogos_futuros,
-    filtrar_jogos_semana,
+    obter_metricas_atualizacao,
     obter_jogo_hoje_para_exibicao,
     marcar_jogo_no_calendario,
     desmarcar_jogo_do_calendario,
-    obter_jogos_no_calendario,
-    obter_jogos_passados_no_calendario,
 )
+from app.rendering import (
+    Pagina,
+    validar_campos,
+    resposta_json,
+    corpo_jogos,
+    corpo_semana,
+    corpo_calendario,
+    corpo_proximo_jogo,
+)
+from app.refresh_policy import get_controle_force_refresh
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["Calendário SPFC"])
 
@@ -55,6 +72,109 @@ async def verificar_api_key(
     return True
 
 
+async def admitir_force_refresh(request: Request, solicitado: bool) -> bool:
+    """
+    Aplica o controle de admissão a um pedido de force_refresh.
+    
+    Admitir gasta a cota do chamador e o intervalo mínimo, então as rotas
+    chamam esta função no corpo do handler, depois que todos os parâmetros
+    foram validados: uma requisição recusada com 400/422 não gasta nada.
+    Se o pedido for recusado, a rota responde com o snapshot atual e o
+    motivo vai no header X-Force-Refresh-Negado.
+    
+    Args:
+        request: Requisição (identifica o chamador pelo IP; ver obter_ip_chamador)
+        solicitado: Se o cliente pediu force_refresh
+        
+    Returns:
+        True se o scraping foi admitido
+    """
+    if not solicitado:
+        return False
+    chamador = obter_ip_chamador(request)
+    # O registro de créditos é lido de data/creditos.json: fora do event loop
+    decisao = await executar_io(get_controle_force_refresh().admitir, chamador, agora_sp())
+    if not decisao.atualizar:
+        request.state.force_refresh_negado = decisao.motivo
+        logger.warning(f"🚫 force_refresh recusado para {chamador}: {decisao.motivo}")
+    return decisao.atualizar
+
+
+def parametro_force_refresh(
+    force_refresh: bool = Query(
+        False,
+        description="Se True, ignora o cache e faz novo scraping (sujeito a intervalo mínimo e cotas)"
+    ),
+) -> bool:
+    """force_refresh pedido pelo cliente (a admissão fica no handler: admitir_force_refresh)."""
+    return force_refresh
+
+
+def parametros_lista(
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=500,
+        description="Máximo de jogos por página (sem limit, retorna todos)"
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (campo proximo_cursor da resposta anterior)"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Campos de cada jogo, separados por vírgula (ex: adversario,data_iso,local)"
+    ),
+) -> Pagina:
+    """Paginação e projeção de campos das listagens."""
+    try:
+        campos = validar_campos(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Pagina(limit=limit, cursor=cursor, campos=campos)
+
+
+def parametros_filtro(
+    competicao: Optional[str] = Query(
+        None,
+        description="Palavras do nome da competição, sem diferenciar acentos (ex: libertadores)"
+    ),
+    adversario: Optional[str] = Query(
+        None,
+        description="Início do nome do adversário, sem diferenciar acentos (ex: palm)"
+    ),
+    mandante: Optional[bool] = Query(
+        None,
+        description="True = jogos em casa, False = jogos fora"
+    ),
+    de: Optional[date] = Query(None, description="Data inicial (YYYY-MM-DD, inclusiva)"),
+    ate: Optional[date] = Query(None, description="Data final (YYYY-MM-DD, inclusiva)"),
+) -> Filtros:
+    """Filtros de busca das listagens (atendidos pelos índices do snapshot)."""
+    try:
+        return criar_filtros(competicao, adversario, mandante, de, ate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def parametro_alvo(
+    alvo: Optional[str] = Query(
+        None,
+        pattern=PADRAO_ALVO,
+        description="Calendário adicional (ex: familia); vazio = calendário principal"
+    ),
+) -> Optional[str]:
+    """Calendário alvo da consulta ou marcação (None = principal)."""
+    return alvo or None
+
+
+async def estado_alvo(alvo: Optional[str] = Depends(parametro_alvo)) -> EstadoCalendario:
+    """Dependência: estado de sincronização do calendário pedido."""
+    if alvo is None:
+        return PRINCIPAL
+    return await executar_io(get_registro_alvos().estado, alvo)
+
+
 @router.get(
     "/jogos",
     response_model=CalendarioResponse,
@@ -68,39 +188,38 @@ async def verificar_api_key(
     
     Parâmetros:
     - **apenas_futuros**: Filtra apenas jogos que ainda não aconteceram (recomendado para Google Calendar)
-    - **force_refresh**: Ignora o cache e faz nova requisição ao Firecrawl (gasta créditos)
+    - **force_refresh**: Ignora o cache e faz nova requisição ao Firecrawl (gasta créditos;
+      sujeito a intervalo mínimo e cotas, veja o header X-Force-Refresh-Negado)
     """
 )
 async def listar_jogos(
-    force_refresh: bool = Query(
-        False, 
-        description="Se True, ignora o cache e faz novo scraping"
-    ),
+    request: Request,
+    force_refresh: bool = Depends(parametro_force_refresh),
     apenas_futuros: bool = Query(
         True,
         description="Se True, retorna apenas jogos que ainda não aconteceram"
     ),
+    pagina: Pagina = Depends(parametros_lista),
+    filtros: Filtros = Depends(parametros_filtro),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
     _: bool = Depends(verificar_api_key)
 ):
     """Lista todos os jogos do calendário do SPFC."""
+    force_refresh = await admitir_force_refresh(request, force_refresh)
     try:
-        jogos, from_cache = await scrape_calendario(force_refresh=force_refresh)
+        snapshot, from_cache = await obter_snapshot(force_refresh=force_refresh)
         
-        # Ordenar por data
-        jogos = ordenar_jogos(jogos)
-        
-        # Filtrar apenas futuros se solicitado
-        if apenas_futuros:
-            jogos = filtrar_jogos_futuros(jogos)
-        
-        return CalendarioResponse(
-            sucesso=True,
-            total_jogos=len(jogos),
-            jogos=jogos,
-            atualizado_em=datetime.now(),
-            cache=from_cache
+        # Jogos já ordenados por data no snapshot; resposta renderizada uma vez por versão
+        return resposta_json(
+            corpo_jogos(
+                snapshot, from_cache, apenas_futuros=apenas_futuros, pagina=pagina, filtros=filtros, estado=estado
+            ),
+            codificacao=codificacao,
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -120,33 +239,27 @@ async def listar_jogos(
     description="Retorna apenas o próximo jogo do São Paulo FC."
 )
 async def proximo_jogo(
-    force_refresh: bool = Query(
-        False, 
-        description="Se True, ignora o cache e faz novo scraping"
-    ),
+    request: Request,
+    force_refresh: bool = Depends(parametro_force_refresh),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
     _: bool = Depends(verificar_api_key)
 ):
     """Retorna o próximo jogo do SPFC."""
+    force_refresh = await admitir_force_refresh(request, force_refresh)
     try:
-        jogos, from_cache = await scrape_calendario(force_refresh=force_refresh)
+        snapshot, from_cache = await obter_snapshot(force_refresh=force_refresh)
         
-        # Ordenar e filtrar apenas futuros
-        jogos = ordenar_jogos(jogos)
-        jogos = filtrar_jogos_futuros(jogos)
+        # Primeiro jogo futuro (snapshot já ordenado por data)
+        corpo = corpo_proximo_jogo(snapshot, from_cache, estado=estado)
         
-        if not jogos:
+        if corpo is None:
             raise HTTPException(
                 status_code=404,
                 detail="Nenhum jogo futuro encontrado no calendário"
             )
         
-        # Retornar o primeiro jogo (já ordenado por data)
-        return ProximoJogoResponse(
-            sucesso=True,
-            jogo=jogos[0],
-            atualizado_em=datetime.now(),
-            cache=from_cache
-        )
+        return resposta_json(corpo, codificacao=codificacao)
         
     except HTTPException:
         raise
@@ -176,22 +289,22 @@ async def proximo_jogo(
     """
 )
 async def jogo_hoje_ao_vivo(
-    force_refresh: bool = Query(
-        False,
-        description="Se True, ignora o cache e faz novo scraping"
-    ),
+    request: Request,
+    force_refresh: bool = Depends(parametro_force_refresh),
+    estado: EstadoCalendario = Depends(estado_alvo),
     _: bool = Depends(verificar_api_key)
 ):
     """Retorna jogo de hoje com status temporal, priorizando jogo ao vivo."""
+    force_refresh = await admitir_force_refresh(request, force_refresh)
     try:
-        jogos, from_cache = await scrape_calendario(force_refresh=force_refresh)
+        snapshot, from_cache = await obter_snapshot(force_refresh=force_refresh)
 
         # Seleciona jogo de hoje, priorizando o que estiver ao vivo agora
-        jogo, status_jogo, tempo_decorrido = obter_jogo_hoje_para_exibicao(jogos)
+        jogo, status_jogo, tempo_decorrido = obter_jogo_hoje_para_exibicao(snapshot.jogos)
 
         return JogoAoVivoResponse(
             sucesso=True,
-            jogo=jogo,
+            jogo=estado.aplicar(jogo) if jogo else None,
             status_jogo=status_jogo,
             tempo_decorrido_minutos=tempo_decorrido,
             atualizado_em=datetime.now(),
@@ -221,34 +334,32 @@ async def jogo_hoje_ao_vivo(
     """
 )
 async def jogos_da_semana(
+    request: Request,
     semanas: int = Query(
         1,
         ge=1,
         le=8,
         description="Número de semanas a considerar (1-8)"
     ),
-    force_refresh: bool = Query(
-        False, 
-        description="Se True, ignora o cache e faz novo scraping"
-    ),
+    force_refresh: bool = Depends(parametro_force_refresh),
+    pagina: Pagina = Depends(parametros_lista),
+    filtros: Filtros = Depends(parametros_filtro),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
     _: bool = Depends(verificar_api_key)
 ):
     """Retorna jogos das próximas N semanas."""
+    force_refresh = await admitir_force_refresh(request, force_refresh)
     try:
-        jogos, from_cache = await scrape_calendario(force_refresh=force_refresh)
-        
-        # Ordenar e filtrar jogos da semana
-        jogos = ordenar_jogos(jogos)
-        jogos = filtrar_jogos_semana(jogos, semanas=semanas)
+        snapshot, from_cache = await obter_snapshot(force_refresh=force_refresh)
         
-        return CalendarioResponse(
-            sucesso=True,
-            total_jogos=len(jogos),
-            jogos=jogos,
-            atualizado_em=datetime.now(),
-            cache=from_cache
+        return resposta_json(
+            corpo_semana(snapshot, from_cache, semanas=semanas, pagina=pagina, filtros=filtros, estado=estado),
+            codificacao=codificacao,
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -278,37 +389,36 @@ async def jogos_da_semana(
     """
 )
 async def jogos_semana_pendentes(
+    request: Request,
     semanas: int = Query(
         1,
         ge=1,
         le=8,
         description="Número de semanas a considerar (1-8)"
     ),
-    force_refresh: bool = Query(
-        False, 
-        description="Se True, ignora o cache e faz novo scraping"
-    ),
+    force_refresh: bool = Depends(parametro_force_refresh),
+    pagina: Pagina = Depends(parametros_lista),
+    filtros: Filtros = Depends(parametros_filtro),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
     _: bool = Depends(verificar_api_key)
 ):
     """Retorna jogos da semana que ainda não foram criados no calendário."""
+    force_refresh = await admitir_force_refresh(request, force_refresh)
     try:
-        jogos, from_cache = await scrape_calendario(force_refresh=force_refresh)
-        
-        # Ordenar e filtrar jogos da semana
-        jogos = ordenar_jogos(jogos)
-        jogos = filtrar_jogos_semana(jogos, semanas=semanas)
-        
-        # Filtrar apenas não criados no calendário
-        jogos = [j for j in jogos if not j.criado_no_calendario]
+        snapshot, from_cache = await obter_snapshot(force_refresh=force_refresh)
         
-        return CalendarioResponse(
-            sucesso=True,
-            total_jogos=len(jogos),
-            jogos=jogos,
-            atualizado_em=datetime.now(),
-            cache=from_cache
+        # Jogos da semana ainda não criados no calendário
+        return resposta_json(
+            corpo_semana(
+                snapshot, from_cache, semanas=semanas, apenas_pendentes=True, pagina=pagina, filtros=filtros,
+                estado=estado,
+            ),
+            codificacao=codificacao,
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -327,7 +437,7 @@ async def jogos_semana_pendentes(
 )
 async def limpar_cache_endpoint(_: bool = Depends(verificar_api_key)):
     """Limpa o cache de jogos."""
-    limpar_cache()
+    await executar_io(limpar_cache)
     return {
         "sucesso": True,
         "mensagem": "Cache limpo com sucesso",
@@ -352,10 +462,27 @@ async def limpar_cache_endpoint(_: bool = Depends(verificar_api_key)):
 )
 async def status_cache(_: bool = Depends(verificar_api_key)):
     """Retorna status do cache."""
-    info = obter_info_cache()
+    info = await executar_io(obter_info_cache)
     return CacheInfoResponse(**info)
 
 
+@router.get(
+    "/cache/metricas",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Métricas de atualização do cache",
+    description="""
+    Mostra a política de atualização em uso, a idade dos dados e os
+    créditos do Firecrawl gastos no período (com o orçamento restante).
+    """
+)
+async def metricas_cache(_: bool = Depends(verificar_api_key)):
+    """Retorna métricas de frescor dos dados x créditos gastos."""
+    return await executar_io(obter_metricas_atualizacao)
+
+
 # =============================================================================
 # Endpoints de Controle do Google Calendar
 # =============================================================================
@@ -378,12 +505,13 @@ async def status_cache(_: bool = Depends(verificar_api_key)):
 async def marcar_jogo_calendario(
     jogo_id: str = Path(..., description="ID único do jogo (campo jogo_id)"),
     request: Optional[MarcarJogoRequest] = None,
+    alvo: Optional[str] = Depends(parametro_alvo),
     _: bool = Depends(verificar_api_key)
 ):
     """Marca jogo como criado no calendário."""
     google_event_id = request.google_event_id if request else None
     
-    sucesso = marcar_jogo_no_calendario(jogo_id, google_event_id)
+    sucesso = await executar_io(marcar_jogo_no_calendario, jogo_id, google_event_id, alvo=alvo)
     
     if not sucesso:
         raise HTTPException(
@@ -395,6 +523,7 @@ async def marcar_jogo_calendario(
         "sucesso": True,
         "mensagem": f"Jogo {jogo_id} marcado como criado no calendário",
         "google_event_id": google_event_id,
+        "alvo": alvo,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -415,10 +544,11 @@ async def marcar_jogo_calendario(
 )
 async def desmarcar_jogo_calendario(
     jogo_id: str = Path(..., description="ID único do jogo"),
+    alvo: Optional[str] = Depends(parametro_alvo),
     _: bool = Depends(verificar_api_key)
 ):
     """Desmarca jogo do calendário."""
-    google_event_id = desmarcar_jogo_do_calendario(jogo_id)
+    google_event_id = await executar_io(desmarcar_jogo_do_calendario, jogo_id, alvo=alvo)
     
     if not google_event_id:
         raise HTTPException(
@@ -430,6 +560,7 @@ async def desmarcar_jogo_calendario(
         "sucesso": True,
         "mensagem": f"Jogo {jogo_id} desmarcado do calendário",
         "google_event_id": google_event_id,
+        "alvo": alvo,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -447,18 +578,23 @@ async def desmarcar_jogo_calendario(
     Útil para verificar quais jogos já foram sincronizados.
     """
 )
-async def listar_jogos_calendario(_: bool = Depends(verificar_api_key)):
+async def listar_jogos_calendario(
+    pagina: Pagina = Depends(parametros_lista),
+    filtros: Filtros = Depends(parametros_filtro),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
+    _: bool = Depends(verificar_api_key)
+):
     """Lista jogos que estão no calendário."""
-    jogos = obter_jogos_no_calendario()
-    jogos = ordenar_jogos(jogos)
+    snapshot = await executar_io(obter_snapshot_cache)
     
-    return CalendarioResponse(
-        sucesso=True,
-        total_jogos=len(jogos),
-        jogos=jogos,
-        atualizado_em=datetime.now(),
-        cache=True
-    )
+    try:
+        return resposta_json(
+            corpo_calendario(snapshot, pagina=pagina, filtros=filtros, estado=estado),
+            codificacao=codificacao,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get(
@@ -479,18 +615,60 @@ async def listar_jogos_calendario(_: bool = Depends(verificar_api_key)):
     Isso mantém seu calendário limpo, removendo jogos antigos automaticamente.
     """
 )
-async def listar_jogos_para_limpar(_: bool = Depends(verificar_api_key)):
+async def listar_jogos_para_limpar(
+    pagina: Pagina = Depends(parametros_lista),
+    filtros: Filtros = Depends(parametros_filtro),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
+    _: bool = Depends(verificar_api_key)
+):
     """Lista jogos passados que precisam ser removidos do calendário."""
-    jogos = obter_jogos_passados_no_calendario()
-    jogos = ordenar_jogos(jogos)
+    snapshot = await executar_io(obter_snapshot_cache)
     
-    return CalendarioResponse(
-        sucesso=True,
-        total_jogos=len(jogos),
-        jogos=jogos,
-        atualizado_em=datetime.now(),
-        cache=True
-    )
+    try:
+        return resposta_json(
+            corpo_calendario(snapshot, apenas_passados=True, pagina=pagina, filtros=filtros, estado=estado),
+            codificacao=codificacao,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/jogos/reagendados",
+    response_model=CalendarioResponse,
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Jogos reagendados (evento do calendário a atualizar)",
+    description="""
+    Retorna jogos que estão no Google Calendar e mudaram de horário depois
+    da marcação. O jogo_id é mantido no reagendamento; `data_iso_anterior`
+    traz o horário que ainda está no evento.
+    
+    Perfeito para workflow de atualização:
+    1. Chamar este endpoint
+    2. Para cada jogo, atualizar o evento (google_event_id) com data_iso/data_fim_iso
+    3. Chamar POST /api/jogos/{jogo_id}/marcar-calendario com o mesmo google_event_id
+    """
+)
+async def listar_jogos_reagendados(
+    pagina: Pagina = Depends(parametros_lista),
+    filtros: Filtros = Depends(parametros_filtro),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
+    _: bool = Depends(verificar_api_key)
+):
+    """Lista jogos do calendário cujo horário mudou."""
+    snapshot = await executar_io(obter_snapshot_cache)
+    
+    try:
+        return resposta_json(
+            corpo_calendario(snapshot, apenas_reagendados=True, pagina=pagina, filtros=filtros, estado=estado),
+            codificacao=codificacao,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get(
@@ -516,22 +694,23 @@ async def listar_jogos_pendentes(
         le=8,
         description="Número de semanas a considerar (1-8)"
     ),
+    pagina: Pagina = Depends(parametros_lista),
+    filtros: Filtros = Depends(parametros_filtro),
+    estado: EstadoCalendario = Depends(estado_alvo),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
     _: bool = Depends(verificar_api_key)
 ):
     """Lista jogos futuros que não estão no calendário."""
-    jogos, _ = await scrape_calendario()
-    
-    # Ordenar, filtrar futuros e da semana
-    jogos = ordenar_jogos(jogos)
-    jogos = filtrar_jogos_semana(jogos, semanas=semanas)
-    
-    # Filtrar apenas os que NÃO estão no calendário
-    jogos_pendentes = [j for j in jogos if not j.criado_no_calendario]
+    snapshot, _ = await obter_snapshot()
     
-    return CalendarioResponse(
-        sucesso=True,
-        total_jogos=len(jogos_pendentes),
-        jogos=jogos_pendentes,
-        atualizado_em=datetime.now(),
-        cache=True
-    )
+    # Jogos das próximas semanas que NÃO estão no calendário
+    try:
+        return resposta_json(
+            corpo_semana(
+                snapshot, True, semanas=semanas, apenas_pendentes=True, pagina=pagina, filtros=filtros,
+                estado=estado,
+            ),
+            codificacao=codificacao,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
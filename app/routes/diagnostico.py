@@ -0,0 +1,46 @@
+"""
+Rotas de diagnóstico da API (inicialização, desempenho).
+"""
+from fastapi import APIRouter, Depends
+
+from app.execucao import get_monitor_loop
+from app.models import ErrorResponse
+from app.routes.calendario import verificar_api_key
+from app.startup import obter_relatorio
+
+router = APIRouter(prefix="/api/diagnostico", tags=["Diagnóstico"])
+
+
+@router.get(
+    "/inicializacao",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Relatório de inicialização",
+    description="""
+    Retorna o tempo de import de cada módulo, o tempo até a aplicação
+    ficar pronta e o tempo até a primeira requisição ser atendida.
+    """
+)
+async def relatorio_inicializacao(_: bool = Depends(verificar_api_key)):
+    """Retorna o relatório de inicialização."""
+    return obter_relatorio()
+
+
+@router.get(
+    "/loop",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Travamentos do event loop",
+    description="""
+    Lista os travamentos do event loop acima de MONITOR_LOOP_LIMITE_MS:
+    duração, handler da rota que estava rodando e a linha que bloqueou.
+    Inclui o uso do pool de threads de I/O do cache.
+    """
+)
+async def travamentos_loop(_: bool = Depends(verificar_api_key)):
+    """Retorna o relatório do monitor do event loop."""
+    return get_monitor_loop().relatorio()
@@ -0,0 +1,43 @@
+"""
+Rota das estatísticas materializadas dos jogos.
+"""
+from fastapi import APIRouter, Depends
+from typing import Optional
+
+from app.compressao import codificacao_aceita
+from app.estatisticas import obter_estatisticas
+from app.execucao import executar_io
+from app.models import ErrorResponse
+from app.rendering import resposta_json
+from app.routes.calendario import verificar_api_key
+from app.scraper import obter_snapshot_cache
+
+router = APIRouter(prefix="/api", tags=["Estatísticas"])
+
+
+@router.get(
+    "/estatisticas",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Estatísticas dos jogos",
+    description="""
+    Retorna agregados dos jogos do cache, prontos para dashboards (Grafana, n8n):
+    
+    - jogos por competição e por mês
+    - mando de campo (casa/fora) e proporção de jogos em casa
+    - cobertura de sincronização com o Google Calendar
+    - próximo jogo de cada competição
+    
+    Os agregados são atualizados quando o cache muda (não percorrem a
+    lista de jogos a cada requisição). Não usa o Firecrawl.
+    """
+)
+async def estatisticas_jogos(
+    codificacao: Optional[str] = Depends(codificacao_aceita),
+    _: bool = Depends(verificar_api_key)
+):
+    """Retorna as estatísticas materializadas."""
+    snapshot = await executar_io(obter_snapshot_cache)
+    return resposta_json(obter_estatisticas(snapshot).corpo(snapshot), codificacao=codificacao)
@@ -0,0 +1,67 @@
+"""
+Rota de exportação dos jogos (NDJSON/CSV em streaming).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime, time, timedelta
+from typing import Literal, Optional
+
+from app.execucao import executar_io
+from app.exportacao import FORMATOS, exportar, jogos_do_historico, jogos_do_snapshot
+from app.fuso_horario import FUSO_SP
+from app.models import ErrorResponse
+from app.routes.calendario import verificar_api_key
+from app.scraper import obter_snapshot_cache
+
+router = APIRouter(prefix="/api", tags=["Exportação"])
+
+
+@router.get(
+    "/exportar",
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+            "description": "Jogos, um por linha",
+        },
+        400: {"model": ErrorResponse, "description": "Parâmetros inválidos"},
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Exportar jogos (NDJSON/CSV)",
+    description="""
+    Exporta os jogos em streaming, um por linha, para análises.
+    
+    - **origem**: `cache` (jogos atuais do site) ou `historico` (todas as
+      temporadas arquivadas, inclusive jogos que saíram do site)
+    - **formato**: `ndjson` (um objeto JSON por linha) ou `csv`
+    - **de**/**ate**: intervalo de datas (inclusivo)
+    
+    Os jogos são lidos e enviados aos poucos: o consumo de memória não
+    depende do tamanho do histórico. Não usa o Firecrawl.
+    """
+)
+async def exportar_jogos(
+    formato: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de saída"),
+    origem: Literal["cache", "historico"] = Query("cache", description="Fonte dos jogos"),
+    de: Optional[date] = Query(None, description="Data inicial (YYYY-MM-DD, inclusiva)"),
+    ate: Optional[date] = Query(None, description="Data final (YYYY-MM-DD, inclusiva)"),
+    _: bool = Depends(verificar_api_key)
+):
+    """Exporta os jogos em NDJSON ou CSV."""
+    if de and ate and de > ate:
+        raise HTTPException(status_code=400, detail="'de' deve ser anterior ou igual a 'ate'")
+    
+    inicio = datetime.combine(de, time.min, tzinfo=FUSO_SP) if de else None
+    fim = datetime.combine(ate + timedelta(days=1), time.min, tzinfo=FUSO_SP) if ate else None
+    
+    if origem == "historico":
+        registros = jogos_do_historico(inicio, fim)
+    else:
+        registros = jogos_do_snapshot(await executar_io(obter_snapshot_cache), inicio, fim)
+    
+    # Gerador síncrono: o Starlette o percorre em threadpool (leitura de
+    # arquivo do histórico não bloqueia o event loop)
+    return StreamingResponse(
+        exportar(registros, formato),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="jogos-{origem}.{formato}"'},
+    )
@@ -0,0 +1,107 @@
+"""
+Rotas do feed iCalendar (.ics) para assinatura direta no Google Calendar.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, Security
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import List, Optional
+
+from app.compressao import codificacao_aceita
+from app.config import get_settings, Settings
+from app.ics import feed_ics
+from app.models import ErrorResponse
+from app.rendering import etag_corresponde, resposta_bytes
+from app.scraper import obter_snapshot
+
+router = APIRouter(prefix="/api", tags=["Feed iCalendar"])
+
+# Bearer opcional: clientes de calendário só conseguem autenticar via query string
+security_opcional = HTTPBearer(auto_error=False)
+
+
+async def verificar_token_feed(
+    token: Optional[str] = Query(None, description="Token de acesso ao feed (ICS_TOKEN)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(security_opcional),
+    settings: Settings = Depends(get_settings)
+) -> bool:
+    """
+    Verifica o token do feed (query string ou Bearer).
+    
+    Só o ICS_TOKEN é aceito: a URL do feed fica salva no calendário e nos
+    logs de proxies, então nunca leva a API_KEY. Sem ICS_TOKEN o feed fica
+    desativado.
+    """
+    if not settings.ics_token:
+        raise HTTPException(
+            status_code=404,
+            detail="Feed .ics desativado (ICS_TOKEN não configurado)"
+        )
+    
+    fornecido = token or (credentials.credentials if credentials else None)
+    
+    if fornecido != settings.ics_token:
+        raise HTTPException(
+            status_code=401,
+            detail="Token do feed inválido"
+        )
+    
+    return True
+
+
+@router.get(
+    "/calendario.ics",
+    response_class=Response,
+    responses={
+        200: {"content": {"text/calendar": {}}, "description": "Feed iCalendar"},
+        304: {"description": "Feed não mudou desde o ETag informado"},
+        401: {"model": ErrorResponse, "description": "Token inválido"},
+        404: {"model": ErrorResponse, "description": "Feed desativado (ICS_TOKEN não configurado)"},
+        500: {"model": ErrorResponse, "description": "Erro interno"},
+    },
+    summary="Feed iCalendar (.ics)",
+    description="""
+    Feed iCalendar com os jogos do cache, para assinar diretamente no
+    Google Calendar (Outros calendários > Do URL).
+    
+    - Cada jogo tem UID estável baseado no `jogo_id`
+    - **competicao** filtra por trecho do nome da competição (pode repetir)
+    - **token** autentica o feed com o ICS_TOKEN (clientes de calendário
+      não enviam headers); sem ICS_TOKEN configurado o feed fica desativado
+    
+    O feed só é gerado de novo quando os dados mudam, e responde com ETag
+    (`If-None-Match` retorna 304).
+    """
+)
+async def feed_calendario(
+    request: Request,
+    competicao: List[str] = Query(
+        [],
+        description="Filtra por competição (trecho do nome, ex: Libertadores)"
+    ),
+    codificacao: Optional[str] = Depends(codificacao_aceita),
+    _: bool = Depends(verificar_token_feed)
+):
+    """Retorna o feed .ics dos jogos."""
+    try:
+        snapshot, _ = await obter_snapshot()
+        conteudo, etag = feed_ics(snapshot, tuple(competicao))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao gerar feed: {str(e)}"
+        )
+    
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=900",
+    }
+    
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = 'inline; filename="spfc.ics"'
+    return resposta_bytes(
+        conteudo,
+        "text/calendar; charset=utf-8",
+        codificacao=codificacao,
+        headers=headers,
+    )
@@ -0,0 +1,84 @@
+"""
+Rotas do histórico de jogos por temporada.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+from app.archive import get_historico, registro_para_jogo
+from app.execucao import executar_io
+from app.fuso_horario import FUSO_SP
+from app.models import ErrorResponse, HistoricoResponse, TemporadaHistorico
+from app.routes.calendario import verificar_api_key
+
+router = APIRouter(prefix="/api/historico", tags=["Histórico"])
+
+
+@router.get(
+    "/temporadas",
+    response_model=List[TemporadaHistorico],
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Temporadas do histórico",
+    description="Lista as temporadas arquivadas e a quantidade de jogos de cada uma."
+)
+async def listar_temporadas(_: bool = Depends(verificar_api_key)):
+    """Lista as temporadas do histórico."""
+    # Percorre os arquivos das temporadas: fora do event loop
+    return await executar_io(get_historico().temporadas)
+
+
+@router.get(
+    "",
+    response_model=HistoricoResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Parâmetros inválidos"},
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Consultar histórico",
+    description="""
+    Retorna jogos do histórico (todos os jogos já vistos, inclusive os que
+    saíram do site), com o estado de sincronização do calendário.
+    
+    Filtre por **temporada** e/ou por intervalo de datas (**de**/**ate**).
+    A resposta é paginada: use o `proximo_cursor` retornado no parâmetro
+    **cursor** para buscar a próxima página.
+    """
+)
+async def consultar_historico(
+    temporada: Optional[int] = Query(None, ge=2000, le=2100, description="Ano da temporada"),
+    de: Optional[date] = Query(None, description="Data inicial (YYYY-MM-DD, inclusiva)"),
+    ate: Optional[date] = Query(None, description="Data final (YYYY-MM-DD, inclusiva)"),
+    limit: int = Query(100, ge=1, le=500, description="Máximo de jogos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor da página (campo proximo_cursor)"),
+    _: bool = Depends(verificar_api_key)
+):
+    """Consulta o histórico paginado."""
+    if temporada is None and de is None and ate is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe temporada e/ou intervalo de datas (de/ate)"
+        )
+    
+    inicio = datetime.combine(de, time.min, tzinfo=FUSO_SP) if de else None
+    fim = datetime.combine(ate + timedelta(days=1), time.min, tzinfo=FUSO_SP) if ate else None
+    
+    try:
+        registros, proximo_cursor = await executar_io(
+            get_historico().consultar,
+            inicio=inicio,
+            fim=fim,
+            temporada=temporada,
+            cursor=cursor,
+            limite=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return HistoricoResponse(
+        sucesso=True,
+        total_jogos=len(registros),
+        jogos=[registro_para_jogo(r) for r in registros],
+        proximo_cursor=proximo_cursor,
+    )
@@ -0,0 +1,81 @@
+"""
+Rota do proxy dos escudos dos adversários.
+"""
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+from typing import Dict, Optional
+
+from app.execucao import executar_io
+from app.logos import CACHE_CONTROL, TAMANHOS, chave_logo, get_cache_logos
+from app.models import ErrorResponse
+from app.scraper import obter_snapshot_cache
+from app.snapshot import Snapshot
+
+router = APIRouter(prefix="/api", tags=["Logos"])
+
+
+def _logos_do_snapshot(snapshot: Snapshot) -> Dict[str, str]:
+    """Mapa chave -> URL original dos escudos do snapshot (uma vez por versão)."""
+    return snapshot.derivado(
+        "logos",
+        lambda: {
+            chave_logo(jogo.adversario_logo): jogo.adversario_logo
+            for jogo in snapshot.jogos
+            if jogo.adversario_logo
+        },
+    )
+
+
+@router.get(
+    "/logos/{chave}",
+    responses={
+        200: {"content": {"image/png": {}, "image/jpeg": {}, "image/gif": {}, "image/webp": {}}, "description": "Escudo"},
+        302: {"description": "Download falhou: redireciona para a URL original"},
+        400: {"model": ErrorResponse, "description": "Tamanho inválido"},
+        404: {"model": ErrorResponse, "description": "Escudo desconhecido"},
+    },
+    summary="Escudo do adversário (proxy)",
+    description="""
+    Serve o escudo de um adversário a partir do cache local (`data/logos`).
+    
+    As URLs de `adversario_logo` retornadas pela API já apontam para cá.
+    O escudo é baixado do site do clube uma única vez; as respostas têm
+    `Cache-Control: immutable` e podem ser guardadas pelo navegador/CDN.
+    
+    - **tamanho**: miniatura de 32, 64 ou 128 px (PNG)
+    
+    Só formatos raster são servidos; escudos em SVG redirecionam para a
+    URL original.
+    
+    Não requer API Key (para uso direto em `<img>`), mas só serve escudos
+    de jogos conhecidos.
+    """
+)
+async def obter_logo(
+    request: Request,
+    chave: str = Path(..., description="Chave do escudo (final da URL de adversario_logo)"),
+    tamanho: Optional[int] = Query(None, description="Lado maior em pixels: 32, 64 ou 128"),
+):
+    """Serve o escudo (baixando-o na primeira vez)."""
+    if tamanho is not None and tamanho not in TAMANHOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tamanho inválido: {tamanho}. Use: {', '.join(map(str, TAMANHOS))}"
+        )
+    
+    cache = get_cache_logos()
+    snapshot = await executar_io(obter_snapshot_cache)
+    url = _logos_do_snapshot(snapshot).get(chave) or cache.url_conhecida(chave)
+    if url is None:
+        raise HTTPException(status_code=404, detail=f"Escudo '{chave}' não encontrado")
+    
+    logo = await cache.obter(chave, url, tamanho)
+    if logo is None:
+        # Melhor mostrar o escudo do site do que nenhum
+        return RedirectResponse(url, status_code=302, headers={"Cache-Control": "no-store"})
+    
+    etag = f'"{logo.etag}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(logo.caminho, media_type=logo.tipo, headers=headers)
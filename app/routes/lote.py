@@ -0,0 +1,64 @@
+"""
+Rota de consultas em lote (várias consultas em uma requisição).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
+
+from app.alvos import get_registro_alvos
+from app.compressao import codificacao_aceita
+from app.execucao import executar_io
+from app.models import ErrorResponse, LoteRequest, LoteResponse
+from app.rendering import corpo_lote, resposta_json, validar_lote
+from app.routes.calendario import admitir_force_refresh, verificar_api_key
+from app.scraper import obter_snapshot
+
+router = APIRouter(prefix="/api", tags=["Lote"])
+
+
+@router.post(
+    "/lote",
+    response_model=LoteResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Parâmetros inválidos em alguma consulta"},
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+        500: {"model": ErrorResponse, "description": "Erro interno"},
+    },
+    summary="Consultas em lote",
+    description="""
+    Executa várias consultas de leitura em uma única requisição.
+    
+    Cada consulta tem um nome e um `tipo` equivalente a uma rota GET
+    (`jogos`, `semana`, `semana_pendentes`, `pendentes`, `proximo_jogo`,
+    `calendario`, `calendario_limpar`), com os mesmos filtros.
+    
+    Todas as consultas são avaliadas sobre o mesmo snapshot do cache,
+    então os resultados são consistentes entre si. Ideal para o workflow
+    semanal do n8n: uma autenticação e uma requisição no rate limit.
+    """
+)
+async def consultar_lote(
+    request: LoteRequest,
+    http_request: Request,
+    codificacao: Optional[str] = Depends(codificacao_aceita),
+    _: bool = Depends(verificar_api_key)
+):
+    """Executa as consultas do lote sobre um único snapshot."""
+    try:
+        # Valida antes da admissão: um lote inválido não gasta a cota de force_refresh
+        validar_lote(request.consultas)
+        force_refresh = await admitir_force_refresh(http_request, request.force_refresh)
+        snapshot, from_cache = await obter_snapshot(force_refresh=force_refresh)
+        alvos = [consulta.alvo for consulta in request.consultas.values() if consulta.alvo]
+        estados = await executar_io(get_registro_alvos().estados, alvos) if alvos else None
+        return resposta_json(
+            corpo_lote(snapshot, from_cache, request.consultas, estados=estados),
+            codificacao=codificacao,
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao executar consultas: {str(e)}"
+        )
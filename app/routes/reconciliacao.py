@@ -0,0 +1,68 @@
+"""
+Rota de reconciliação do calendário (sincronização completa em uma requisição).
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from app.compressao import codificacao_aceita
+from app.execucao import executar_io
+from app.models import ErrorResponse, ReconciliacaoResponse, ReconciliarRequest
+from app.rendering import corpo_reconciliacao, resposta_json, validar_campos
+from app.routes.calendario import verificar_api_key
+from app.scraper import reconciliar_calendario
+
+router = APIRouter(prefix="/api", tags=["Reconciliação"])
+
+
+@router.post(
+    "/calendario/reconciliar",
+    response_model=ReconciliacaoResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Parâmetros inválidos"},
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Reconciliar com os eventos do Google Calendar",
+    description="""
+    Recebe os eventos que existem no Google Calendar (google_event_id e
+    início) e retorna, em uma passada sobre o cache, o plano completo:
+
+    - criar: jogos das próximas N semanas sem evento
+    - atualizar: eventos fora do horário atual do jogo (reagendamentos)
+    - remover: eventos de jogos passados, duplicados ou desconhecidos
+    - corrigir: marcações que não batem com o calendário
+
+    Com `aplicar=true`, as correções são aplicadas juntas (uma escrita);
+    eventos criados depois são reconhecidos na próxima reconciliação pelo
+    horário. Substitui as chamadas a pendentes, calendario/limpar,
+    reagendados e os marcar/desmarcar de cada jogo. Não usa o Firecrawl.
+    Com `alvo`, reconcilia um calendário adicional.
+    """
+)
+async def reconciliar(
+    request: ReconciliarRequest,
+    codificacao: Optional[str] = Depends(codificacao_aceita),
+    _: bool = Depends(verificar_api_key)
+):
+    """Calcula (e opcionalmente aplica) o plano de sincronização."""
+    try:
+        campos = validar_campos(request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.de and request.ate and request.de > request.ate:
+        raise HTTPException(status_code=400, detail="'de' deve ser anterior ou igual a 'ate'")
+
+    snapshot, plano, estado = await executar_io(
+        reconciliar_calendario,
+        request.eventos,
+        semanas=request.semanas,
+        de=request.de,
+        ate=request.ate,
+        aplicar=request.aplicar,
+        alvo=request.alvo,
+    )
+    # Só houve escrita se o plano tinha correções
+    aplicado = request.aplicar and bool(plano.corrigir)
+    return resposta_json(
+        corpo_reconciliacao(snapshot, plano, aplicado=aplicado, campos=campos, estado=estado),
+        codificacao=codificacao,
+    )
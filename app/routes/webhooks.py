@@ -0,0 +1,136 @@
+"""
+Rotas de gerenciamento dos webhooks de mudanças.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Path
+from datetime import datetime
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+from app.execucao import executar_io
+from app.models import ErrorResponse, WebhookRequest, WebhookResponse
+from app.routes.calendario import verificar_api_key
+from app.webhooks import EVENTOS, get_despachante
+
+router = APIRouter(prefix="/api/webhooks", tags=["Webhooks"])
+
+
+def _para_resposta(assinatura: Dict[str, Any]) -> WebhookResponse:
+    return WebhookResponse(
+        id=assinatura["id"],
+        url=assinatura["url"],
+        eventos=assinatura.get("eventos", []),
+        assinado=bool(assinatura.get("segredo")),
+        criado_em=assinatura["criado_em"],
+    )
+
+
+@router.get(
+    "",
+    response_model=List[WebhookResponse],
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Listar webhooks",
+    description="Lista os webhooks registrados."
+)
+async def listar_webhooks(_: bool = Depends(verificar_api_key)):
+    """Lista os webhooks registrados."""
+    assinaturas = await executar_io(get_despachante().registro.listar)
+    return [_para_resposta(a) for a in assinaturas]
+
+
+@router.post(
+    "",
+    response_model=WebhookResponse,
+    status_code=201,
+    responses={
+        400: {"model": ErrorResponse, "description": "URL ou eventos inválidos"},
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+    },
+    summary="Registrar webhook",
+    description="""
+    Registra uma URL para receber eventos de mudança (POST com JSON):
+    
+    - **jogo.adicionado** / **jogo.reagendado** / **jogo.removido**: após um scraping
+    - **calendario.marcado** / **calendario.desmarcado**: ao marcar/desmarcar um jogo
+    
+    Os eventos são agrupados em lotes e reenviados com backoff se a URL falhar.
+    Com `segredo`, o corpo é assinado no header `X-SPFC-Assinatura` (HMAC-SHA256).
+    """
+)
+async def registrar_webhook(
+    request: WebhookRequest,
+    _: bool = Depends(verificar_api_key)
+):
+    """Registra um webhook."""
+    url = urlparse(request.url)
+    if url.scheme not in ("http", "https") or not url.netloc:
+        raise HTTPException(status_code=400, detail="URL do webhook deve ser http(s)")
+    
+    invalidos = set(request.eventos) - set(EVENTOS)
+    if invalidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Eventos inválidos: {', '.join(sorted(invalidos))}. Disponíveis: {', '.join(EVENTOS)}"
+        )
+    
+    assinatura = await executar_io(
+        get_despachante().registro.adicionar, request.url, request.eventos, request.segredo
+    )
+    return _para_resposta(assinatura)
+
+
+@router.delete(
+    "/{webhook_id}",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+        404: {"model": ErrorResponse, "description": "Webhook não encontrado"},
+    },
+    summary="Remover webhook",
+    description="Remove um webhook registrado."
+)
+async def remover_webhook(
+    webhook_id: str = Path(..., description="ID do webhook"),
+    _: bool = Depends(verificar_api_key)
+):
+    """Remove um webhook."""
+    removido = await executar_io(get_despachante().registro.remover, webhook_id)
+    if not removido:
+        raise HTTPException(status_code=404, detail=f"Webhook '{webhook_id}' não encontrado")
+    
+    return {
+        "sucesso": True,
+        "mensagem": f"Webhook {webhook_id} removido",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.post(
+    "/{webhook_id}/teste",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse, "description": "API Key inválida"},
+        404: {"model": ErrorResponse, "description": "Webhook não encontrado"},
+    },
+    summary="Testar webhook",
+    description="Envia um evento `teste` para o webhook (em segundo plano, com retry)."
+)
+async def testar_webhook(
+    webhook_id: str = Path(..., description="ID do webhook"),
+    _: bool = Depends(verificar_api_key)
+):
+    """Envia um evento de teste para o webhook."""
+    despachante = get_despachante()
+    assinatura = await executar_io(despachante.registro.obter, webhook_id)
+    if not assinatura:
+        raise HTTPException(status_code=404, detail=f"Webhook '{webhook_id}' não encontrado")
+    
+    evento = {"tipo": "teste", "ocorrido_em": datetime.now().isoformat()}
+    despachante.agendar_entrega(assinatura, [evento])
+    
+    return {
+        "sucesso": True,
+        "mensagem": f"Evento de teste enviado para {assinatura['url']}",
+        "timestamp": datetime.now().isoformat()
+    }
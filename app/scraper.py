@@ -2,63 +2,110 @@
 Serviço de Scraping usando Firecrawl para extrair jogos do SPFC.
 
 Sistema de cache inteligente:
-- Persiste em arquivo JSON para sobreviver restarts
+- Persiste em arquivo JSON ou SQLite (app.storage) para sobreviver restarts
 - Só faz requisição ao Firecrawl quando o último jogo do cache já passou
 - Economiza créditos do Firecrawl ao máximo
+- O SDK do Firecrawl só é importado no primeiro refresh (start mais rápido)
+- Mantém um snapshot em memória, recarregado apenas quando o armazenamento muda
 """
-try:
-    from firecrawl import Firecrawl
-except ImportError:
-    from firecrawl import FirecrawlApp as Firecrawl
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple
-from pathlib import Path
-import json
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+import asyncio
 import logging
+import threading
 
 from app.config import get_settings
-from app.models import Jogo
+from app.execucao import executar_io
+from app.fuso_horario import DURACAO_JOGO, FUSO_SP, agora as agora_sp, localizar
+from app.refresh_policy import (
+    decidir_atualizacao,
+    get_politica,
+    get_registro_creditos,
+    MOTIVO_FORCE_REFRESH,
+    obter_metricas,
+    registrar_scraping,
+)
+from app.models import EventoCalendario, Jogo
+from app.persistencia import PersistenciaAtrasada
+from app.snapshot import Snapshot
+from app.storage import get_armazenamento
+from app.archive import get_historico
+from app.alvos import EstadoCalendario, Marcacao, com_marcacao, get_registro_alvos
+from app import estatisticas, identidade, reconciliacao, webhooks
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Logs de cada checagem do cache (caminho de toda requisição); desligue com
+# LOG_NIVEIS=app.scraper.cache=WARNING
+logger_cache = logging.getLogger(f"{__name__}.cache")
 
-# Caminho do arquivo de cache
-CACHE_FILE = Path(__file__).parent.parent / "data" / "cache_jogos.json"
+# Classe do cliente Firecrawl, importada sob demanda
+_firecrawl_cls = None
+
+# Snapshot em memória e revisão do armazenamento de onde foi carregado
+_snapshot: Optional[Snapshot] = None
+_snapshot_revisao: Optional[int] = None
+
+# Carga, gravação e marcações rodam em threads do pool de I/O
+_lock_snapshot = threading.RLock()
+
+# Scraping em andamento (requisições simultâneas aguardam o mesmo resultado)
+_scraping_atual: Optional["asyncio.Future[Tuple[Snapshot, bool]]"] = None
+
+
+def _obter_classe_firecrawl():
+    """
+    Importa o SDK do Firecrawl apenas quando um scraping é necessário.
+
+    O SDK carrega uma árvore grande de dependências; com cache válido
+    nenhum scraping acontece e o import não precisa ser pago no start.
+
+    Returns:
+        Classe do cliente Firecrawl
+    """
+    global _firecrawl_cls
+    if _firecrawl_cls is None:
+        try:
+            from firecrawl import Firecrawl
+        except ImportError:
+            from firecrawl import FirecrawlApp as Firecrawl
+        _firecrawl_cls = Firecrawl
+    return _firecrawl_cls
+
+
+def _scrape_firecrawl(api_key: str, url: str, schema: Dict[str, Any], prompt: str) -> Any:
+    """
+    Chamada síncrona ao Firecrawl (executada em thread, sem travar o event loop).
+    
+    Returns:
+        Resultado bruto do Firecrawl
+    """
+    # scrape renderiza JavaScript (ao contrário de extract),
+    # necessário pois o site do SPFC carrega jogos via JS
+    app = _obter_classe_firecrawl()(api_key=api_key)
+    return app.scrape(
+        url,
+        formats=[{
+            "type": "json",
+            "schema": schema,
+            "prompt": prompt
+        }]
+    )
 
 
 def _parse_data_jogo(jogo: Jogo) -> Optional[datetime]:
     """
-    Extrai datetime de um objeto Jogo.
+    Retorna o início do jogo (calculado na criação do Jogo).
     
     Args:
         jogo: Objeto Jogo
         
     Returns:
-        datetime ou None se não conseguir parsear
+        datetime com fuso de São Paulo ou None se a data for inválida
     """
-    try:
-        if jogo.data_iso:
-            # Formato: 2026-02-07T16:00:00-03:00
-            data_str = jogo.data_iso.replace("-03:00", "")
-            return datetime.fromisoformat(data_str)
-        elif jogo.data:
-            # Tentar parsear data no formato DD/MM/YYYY
-            partes = jogo.data.split("/")
-            if len(partes) == 3:
-                hora = 0
-                minuto = 0
-                if jogo.horario:
-                    try:
-                        h_parts = jogo.horario.replace("h", ":").split(":")
-                        hora = int(h_parts[0])
-                        minuto = int(h_parts[1]) if len(h_parts) > 1 else 0
-                    except:
-                        pass
-                return datetime(int(partes[2]), int(partes[1]), int(partes[0]), hora, minuto)
-    except Exception as e:
-        logger.warning(f"Erro ao parsear data do jogo: {e}")
-    return None
+    return jogo.inicio
 
 
 def ordenar_jogos(jogos: List[Jogo]) -> List[Jogo]:
@@ -71,10 +118,10 @@ def ordenar_jogos(jogos: List[Jogo]) -> List[Jogo]:
     Returns:
         Lista de jogos ordenada por data
     """
-    def get_sort_key(jogo: Jogo) -> datetime:
-        data = _parse_data_jogo(jogo)
+    def get_sort_key(jogo: Jogo) -> Tuple[int, int]:
         # Se não conseguir parsear, coloca no final
-        return data if data else datetime.max
+        epoch = jogo.inicio_epoch
+        return (0, epoch) if epoch is not None else (1, 0)
     
     return sorted(jogos, key=get_sort_key)
 
@@ -89,7 +136,7 @@ def filtrar_jogos_futuros(jogos: List[Jogo]) -> List[Jogo]:
     Returns:
         Lista com apenas jogos futuros
     """
-    agora = datetime.now()
+    agora = agora_sp()
     jogos_futuros = []
     
     for jogo in jogos:
@@ -111,7 +158,7 @@ def filtrar_jogos_semana(jogos: List[Jogo], semanas: int = 1) -> List[Jogo]:
     Returns:
         Lista com jogos da(s) próxima(s) semana(s)
     """
-    agora = datetime.now()
+    agora = agora_sp()
     limite = agora + timedelta(weeks=semanas)
     jogos_semana = []
     
@@ -134,7 +181,7 @@ def filtrar_jogos_hoje(jogos: List[Jogo], agora: Optional[datetime] = None) -> L
     Returns:
         Lista com jogos de hoje
     """
-    agora = agora or datetime.now()
+    agora = localizar(agora) if agora else agora_sp()
     jogos_hoje = []
 
     for jogo in jogos:
@@ -147,7 +194,7 @@ def filtrar_jogos_hoje(jogos: List[Jogo], agora: Optional[datetime] = None) -> L
 
 def _parse_data_fim_jogo(jogo: Jogo, data_inicio: Optional[datetime] = None) -> Optional[datetime]:
     """
-    Extrai datetime de fim de jogo, com fallback para +2h após o início.
+    Retorna o fim do jogo, com fallback para +2h após o início.
 
     Args:
         jogo: Objeto Jogo
@@ -156,16 +203,10 @@ def _parse_data_fim_jogo(jogo: Jogo, data_inicio: Optional[datetime] = None) ->
     Returns:
         datetime de fim ou None se não conseguir calcular
     """
-    try:
-        if jogo.data_fim_iso:
-            data_fim_str = jogo.data_fim_iso.replace("-03:00", "")
-            return datetime.fromisoformat(data_fim_str)
-
-        if data_inicio:
-            return data_inicio + timedelta(hours=2)
-    except Exception as e:
-        logger.warning(f"Erro ao parsear data de fim do jogo: {e}")
-
+    if jogo.fim:
+        return jogo.fim
+    if data_inicio:
+        return data_inicio + DURACAO_JOGO
     return None
 
 
@@ -185,7 +226,7 @@ def obter_status_jogo(jogo: Jogo, agora: Optional[datetime] = None) -> Tuple[str
     Returns:
         Tupla (status_jogo, tempo_decorrido_minutos)
     """
-    agora = agora or datetime.now()
+    agora = localizar(agora) if agora else agora_sp()
     data_inicio = _parse_data_jogo(jogo)
 
     if not data_inicio:
@@ -193,7 +234,7 @@ def obter_status_jogo(jogo: Jogo, agora: Optional[datetime] = None) -> Tuple[str
 
     data_fim = _parse_data_fim_jogo(jogo, data_inicio=data_inicio)
     if not data_fim:
-        data_fim = data_inicio + timedelta(hours=2)
+        data_fim = data_inicio + DURACAO_JOGO
 
     if agora < data_inicio:
         return "planejado", None
@@ -219,7 +260,7 @@ def obter_jogo_hoje_para_exibicao(
     Returns:
         Tupla (jogo, status_jogo, tempo_decorrido_minutos)
     """
-    agora = agora or datetime.now()
+    agora = localizar(agora) if agora else agora_sp()
     jogos_hoje = ordenar_jogos(filtrar_jogos_hoje(jogos, agora=agora))
 
     if not jogos_hoje:
@@ -235,53 +276,6 @@ def obter_jogo_hoje_para_exibicao(
     return jogo, status_jogo, tempo_decorrido
 
 
-def _garantir_diretorio_cache():
-    """Garante que o diretório de cache existe."""
-    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-
-def _carregar_cache_arquivo() -> Optional[Dict[str, Any]]:
-    """
-    Carrega o cache do arquivo JSON.
-    
-    Returns:
-        Dict com 'jogos' e 'ultima_atualizacao' ou None se não existir
-    """
-    try:
-        if CACHE_FILE.exists():
-            with open(CACHE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                logger.info(f"Cache carregado do arquivo: {len(data.get('jogos', []))} jogos")
-                return data
-    except Exception as e:
-        logger.error(f"Erro ao carregar cache do arquivo: {e}")
-    return None
-
-
-def _salvar_cache_arquivo(jogos: List[Jogo]):
-    """
-    Salva os jogos no arquivo JSON de cache.
-    
-    Args:
-        jogos: Lista de jogos para salvar
-    """
-    try:
-        _garantir_diretorio_cache()
-        
-        data = {
-            "ultima_atualizacao": datetime.now().isoformat(),
-            "jogos": [jogo.model_dump() for jogo in jogos]
-        }
-        
-        with open(CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"Cache salvo em arquivo: {len(jogos)} jogos")
-        
-    except Exception as e:
-        logger.error(f"Erro ao salvar cache no arquivo: {e}")
-
-
 def _obter_data_ultimo_jogo(jogos: List[Jogo]) -> Optional[datetime]:
     """
     Obtém a data do último jogo da lista.
@@ -322,23 +316,35 @@ def _cache_ainda_valido(jogos: List[Jogo]) -> bool:
     if not jogos:
         return False
     
-    ultimo_jogo_data = _obter_data_ultimo_jogo(jogos)
+    return _data_ultimo_jogo_valida(_obter_data_ultimo_jogo(jogos))
+
+
+def _data_ultimo_jogo_valida(ultimo_jogo_data: Optional[datetime]) -> bool:
+    """
+    Verifica se o cache ainda é válido dada a data do último jogo.
     
+    Args:
+        ultimo_jogo_data: Data do último jogo do cache
+        
+    Returns:
+        True se o cache ainda é válido, False se precisa atualizar
+    """
     if ultimo_jogo_data is None:
         logger.warning("Não foi possível determinar data do último jogo, cache inválido")
         return False
     
-    agora = datetime.now()
+    agora = agora_sp()
     
     # Cache válido se o último jogo ainda não passou
     # Adicionamos 3 horas para garantir que o jogo terminou
     valido = ultimo_jogo_data + timedelta(hours=3) > agora
     
-    logger.info(
-        f"Verificação de cache: último jogo em {ultimo_jogo_data.strftime('%d/%m/%Y %H:%M')}, "
-        f"agora é {agora.strftime('%d/%m/%Y %H:%M')}, "
-        f"cache {'VÁLIDO' if valido else 'EXPIRADO'}"
-    )
+    if logger_cache.isEnabledFor(logging.INFO):
+        logger_cache.info(
+            f"Verificação de cache: último jogo em {ultimo_jogo_data.strftime('%d/%m/%Y %H:%M')}, "
+            f"agora é {agora.strftime('%d/%m/%Y %H:%M')}, "
+            f"cache {'VÁLIDO' if valido else 'EXPIRADO'}"
+        )
     
     return valido
 
@@ -347,12 +353,25 @@ def _converter_cache_para_jogos(data: Dict[str, Any]) -> List[Jogo]:
     """
     Converte dados do cache JSON para lista de objetos Jogo.
     
+    Dados marcados como confiáveis (gravados pela própria API, já
+    validados ao salvar) são montados sem revalidação.
+    
     Args:
         data: Dict do cache com 'jogos'
         
     Returns:
         Lista de objetos Jogo
     """
+    if data.get("confiavel"):
+        return [
+            Jogo.construir_confiavel(
+                jogo_data,
+                datetime.fromtimestamp(inicio, FUSO_SP) if inicio is not None else None,
+                datetime.fromtimestamp(fim, FUSO_SP) if fim is not None else None,
+            )
+            for jogo_data, inicio, fim in zip(data["jogos"], data["inicio_epoch"], data["fim_epoch"])
+        ]
+    
     jogos = []
     
     for jogo_data in data.get("jogos", []):
@@ -366,6 +385,249 @@ def _converter_cache_para_jogos(data: Dict[str, Any]) -> List[Jogo]:
     return jogos
 
 
+def _criar_snapshot(jogos: List[Jogo], ultima_atualizacao: Optional[str] = None) -> Snapshot:
+    """
+    Cria um snapshot com os jogos ordenados e as datas já parseadas.
+    
+    Args:
+        jogos: Lista de jogos
+        ultima_atualizacao: Timestamp ISO de quando os dados foram obtidos
+        
+    Returns:
+        Snapshot pronto para consultas
+    """
+    datados = []
+    sem_data = []
+    for jogo in jogos:
+        if jogo.inicio:
+            datados.append((jogo.inicio_epoch, jogo.inicio, jogo))
+        else:
+            sem_data.append(jogo)
+    
+    # sort estável: mesma ordem de ordenar_jogos
+    datados.sort(key=lambda item: item[0])
+    
+    atualizado_em = None
+    if ultima_atualizacao:
+        try:
+            atualizado_em = datetime.fromisoformat(ultima_atualizacao)
+        except ValueError:
+            pass
+    
+    return Snapshot(
+        jogos=[jogo for _, _, jogo in datados] + sem_data,
+        inicios=[data for _, data, _ in datados],
+        ultima_atualizacao=atualizado_em,
+    )
+
+
+def _carregar_snapshot(alteracoes: Sequence[Jogo] = ()) -> Optional[Snapshot]:
+    """
+    Retorna o snapshot em memória, recarregando do armazenamento se ele mudou.
+    
+    A checagem é barata (stat() do arquivo JSON ou leitura da revisão no
+    SQLite); os jogos só são lidos e validados quando os dados foram
+    alterados (por outro worker, por exemplo). Num recarregamento, as
+    marcações deste processo ainda não gravadas são reaplicadas por cima
+    do que foi lido: valem as duas. Faz I/O: nas rotas, é chamado pelo
+    pool de threads (app.execucao.executar_io).
+    
+    Args:
+        alteracoes: Jogos alterados que também devem ser reaplicados (lote
+            em gravação, já fora das pendentes)
+    
+    Returns:
+        Snapshot atual ou None se não houver cache
+    """
+    global _snapshot, _snapshot_revisao
+    
+    with _lock_snapshot:
+        armazenamento = get_armazenamento()
+        revisao = armazenamento.revisao()
+        if revisao is None:
+            _snapshot, _snapshot_revisao = None, None
+            return None
+    
+        if _snapshot is not None and revisao == _snapshot_revisao:
+            return _snapshot
+    
+        cache_data = armazenamento.carregar()
+        if not cache_data:
+            _snapshot, _snapshot_revisao = None, None
+            return None
+    
+        snapshot = _criar_snapshot(
+            _converter_cache_para_jogos(cache_data),
+            cache_data.get("ultima_atualizacao"),
+        )
+        _reaplicar_estado(snapshot, alteracoes)
+        estatisticas.materializar(snapshot, anterior=_snapshot)
+        _snapshot, _snapshot_revisao = snapshot, revisao
+        return _snapshot
+
+
+def _reaplicar_estado(snapshot: Snapshot, alteracoes: Sequence[Jogo] = ()) -> List[Jogo]:
+    """
+    Aplica no snapshot o estado do calendário de jogos alterados em outra cópia.
+    
+    As marcações pendentes da persistência atrasada são aplicadas por
+    último (são o estado mais recente de cada jogo).
+    
+    Args:
+        snapshot: Snapshot a alterar (recém-lido ou recém-extraído)
+        alteracoes: Jogos alterados, de um snapshot anterior
+    
+    Returns:
+        Os jogos do snapshot correspondentes a `alteracoes`
+    """
+    aplicados = []
+    copiou = False
+    for ordem, alterado in enumerate([*alteracoes, *get_persistencia().pendentes()]):
+        jogo = snapshot.obter(alterado.jogo_id)
+        if jogo is None:
+            continue
+        if jogo is not alterado:
+            identidade.herdar_estado(jogo, alterado)
+            copiou = True
+        if ordem < len(alteracoes):
+            aplicados.append(jogo)
+    if copiou:
+        snapshot.invalidar()
+    return aplicados
+
+
+def _gravar_alteracoes(jogos: List[Jogo]) -> bool:
+    """
+    Grava o estado de sincronização de jogos alterados e os arquiva no histórico.
+    
+    Chamado na própria requisição (PERSISTENCIA_MODO=imediata) ou em lote
+    pela persistência atrasada. Com o lock do armazenamento, relê os dados
+    se outro processo gravou desde a última carga e aplica os jogos por
+    cima antes de gravar: as marcações dos outros workers são mantidas.
+    
+    Args:
+        jogos: Jogos cujo estado mudou
+    
+    Returns:
+        False se a escrita falhou (a persistência atrasada devolve os jogos
+        ao próximo lote)
+    """
+    global _snapshot_revisao
+    
+    armazenamento = get_armazenamento()
+    with _lock_snapshot, armazenamento.bloqueio():
+        snapshot = _carregar_snapshot(alteracoes=jogos)
+        if snapshot is None:
+            # Cache limpo depois das marcações: nada a gravar
+            return True
+        jogos = _reaplicar_estado(snapshot, jogos)
+        if not jogos:
+            return True
+        if not armazenamento.atualizar_status_lote(snapshot, jogos):
+            return False
+        _snapshot_revisao = armazenamento.revisao()
+    _arquivar_no_historico(snapshot, jogos=jogos)
+    return True
+
+
+@lru_cache()
+def get_persistencia() -> PersistenciaAtrasada:
+    """Retorna a persistência atrasada das marcações no calendário."""
+    return PersistenciaAtrasada(_gravar_alteracoes)
+
+
+def _persistir_snapshot(snapshot: Snapshot, jogos_alterados: Optional[List[Jogo]] = None):
+    """
+    Persiste o snapshot e o torna o snapshot atual.
+    
+    Args:
+        snapshot: Snapshot a persistir
+        jogos_alterados: Se informado, só o status destes jogos mudou: a
+            gravação (e o arquivamento no histórico) entra no próximo lote
+            da persistência atrasada, ou é feita na hora (em uma escrita)
+            no modo imediata
+    """
+    global _snapshot, _snapshot_revisao
+    
+    armazenamento = get_armazenamento()
+    with _lock_snapshot:
+        if jogos_alterados is not None:
+            for jogo in jogos_alterados:
+                estatisticas.registrar_calendario(snapshot, jogo)
+            _snapshot = snapshot
+            if not get_persistencia().agendar(jogos_alterados):
+                _gravar_alteracoes(jogos_alterados)
+            return
+        
+        with armazenamento.bloqueio():
+            # Estado do calendário mais recente: marcações feitas durante o
+            # scraping (pendentes deste processo ou gravadas por outro)
+            atual = _carregar_snapshot()
+            if atual is not None and atual is not snapshot:
+                for jogo in snapshot.jogos:
+                    conhecido = atual.obter(jogo.jogo_id)
+                    if conhecido is not None:
+                        identidade.herdar_estado(jogo, conhecido)
+                snapshot.invalidar()
+            if armazenamento.salvar(snapshot):
+                # O snapshot gravado já inclui as marcações pendentes
+                get_persistencia().descartar()
+            estatisticas.materializar(snapshot, anterior=_snapshot)
+            _snapshot = snapshot
+            _snapshot_revisao = armazenamento.revisao()
+
+
+def _salvar_scraping(snapshot: Snapshot, snapshot_cache: Optional[Snapshot]):
+    """Persiste o resultado de um scraping e arquiva os jogos no histórico."""
+    # Histórico guarda também os jogos que saíram do site
+    if snapshot_cache:
+        _arquivar_no_historico(snapshot_cache)
+    _persistir_snapshot(snapshot)
+    _arquivar_no_historico(snapshot)
+
+
+def _arquivar_no_historico(snapshot: Snapshot, jogos: Optional[List[Jogo]] = None):
+    """
+    Registra jogos no histórico de temporadas (falhas não interrompem a requisição).
+    
+    Args:
+        snapshot: Snapshot cujos jogos serão arquivados
+        jogos: Se informado, arquiva apenas estes jogos
+    """
+    if not get_settings().historico_ativo:
+        return
+    try:
+        get_historico().arquivar(jogos if jogos is not None else snapshot.jogos)
+    except Exception as e:
+        logger.error(f"Erro ao arquivar jogos no histórico: {e}")
+
+
+def obter_snapshot_cache() -> Snapshot:
+    """
+    Retorna o snapshot do cache sem fazer scraping.
+    
+    Returns:
+        Snapshot atual (vazio se não houver cache)
+    """
+    return _carregar_snapshot() or Snapshot(jogos=[], inicios=[])
+
+
+def aquecer_cache() -> Optional[Snapshot]:
+    """
+    Carrega o cache do arquivo para a memória (usado no startup).
+    
+    Returns:
+        Snapshot carregado ou None se não houver cache
+    """
+    snapshot = _carregar_snapshot()
+    if snapshot:
+        _arquivar_no_historico(snapshot)
+        logger.info(f"🔥 Cache aquecido: {len(snapshot.jogos)} jogos (versão {snapshot.versao})")
+    else:
+        logger.info("📭 Nenhum cache para aquecer")
+    return snapshot
+
+
 def parse_data_hora(data_str: str, horario_str: str) -> tuple[Optional[str], Optional[str]]:
     """
     Converte data e horário para formato ISO 8601 (compatível com Google Calendar).
@@ -395,7 +657,7 @@ def parse_data_hora(data_str: str, horario_str: str) -> tuple[Optional[str], Opt
             try:
                 if fmt == "%d/%m":
                     # Se não tem ano, assumir ano atual
-                    data_parsed = datetime.strptime(data_limpa, fmt).replace(year=datetime.now().year)
+                    data_parsed = datetime.strptime(data_limpa, fmt).replace(year=agora_sp().year)
                 else:
                     data_parsed = datetime.strptime(data_limpa, fmt)
                 break
@@ -416,11 +678,12 @@ def parse_data_hora(data_str: str, horario_str: str) -> tuple[Optional[str], Opt
             data_inicio = data_parsed
         
         # Calcular fim (2 horas depois - duração típica de jogo)
-        data_fim = data_inicio + timedelta(hours=2)
+        data_inicio = data_inicio.replace(tzinfo=FUSO_SP)
+        data_fim = data_inicio + DURACAO_JOGO
         
-        # Formatar para ISO 8601 com timezone de São Paulo (-03:00)
-        data_inicio_iso = data_inicio.strftime("%Y-%m-%dT%H:%M:%S") + "-03:00"
-        data_fim_iso = data_fim.strftime("%Y-%m-%dT%H:%M:%S") + "-03:00"
+        # Formatar para ISO 8601 com o offset de São Paulo (ex: -03:00)
+        data_inicio_iso = data_inicio.isoformat(timespec="seconds")
+        data_fim_iso = data_fim.isoformat(timespec="seconds")
         
         return data_inicio_iso, data_fim_iso
         
@@ -456,7 +719,8 @@ def extrair_jogos_do_resultado(resultado: Any) -> List[Jogo]:
             logger.warning(f"Tipo de resultado inesperado: {type(resultado)}")
             dados = {}
         
-        logger.info(f"Dados extraídos: {dados}")
+        # Payload serializado, truncado e amostrado pela thread de logging
+        logger.info("📄 Dados extraídos do resultado", extra={"payload": dados})
         
         # Tentar diferentes estruturas de resposta
         lista_jogos: List[Dict[str, Any]] = []
@@ -536,11 +800,7 @@ async def scrape_calendario(force_refresh: bool = False) -> tuple[List[Jogo], bo
     """
     Faz scraping do calendário do SPFC usando Firecrawl com cache inteligente.
     
-    Sistema de cache:
-    1. Primeiro tenta carregar do arquivo JSON
-    2. Verifica se o último jogo do cache ainda não passou
-    3. Se ainda não passou, usa o cache (economiza créditos!)
-    4. Se já passou, busca novos dados do Firecrawl
+    Veja `obter_snapshot` para a lógica de cache.
     
     Args:
         force_refresh: Se True, ignora o cache e força nova requisição
@@ -548,28 +808,74 @@ async def scrape_calendario(force_refresh: bool = False) -> tuple[List[Jogo], bo
     Returns:
         Tupla (lista de jogos, from_cache)
     """
-    settings = get_settings()
+    snapshot, from_cache = await obter_snapshot(force_refresh=force_refresh)
+    return list(snapshot.jogos), from_cache
+
+
+async def obter_snapshot(force_refresh: bool = False) -> tuple[Snapshot, bool]:
+    """
+    Retorna o snapshot de jogos, fazendo scraping com Firecrawl se necessário.
+    
+    Sistema de cache:
+    1. Primeiro usa o snapshot em memória (recarregado se o arquivo mudou)
+    2. A política de atualização (app.refresh_policy) decide se o cache serve
+    3. Se serve, usa o cache (economiza créditos!)
+    4. Se não, busca novos dados do Firecrawl e registra os créditos gastos
     
-    # Tentar carregar cache do arquivo
-    cache_data = _carregar_cache_arquivo()
+    Requisições simultâneas que precisam atualizar aguardam o mesmo
+    scraping (um único gasto de créditos). O controle de admissão do
+    force_refresh fica nas rotas (app.refresh_policy).
     
-    if cache_data and not force_refresh:
-        jogos_cache = _converter_cache_para_jogos(cache_data)
+    Args:
+        force_refresh: Se True, ignora o cache e força nova requisição
         
-        if jogos_cache and _cache_ainda_valido(jogos_cache):
-            logger.info(
-                f"✅ Usando cache (último jogo ainda não passou). "
-                f"Economia de créditos Firecrawl!"
-            )
-            return jogos_cache, True
-        else:
-            logger.info("📅 Cache expirado (último jogo já passou), buscando novos dados...")
+    Returns:
+        Tupla (snapshot, from_cache)
+    """
+    global _scraping_atual
     
-    elif force_refresh:
+    # Snapshot em memória (ou carregado do arquivo), checado fora do event loop
+    snapshot_cache = await executar_io(_carregar_snapshot)
+    
+    if force_refresh:
+        motivo = MOTIVO_FORCE_REFRESH
         logger.info("🔄 Force refresh solicitado, ignorando cache...")
+    else:
+        # Política de atualização (REFRESH_POLITICA) decide se vale gastar créditos
+        # (lê data/creditos.json: fora do event loop)
+        decisao = await executar_io(decidir_atualizacao, snapshot_cache, agora_sp())
+        motivo = decisao.motivo
+        if not decisao.atualizar:
+            logger_cache.info(
+                "✅ Usando cache (%s). Economia de créditos Firecrawl!", decisao.motivo
+            )
+            return snapshot_cache, True
+        if snapshot_cache:
+            logger.info(f"📅 Atualizando cache ({decisao.motivo}), buscando novos dados...")
+        else:
+            logger.info("📭 Nenhum cache encontrado, buscando dados...")
     
+    if _scraping_atual is None or _scraping_atual.done():
+        _scraping_atual = asyncio.ensure_future(_buscar_do_firecrawl(snapshot_cache, motivo))
     else:
-        logger.info("📭 Nenhum cache encontrado, buscando dados...")
+        logger.info("⏳ Scraping já em andamento, aguardando o resultado...")
+    
+    # shield: se o cliente desconectar, o scraping compartilhado continua
+    return await asyncio.shield(_scraping_atual)
+
+
+async def _buscar_do_firecrawl(snapshot_cache: Optional[Snapshot], motivo: str) -> tuple[Snapshot, bool]:
+    """
+    Faz o scraping com retry e rotação de API keys e atualiza o cache.
+    
+    Args:
+        snapshot_cache: Snapshot atual (None se não houver cache)
+        motivo: Motivo da atualização (registrado com os créditos)
+        
+    Returns:
+        Tupla (snapshot, from_cache); em caso de falha com cache, o cache antigo
+    """
+    settings = get_settings()
     
     logger.info(f"🌐 Fazendo scraping de: {settings.spfc_calendario_url}")
     
@@ -597,9 +903,6 @@ async def scrape_calendario(force_refresh: bool = False) -> tuple[List[Jogo], bo
             try:
                 logger.info(f"🔑 Usando {key_label} (tentativa {retry}/{max_retries})")
                 
-                # Inicializar Firecrawl com a key atual
-                app = Firecrawl(api_key=api_key)
-            
                 # Schema para extração estruturada
                 schema = {
                     "type": "object",
@@ -641,32 +944,35 @@ async def scrape_calendario(force_refresh: bool = False) -> tuple[List[Jogo], bo
                 """
                 
                 # Fazer extração estruturada usando scrape com formato JSON
-                # scrape renderiza JavaScript (ao contrário de extract),
-                # necessário pois o site do SPFC carrega jogos via JS
-                resultado = app.scrape(
-                    settings.spfc_calendario_url,
-                    formats=[{
-                        "type": "json",
-                        "schema": schema,
-                        "prompt": prompt
-                    }]
+                resultado = await asyncio.to_thread(
+                    _scrape_firecrawl, api_key, settings.spfc_calendario_url, schema, prompt
                 )
                 
-                logger.info(f"✅ Extração concluída com {key_label}! Resultado: {resultado}")
+                logger.info(f"✅ Extração concluída com {key_label}!", extra={"payload": resultado})
                 
                 # Extrair jogos do resultado
                 jogos = extrair_jogos_do_resultado(resultado)
                 
-                # Preservar status de criado_no_calendario do cache anterior
-                if cache_data:
-                    jogos = _preservar_status_calendario(jogos, cache_data)
+                # Identidade e estado do calendário do cache anterior
+                # (reagendamentos mantêm o jogo_id)
+                if snapshot_cache:
+                    identidade.reconciliar(
+                        jogos,
+                        snapshot_cache.jogos,
+                        timedelta(days=settings.reagendamento_janela_dias),
+                    )
+                
+                snapshot = _criar_snapshot(jogos)
+                await executar_io(registrar_scraping, motivo, agora_sp())
                 
-                # Salvar no arquivo de cache
+                # Salvar no arquivo de cache (fora do event loop)
                 if jogos:
-                    _salvar_cache_arquivo(jogos)
+                    await executar_io(_salvar_scraping, snapshot, snapshot_cache)
                     logger.info(f"✅ Cache atualizado com {len(jogos)} jogos")
+                    if snapshot_cache:
+                        webhooks.publicar(webhooks.detectar_mudancas(snapshot_cache, snapshot))
                 
-                return jogos, False
+                return snapshot, False
                 
             except Exception as e:
                 last_error = e
@@ -692,19 +998,16 @@ async def scrape_calendario(force_refresh: bool = False) -> tuple[List[Jogo], bo
                     logger.warning(f"⚠️ {key_label} tentativa {retry}/{max_retries} falhou: {e}")
                 
                 if retry < max_retries and not is_credit_error:
-                    import time
                     logger.info(f"⏳ Aguardando {retry_delay}s antes de tentar novamente...")
-                    time.sleep(retry_delay)
+                    await asyncio.sleep(retry_delay)
     
     # Todas as tentativas e keys falharam
     logger.error(f"❌ Todas as {len(api_keys)} API key(s) falharam. Último erro: {last_error}")
     
     # Se falhar mas tiver cache, retornar cache mesmo expirado
-    if cache_data:
-        jogos_cache = _converter_cache_para_jogos(cache_data)
-        if jogos_cache:
-            logger.info("⚠️ Retornando cache após erro (melhor que nada)")
-            return jogos_cache, True
+    if snapshot_cache and snapshot_cache.jogos:
+        logger.info("⚠️ Retornando cache após erro (melhor que nada)")
+        return snapshot_cache, True
     
     if last_error:
         raise last_error
@@ -712,15 +1015,12 @@ async def scrape_calendario(force_refresh: bool = False) -> tuple[List[Jogo], bo
 
 
 def limpar_cache():
-    """Limpa o cache de jogos (arquivo JSON)."""
-    try:
-        if CACHE_FILE.exists():
-            CACHE_FILE.unlink()
-            logger.info("🗑️ Cache removido (arquivo deletado)")
-        else:
-            logger.info("📭 Nenhum cache para limpar")
-    except Exception as e:
-        logger.error(f"Erro ao limpar cache: {e}")
+    """Limpa o cache de jogos (armazenamento e snapshot em memória)."""
+    global _snapshot, _snapshot_revisao
+    with _lock_snapshot:
+        _snapshot, _snapshot_revisao = None, None
+        get_persistencia().descartar()
+        get_armazenamento().limpar()
 
 
 def obter_info_cache() -> Dict[str, Any]:
@@ -730,125 +1030,196 @@ def obter_info_cache() -> Dict[str, Any]:
     Returns:
         Dict com informações do cache
     """
-    cache_data = _carregar_cache_arquivo()
+    snapshot = _carregar_snapshot()
     
-    if not cache_data:
+    if not snapshot:
         return {
             "existe": False,
             "mensagem": "Nenhum cache encontrado"
         }
     
-    jogos = _converter_cache_para_jogos(cache_data)
-    ultimo_jogo_data = _obter_data_ultimo_jogo(jogos)
-    valido = _cache_ainda_valido(jogos)
+    ultimo_jogo_data = snapshot.ultimo_inicio
+    decisao = get_politica().decidir(snapshot, agora_sp(), get_registro_creditos())
+    valido = not decisao.atualizar
     
     return {
         "existe": True,
-        "ultima_atualizacao": cache_data.get("ultima_atualizacao"),
-        "total_jogos": len(jogos),
+        "ultima_atualizacao": snapshot.ultima_atualizacao.isoformat(),
+        "total_jogos": len(snapshot.jogos),
         "ultimo_jogo_data": ultimo_jogo_data.strftime("%d/%m/%Y %H:%M") if ultimo_jogo_data else None,
         "cache_valido": valido,
-        "proxima_atualizacao": "Quando o último jogo passar" if valido else "Na próxima requisição",
-        "arquivo": str(CACHE_FILE)
+        "proxima_atualizacao": (
+            f"Conforme a política '{get_politica().nome}'" if valido
+            else f"Na próxima requisição ({decisao.motivo})"
+        ),
+        "arquivo": str(get_armazenamento().caminho)
     }
 
 
-def _preservar_status_calendario(jogos_novos: List[Jogo], cache_data: Dict[str, Any]) -> List[Jogo]:
+def obter_metricas_atualizacao() -> Dict[str, Any]:
     """
-    Preserva o status de criado_no_calendario ao atualizar o cache.
+    Retorna métricas da política de atualização (idade dos dados x créditos).
     
-    Quando novos dados são buscados do Firecrawl, precisamos manter
-    o status dos jogos que já foram adicionados ao calendário.
-    
-    Args:
-        jogos_novos: Lista de jogos recém-extraídos
-        cache_data: Dados do cache anterior
-        
     Returns:
-        Lista de jogos com status preservado
+        Dict com as métricas
     """
-    # Criar mapa de jogos antigos por jogo_id
-    jogos_antigos = _converter_cache_para_jogos(cache_data)
-    status_map = {}
-    
-    for jogo in jogos_antigos:
-        status_map[jogo.jogo_id] = {
-            "criado_no_calendario": jogo.criado_no_calendario,
-            "google_event_id": jogo.google_event_id
-        }
-    
-    # Aplicar status aos jogos novos
-    for jogo in jogos_novos:
-        if jogo.jogo_id in status_map:
-            jogo.criado_no_calendario = status_map[jogo.jogo_id]["criado_no_calendario"]
-            jogo.google_event_id = status_map[jogo.jogo_id]["google_event_id"]
-    
-    return jogos_novos
+    return obter_metricas(_carregar_snapshot(), agora_sp())
 
 
-def marcar_jogo_no_calendario(jogo_id: str, google_event_id: Optional[str] = None) -> bool:
+def marcar_jogo_no_calendario(
+    jogo_id: str,
+    google_event_id: Optional[str] = None,
+    alvo: Optional[str] = None,
+) -> bool:
     """
     Marca um jogo como criado no Google Calendar.
     
     Args:
         jogo_id: ID único do jogo
         google_event_id: ID do evento criado no Google Calendar
+        alvo: Calendário adicional (None = calendário principal)
         
     Returns:
         True se marcou com sucesso, False se jogo não encontrado
     """
-    cache_data = _carregar_cache_arquivo()
-    if not cache_data:
-        return False
-    
-    jogos = _converter_cache_para_jogos(cache_data)
-    encontrado = False
-    
-    for jogo in jogos:
-        if jogo.jogo_id == jogo_id:
-            jogo.criado_no_calendario = True
-            jogo.google_event_id = google_event_id
-            encontrado = True
-            logger.info(f"✅ Jogo {jogo_id} marcado como criado no calendário")
-            break
-    
-    if encontrado:
-        _salvar_cache_arquivo(jogos)
+    if alvo:
+        snapshot = _carregar_snapshot()
+        jogo = snapshot.obter(jogo_id) if snapshot else None
+        if jogo is None:
+            return False
+        marcacao = Marcacao(google_event_id, jogo.data_iso)
+        get_registro_alvos().aplicar(alvo, {jogo_id: marcacao})
+        logger.info(f"✅ Jogo {jogo_id} marcado como criado no calendário '{alvo}'")
+        webhooks.publicar([webhooks.evento_calendario(com_marcacao(jogo, marcacao), marcado=True, alvo=alvo)])
+        return True
+    
+    with _lock_snapshot:
+        snapshot = _carregar_snapshot()
+        if not snapshot:
+            return False
+        
+        jogo = snapshot.obter(jogo_id)
+        if jogo is None:
+            return False
+        
+        jogo.criado_no_calendario = True
+        jogo.google_event_id = google_event_id
+        # O evento foi criado/atualizado com o horário atual
+        jogo.data_iso_anterior = None
+        logger.info(f"✅ Jogo {jogo_id} marcado como criado no calendário")
+        
+        snapshot.invalidar()
+        _persistir_snapshot(snapshot, jogos_alterados=[jogo])
+    webhooks.publicar([webhooks.evento_calendario(jogo, marcado=True)])
     
-    return encontrado
+    return True
 
 
-def desmarcar_jogo_do_calendario(jogo_id: str) -> Optional[str]:
+def desmarcar_jogo_do_calendario(jogo_id: str, alvo: Optional[str] = None) -> Optional[str]:
     """
     Desmarca um jogo do calendário (para quando o evento for removido).
     
     Args:
         jogo_id: ID único do jogo
+        alvo: Calendário adicional (None = calendário principal)
         
     Returns:
         google_event_id do jogo (para remover do Calendar) ou None
     """
-    cache_data = _carregar_cache_arquivo()
-    if not cache_data:
-        return None
-    
-    jogos = _converter_cache_para_jogos(cache_data)
-    google_event_id = None
-    
-    for jogo in jogos:
-        if jogo.jogo_id == jogo_id:
-            google_event_id = jogo.google_event_id
-            jogo.criado_no_calendario = False
-            jogo.google_event_id = None
-            logger.info(f"🗑️ Jogo {jogo_id} desmarcado do calendário")
-            break
+    if alvo:
+        snapshot = _carregar_snapshot()
+        jogo = snapshot.obter(jogo_id) if snapshot else None
+        if jogo is None:
+            return None
+        anterior = get_registro_alvos().aplicar(alvo, {jogo_id: None})[jogo_id]
+        if anterior is None:
+            return None
+        logger.info(f"🗑️ Jogo {jogo_id} desmarcado do calendário '{alvo}'")
+        webhooks.publicar([webhooks.evento_calendario(com_marcacao(jogo, None), marcado=False, alvo=alvo)])
+        return anterior.google_event_id
+    
+    with _lock_snapshot:
+        snapshot = _carregar_snapshot()
+        if not snapshot:
+            return None
+        
+        jogo = snapshot.obter(jogo_id)
+        if jogo is None:
+            return None
+        
+        google_event_id = jogo.google_event_id
+        jogo.criado_no_calendario = False
+        jogo.google_event_id = None
+        jogo.data_iso_anterior = None
+        logger.info(f"🗑️ Jogo {jogo_id} desmarcado do calendário")
+        
+        if google_event_id:
+            snapshot.invalidar()
+            _persistir_snapshot(snapshot, jogos_alterados=[jogo])
     
     if google_event_id:
-        _salvar_cache_arquivo(jogos)
+        webhooks.publicar([webhooks.evento_calendario(jogo, marcado=False)])
     
     return google_event_id
 
 
+def reconciliar_calendario(
+    eventos: List[EventoCalendario],
+    semanas: int = 4,
+    de: Optional[date] = None,
+    ate: Optional[date] = None,
+    aplicar: bool = False,
+    alvo: Optional[str] = None,
+) -> Tuple[Snapshot, reconciliacao.Plano, EstadoCalendario]:
+    """
+    Calcula o plano de sincronização com os eventos do cliente.
+    
+    Com `aplicar`, as correções de estado são feitas juntas, sem outra
+    marcação no meio: uma nova versão do snapshot e uma única escrita
+    (ou uma transação no banco de alvos).
+    
+    Args:
+        eventos: Eventos que existem no Google Calendar
+        semanas: Jogos a criar: os das próximas N semanas
+        de: Início do período listado em eventos
+        ate: Fim do período listado em eventos
+        aplicar: Se True, aplica as correções
+        alvo: Calendário adicional (None = calendário principal)
+        
+    Returns:
+        Tupla (snapshot, plano, estado do calendário depois do plano)
+    """
+    registro = get_registro_alvos()
+    with _lock_snapshot:
+        snapshot = obter_snapshot_cache()
+        estado = registro.estado(alvo)
+        plano = reconciliacao.planejar(snapshot, eventos, semanas=semanas, de=de, ate=ate, estado=estado)
+        if not aplicar or not plano.corrigir:
+            return snapshot, plano, estado
+        
+        if alvo:
+            registro.aplicar(alvo, {
+                c.jogo.jogo_id: Marcacao(c.google_event_id, c.jogo.data_iso) if c.acao == "marcar" else None
+                for c in plano.corrigir
+            })
+            estado = registro.estado(alvo)
+        else:
+            for correcao in plano.corrigir:
+                jogo = correcao.jogo
+                jogo.criado_no_calendario = correcao.acao == "marcar"
+                jogo.google_event_id = correcao.google_event_id
+                jogo.data_iso_anterior = None
+            snapshot.invalidar()
+            _persistir_snapshot(snapshot, jogos_alterados=[c.jogo for c in plano.corrigir])
+        logger.info(f"🔄 Reconciliação: {len(plano.corrigir)} correção(ões) de estado aplicada(s)")
+    webhooks.publicar([
+        webhooks.evento_calendario(estado.aplicar(c.jogo), marcado=c.acao == "marcar", alvo=alvo)
+        for c in plano.corrigir
+    ])
+    
+    return snapshot, plano, estado
+
+
 def obter_jogos_no_calendario() -> List[Jogo]:
     """
     Retorna todos os jogos que estão marcados como criados no calendário.
@@ -858,12 +1229,11 @@ def obter_jogos_no_calendario() -> List[Jogo]:
     Returns:
         Lista de jogos que estão no calendário
     """
-    cache_data = _carregar_cache_arquivo()
-    if not cache_data:
+    snapshot = _carregar_snapshot()
+    if not snapshot:
         return []
     
-    jogos = _converter_cache_para_jogos(cache_data)
-    return [jogo for jogo in jogos if jogo.criado_no_calendario]
+    return [jogo for jogo in snapshot.jogos if jogo.criado_no_calendario]
 
 
 def obter_jogos_passados_no_calendario() -> List[Jogo]:
@@ -876,7 +1246,7 @@ def obter_jogos_passados_no_calendario() -> List[Jogo]:
         Lista de jogos passados que estão no calendário
     """
     jogos_calendario = obter_jogos_no_calendario()
-    agora = datetime.now()
+    agora = agora_sp()
     
     jogos_passados = []
     for jogo in jogos_calendario:
@@ -0,0 +1,144 @@
+"""
+Snapshot em memória do cache de jogos.
+
+Guarda a lista de jogos já validada e ordenada, as datas de início
+parseadas (para buscas por intervalo com bisect) e, por versão:
+
+- estruturas derivadas (dicts dos jogos, posições, índices): poucas chaves
+  fixas, calculadas uma vez
+- respostas pré-renderizadas: chaves vêm dos parâmetros do cliente (limit,
+  cursor, fields, filtros), então ficam em um LRU limitado, separado das
+  estruturas derivadas (muitas combinações não descartam os índices)
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+
+from app.models import Jogo
+
+# Contador global de versões: cada snapshot (ou alteração dele) ganha um número novo
+_versoes = count(1)
+
+# Limite de respostas pré-renderizadas por versão (as menos usadas saem primeiro)
+MAX_RESPOSTAS = 256
+
+
+class Snapshot:
+    """
+    Estado do cache de jogos em uma determinada versão.
+
+    Atributos:
+        jogos: Jogos ordenados por data (jogos sem data válida ficam no final)
+        inicios: Datas de início (com fuso) dos jogos com data válida, na mesma ordem
+        ultima_atualizacao: Quando os dados foram obtidos do site
+        versao: Número da versão (muda a cada alteração)
+        por_id: Mapa jogo_id -> Jogo (mesmas instâncias de `jogos`)
+        materializados: Estruturas mantidas incrementalmente (sobrevivem a `invalidar`)
+    """
+
+    def __init__(
+        self,
+        jogos: List[Jogo],
+        inicios: List[datetime],
+        ultima_atualizacao: Optional[datetime] = None,
+    ):
+        self.jogos = jogos
+        self.inicios = inicios
+        self.ultima_atualizacao = ultima_atualizacao or datetime.now()
+        self.por_id: Dict[str, Jogo] = {jogo.jogo_id: jogo for jogo in jogos}
+        self.versao = next(_versoes)
+        self._derivados: Dict[Any, Any] = {}
+        self._respostas: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock_respostas = threading.Lock()
+        self.materializados: Dict[str, Any] = {}
+
+    @property
+    def total_datados(self) -> int:
+        """Quantidade de jogos com data válida (prefixo de `jogos`)."""
+        return len(self.inicios)
+
+    @property
+    def ultimo_inicio(self) -> Optional[datetime]:
+        """Data do último jogo do snapshot."""
+        return self.inicios[-1] if self.inicios else None
+
+    def obter(self, jogo_id: str) -> Optional[Jogo]:
+        """Busca um jogo pelo jogo_id (None se não existir)."""
+        return self.por_id.get(jogo_id)
+
+    def indice_apos(self, momento: datetime) -> int:
+        """Posição do primeiro jogo que começa depois de `momento`."""
+        return bisect_right(self.inicios, momento)
+
+    def intervalo(self, inicio: datetime, fim: datetime) -> Tuple[int, int]:
+        """
+        Posições dos jogos com `inicio < data <= fim`.
+
+        Returns:
+            Tupla (posição inicial, posição final exclusiva)
+        """
+        return bisect_right(self.inicios, inicio), bisect_right(self.inicios, fim)
+
+    def derivado(self, chave: Any, fabrica: Callable[[], Any]) -> Any:
+        """
+        Retorna uma estrutura derivada, calculando-a na primeira vez.
+
+        Só para chaves fixas (não vindas do cliente): não há limite de
+        entradas. Respostas por parâmetros do cliente usam `resposta`.
+
+        Args:
+            chave: Identificador da estrutura
+            fabrica: Função que calcula a estrutura
+
+        Returns:
+            Estrutura derivada memorizada para esta versão
+        """
+        try:
+            return self._derivados[chave]
+        except KeyError:
+            pass
+        versao = self.versao
+        valor = fabrica()
+        # Alterado durante o cálculo (marcação em outra thread): não memoriza
+        if self.versao == versao:
+            self._derivados[chave] = valor
+        return valor
+
+    def resposta(self, chave: Any, fabrica: Callable[[], Any]) -> Any:
+        """
+        Retorna um corpo pré-renderizado, renderizando-o na primeira vez.
+
+        Guarda até MAX_RESPOSTAS corpos por versão; acima disso sai o menos
+        usado recentemente.
+
+        Args:
+            chave: Identificador da resposta (deve incluir todos os parâmetros)
+            fabrica: Função que renderiza o corpo
+
+        Returns:
+            Corpo memorizado para esta versão
+        """
+        with self._lock_respostas:
+            if chave in self._respostas:
+                self._respostas.move_to_end(chave)
+                return self._respostas[chave]
+        versao = self.versao
+        corpo = fabrica()
+        # Alterado durante o cálculo (marcação em outra thread): não memoriza
+        if self.versao == versao:
+            with self._lock_respostas:
+                self._respostas[chave] = corpo
+                self._respostas.move_to_end(chave)
+                while len(self._respostas) > MAX_RESPOSTAS:
+                    self._respostas.popitem(last=False)
+        return corpo
+
+    def invalidar(self):
+        """Marca o snapshot como alterado (nova versão, derivados e respostas descartados)."""
+        self.versao = next(_versoes)
+        self._derivados.clear()
+        with self._lock_respostas:
+            self._respostas.clear()
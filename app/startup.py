@@ -0,0 +1,91 @@
+"""
+Relatório de tempo de inicialização da aplicação.
+
+Mede quanto tempo cada módulo leva para ser importado, quando a aplicação
+ficou pronta e quanto tempo levou até a primeira requisição ser atendida.
+Útil no deploy Docker, onde o container reinicia com frequência.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Referência de início: momento em que este módulo foi importado
+# (é o primeiro import feito por app.main)
+_INICIO = time.perf_counter()
+_INICIADO_EM = datetime.now()
+
+_imports_ms: Dict[str, float] = {}
+_pronto_ms: Optional[float] = None
+_primeira_requisicao_ms: Optional[float] = None
+_primeira_requisicao_rota: Optional[str] = None
+
+
+def _decorrido_ms() -> float:
+    return round((time.perf_counter() - _INICIO) * 1000, 2)
+
+
+@contextmanager
+def medir_import(nome: str):
+    """
+    Mede o tempo de import de um módulo.
+
+    Uso:
+        with medir_import("app.routes"):
+            from app.routes.calendario import router
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _imports_ms[nome] = round((time.perf_counter() - inicio) * 1000, 2)
+
+
+def registrar_pronto():
+    """Registra o momento em que a aplicação terminou de iniciar."""
+    global _pronto_ms
+    if _pronto_ms is None:
+        _pronto_ms = _decorrido_ms()
+        logger.info(f"🚀 Aplicação pronta em {_pronto_ms:.0f}ms (imports: {_imports_ms})")
+
+
+def esta_pronto() -> bool:
+    """Indica se a aplicação terminou de iniciar (aquecimento concluído)."""
+    return _pronto_ms is not None
+
+
+def registrar_primeira_requisicao(rota: str):
+    """Registra a primeira requisição atendida após o start."""
+    global _primeira_requisicao_ms, _primeira_requisicao_rota
+    if _primeira_requisicao_ms is None:
+        _primeira_requisicao_ms = _decorrido_ms()
+        _primeira_requisicao_rota = rota
+        logger.info(
+            f"⏱️ Primeira requisição ({rota}) atendida {_primeira_requisicao_ms:.0f}ms após o start"
+        )
+
+
+def primeira_requisicao_registrada() -> bool:
+    """Indica se a primeira requisição já foi registrada."""
+    return _primeira_requisicao_ms is not None
+
+
+def obter_relatorio() -> Dict[str, Any]:
+    """
+    Retorna o relatório de inicialização.
+
+    Returns:
+        Dict com tempos de import por módulo, tempo até ficar pronto
+        e tempo até a primeira requisição
+    """
+    return {
+        "iniciado_em": _INICIADO_EM.isoformat(),
+        "imports_ms": dict(_imports_ms),
+        "imports_total_ms": round(sum(_imports_ms.values()), 2),
+        "pronto_ms": _pronto_ms,
+        "primeira_requisicao_ms": _primeira_requisicao_ms,
+        "primeira_requisicao_rota": _primeira_requisicao_rota,
+    }
@@ -0,0 +1,632 @@
+"""
+Armazenamento persistente dos jogos e do estado de sincronização.
+
+Três backends:
+- json: arquivo cache_jogos.json reescrito inteiro a cada alteração (padrão)
+- binario: arquivo cache_jogos.bin em colunas compactadas, com cabeçalho
+  de versão do formato; como só é escrito pela própria API, é carregado
+  sem revalidar os jogos
+- sqlite: banco SQLite em modo WAL, com índices por horário de início,
+  jogo_id e competição. Marcações viram UPDATE de uma linha.
+
+As buscas por período das rotas não leem o armazenamento: são atendidas
+pelo snapshot em memória (datas de início ordenadas, busca binária).
+
+Ao ativar os backends binario ou sqlite, o cache_jogos.json existente é
+migrado automaticamente na primeira inicialização (uma única vez) e
+renomeado para cache_jogos.json.migrado.
+
+Com vários workers, quem grava segura `bloqueio()` (lock de arquivo ao
+lado dos dados) enquanto relê, mescla e grava: uma gravação não apaga
+as marcações que outro processo acabou de gravar.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos (um worker só)
+    fcntl = None
+
+from app.config import get_settings
+from app.fuso_horario import DURACAO_JOGO
+from app.models import Jogo, gerar_jogo_id
+from app.snapshot import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Diretório de dados (volume Docker em /app/data)
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Caminho do arquivo de cache (backend json)
+CACHE_FILE = DATA_DIR / "cache_jogos.json"
+
+# Caminho padrão do banco SQLite (backend sqlite)
+SQLITE_FILE = DATA_DIR / "jogos.db"
+
+# Caminho do arquivo binário (backend binario)
+BINARIO_FILE = DATA_DIR / "cache_jogos.bin"
+
+# Cabeçalho do formato binário: assinatura, versão do formato e CRC32 do conteúdo
+ASSINATURA_BINARIO = b"SPFCJOGO"
+VERSAO_BINARIO = 1
+_CABECALHO = struct.Struct("<8sHI")
+
+# Campos do Jogo persistidos como colunas (fora jogo_id, que é a chave)
+CAMPOS_JOGO = [
+    "competicao",
+    "adversario",
+    "adversario_logo",
+    "data",
+    "dia_semana",
+    "horario",
+    "local",
+    "mandante",
+    "data_iso",
+    "data_fim_iso",
+    "criado_no_calendario",
+    "google_event_id",
+    "data_iso_anterior",
+]
+
+# Colunas do formato binário (jogo_id é guardado: pode diferir do hash dos dados)
+CAMPOS_BINARIO = [*CAMPOS_JOGO, "jogo_id"]
+
+# Estado de sincronização gravado por atualizar_status (SQLite)
+_SQL_STATUS = (
+    "UPDATE jogos SET criado_no_calendario = ?, google_event_id = ?, data_iso_anterior = ? "
+    "WHERE jogo_id = ?"
+)
+
+
+def _valores_status(jogo: Jogo) -> tuple:
+    return (int(jogo.criado_no_calendario), jogo.google_event_id, jogo.data_iso_anterior, jogo.jogo_id)
+
+
+class ArmazenamentoJogos:
+    """
+    Interface dos backends de armazenamento.
+
+    Os dados carregados têm o mesmo formato do cache JSON:
+    {"ultima_atualizacao": "<iso>", "jogos": [<dict do Jogo>, ...]}
+
+    Backends cujos arquivos só são escritos pela API incluem
+    "confiavel": True e as datas de início/fim já calculadas
+    ("inicio_epoch"/"fim_epoch"): os jogos são criados sem revalidação.
+    """
+
+    # Caminho exibido em /api/cache/status
+    caminho: Path
+
+    def revisao(self) -> Optional[int]:
+        """
+        Identificador barato da versão persistida (None se não houver dados).
+
+        Muda sempre que os dados são alterados, inclusive por outro processo.
+        """
+        raise NotImplementedError
+
+    def carregar(self) -> Optional[Dict[str, Any]]:
+        """Carrega todos os jogos (None se não houver dados)."""
+        raise NotImplementedError
+
+    def salvar(self, snapshot: Snapshot) -> bool:
+        """
+        Substitui todos os jogos pelos do snapshot.
+
+        Os métodos de escrita não propagam erros (são logados): retornam
+        False se nada foi gravado, para o chamador manter o que estava
+        pendente.
+        """
+        raise NotImplementedError
+
+    def atualizar_status(self, snapshot: Snapshot, jogo: Jogo) -> bool:
+        """Persiste o estado de sincronização de um único jogo."""
+        raise NotImplementedError
+
+    def atualizar_status_lote(self, snapshot: Snapshot, jogos: List[Jogo]) -> bool:
+        """
+        Persiste o estado de sincronização de vários jogos em uma escrita.
+
+        Backends de arquivo único reescrevem o snapshot inteiro uma vez: o
+        chamador garante (com `bloqueio()`) que o snapshot foi relido se
+        outro processo gravou desde a carga.
+        """
+        return self.salvar(snapshot)
+
+    def limpar(self):
+        """Remove todos os dados."""
+        raise NotImplementedError
+
+    @contextmanager
+    def bloqueio(self) -> Iterator[None]:
+        """
+        Exclusão entre processos para reler, mesclar e gravar.
+
+        Lock de arquivo (<caminho>.lock) segurado durante toda a operação;
+        não é reentrante: não aninhe dois `bloqueio()` no mesmo processo.
+        """
+        if fcntl is None:
+            yield
+            return
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.caminho.with_name(self.caminho.name + ".lock"), "a") as arquivo:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+
+
+class ArmazenamentoJSON(ArmazenamentoJogos):
+    """Backend legado: arquivo JSON único."""
+
+    def __init__(self, caminho: Path = CACHE_FILE):
+        self.caminho = caminho
+
+    def revisao(self) -> Optional[int]:
+        try:
+            return self.caminho.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def carregar(self) -> Optional[Dict[str, Any]]:
+        try:
+            if self.caminho.exists():
+                with open(self.caminho, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                    logger.info(f"Cache carregado do arquivo: {len(data.get('jogos', []))} jogos")
+                    return data
+        except Exception as e:
+            logger.error(f"Erro ao carregar cache do arquivo: {e}")
+        return None
+
+    def salvar(self, snapshot: Snapshot) -> bool:
+        try:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+
+            data = {
+                "ultima_atualizacao": snapshot.ultima_atualizacao.isoformat(),
+                "jogos": [jogo.model_dump() for jogo in snapshot.jogos]
+            }
+
+            # Arquivo temporário + rename: outro worker nunca lê o JSON pela metade
+            temporario = self.caminho.with_name(self.caminho.name + ".tmp")
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.caminho)
+
+            logger.info(f"Cache salvo em arquivo: {len(snapshot.jogos)} jogos")
+            return True
+
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache no arquivo: {e}")
+            return False
+
+    def atualizar_status(self, snapshot: Snapshot, jogo: Jogo) -> bool:
+        # O formato JSON não permite atualização parcial
+        return self.salvar(snapshot)
+
+    def limpar(self):
+        try:
+            if self.caminho.exists():
+                self.caminho.unlink()
+                logger.info("🗑️ Cache removido (arquivo deletado)")
+            else:
+                logger.info("📭 Nenhum cache para limpar")
+        except Exception as e:
+            logger.error(f"Erro ao limpar cache: {e}")
+
+
+def _diferencas(valores: List[Optional[int]]) -> List[Optional[int]]:
+    """Cada valor menos o anterior não nulo (inícios ordenados viram números pequenos)."""
+    anterior = 0
+    resultado = []
+    for valor in valores:
+        if valor is None:
+            resultado.append(None)
+        else:
+            resultado.append(valor - anterior)
+            anterior = valor
+    return resultado
+
+
+def _acumular(diferencas: List[Optional[int]]) -> List[Optional[int]]:
+    """Inverso de `_diferencas`."""
+    anterior = 0
+    resultado = []
+    for diferenca in diferencas:
+        if diferenca is None:
+            resultado.append(None)
+        else:
+            anterior += diferenca
+            resultado.append(anterior)
+    return resultado
+
+
+def codificar_binario(snapshot: Snapshot) -> bytes:
+    """
+    Serializa o snapshot no formato binário (uma coluna por campo do Jogo).
+
+    Layout: cabeçalho (assinatura, versão, CRC32) + JSON compacto das
+    colunas comprimido com zlib. Valores repetidos (competição,
+    adversário, local, escudo) ficam lado a lado e comprimem bem.
+    Início e fim já calculados vão junto: o início como diferença para o
+    jogo anterior e o fim só quando não for início + duração padrão.
+    """
+    colunas: Dict[str, List[Any]] = {campo: [] for campo in CAMPOS_BINARIO}
+    inicios, fins = [], []
+    for jogo in snapshot.jogos:
+        valores = jogo.__dict__
+        for campo in CAMPOS_BINARIO:
+            colunas[campo].append(valores[campo])
+        inicio, fim = jogo.inicio, jogo.fim
+        inicios.append(int(inicio.timestamp()) if inicio else None)
+        padrao = inicio is not None and fim == inicio + DURACAO_JOGO
+        fins.append(None if padrao or fim is None else int(fim.timestamp()))
+    conteudo = zlib.compress(json.dumps(
+        {
+            "ultima_atualizacao": snapshot.ultima_atualizacao.isoformat(),
+            "total": len(snapshot.jogos),
+            "colunas": colunas,
+            # Datas já calculadas: a carga não precisa parsear data/horário
+            "inicio_epoch": _diferencas(inicios),
+            "fim_epoch": fins,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8"))
+    return _CABECALHO.pack(ASSINATURA_BINARIO, VERSAO_BINARIO, zlib.crc32(conteudo)) + conteudo
+
+
+def decodificar_binario(dados: bytes) -> Dict[str, Any]:
+    """
+    Lê um arquivo no formato binário.
+
+    Returns:
+        Dados no formato do cache JSON, com "confiavel": True e as
+        listas "inicio_epoch"/"fim_epoch" (na ordem dos jogos)
+
+    Raises:
+        ValueError: Se a assinatura, a versão do formato ou o CRC não conferirem
+    """
+    if len(dados) < _CABECALHO.size:
+        raise ValueError("arquivo truncado")
+    assinatura, versao, crc = _CABECALHO.unpack_from(dados)
+    if assinatura != ASSINATURA_BINARIO:
+        raise ValueError("não é um cache binário da API")
+    if versao != VERSAO_BINARIO:
+        raise ValueError(f"versão {versao} do formato não suportada (esperada {VERSAO_BINARIO})")
+    conteudo = dados[_CABECALHO.size:]
+    if zlib.crc32(conteudo) != crc:
+        raise ValueError("CRC não confere (arquivo corrompido)")
+
+    payload = json.loads(zlib.decompress(conteudo))
+    colunas = payload["colunas"]
+    # Arquivos anteriores a uma coluna nova: valor padrão (jogo_id pelo hash)
+    if "jogo_id" not in colunas:
+        colunas["jogo_id"] = [
+            gerar_jogo_id(*valores)
+            for valores in zip(colunas["data"], colunas["horario"], colunas["adversario"], colunas["competicao"])
+        ]
+    for campo in CAMPOS_BINARIO:
+        colunas.setdefault(campo, [None] * payload["total"])
+    campos = CAMPOS_BINARIO
+    inicios = _acumular(payload["inicio_epoch"])
+    duracao = int(DURACAO_JOGO.total_seconds())
+    fins = [
+        fim if fim is not None else (inicio + duracao if inicio is not None else None)
+        for inicio, fim in zip(inicios, payload["fim_epoch"])
+    ]
+    return {
+        "ultima_atualizacao": payload["ultima_atualizacao"],
+        "jogos": [dict(zip(campos, valores)) for valores in zip(*(colunas[c] for c in campos))],
+        "inicio_epoch": inicios,
+        "fim_epoch": fins,
+        "confiavel": True,
+    }
+
+
+class ArmazenamentoBinario(ArmazenamentoJogos):
+    """Backend opcional (STORAGE_BACKEND=binario): arquivo binário em colunas, gravado de forma atômica."""
+
+    def __init__(self, caminho: Path = BINARIO_FILE, arquivo_legado: Optional[Path] = CACHE_FILE):
+        self.caminho = caminho
+        if arquivo_legado is not None:
+            self._migrar_json(arquivo_legado)
+
+    def _migrar_json(self, arquivo_legado: Path):
+        """Importa o cache_jogos.json se ainda não houver arquivo binário."""
+        if self.caminho.exists() or not arquivo_legado.exists():
+            return
+
+        data = ArmazenamentoJSON(arquivo_legado).carregar()
+        if not data:
+            return
+
+        # Import tardio: o scraper depende deste módulo
+        from app.scraper import _converter_cache_para_jogos, _criar_snapshot
+
+        snapshot = _criar_snapshot(_converter_cache_para_jogos(data), data.get("ultima_atualizacao"))
+        if not self.salvar(snapshot):
+            return
+
+        backup = arquivo_legado.with_suffix(".json.migrado")
+        arquivo_legado.rename(backup)
+        logger.info(f"📦 Cache JSON migrado para o formato binário: {len(snapshot.jogos)} jogos (backup em {backup.name})")
+
+    def revisao(self) -> Optional[int]:
+        try:
+            return self.caminho.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def carregar(self) -> Optional[Dict[str, Any]]:
+        try:
+            if self.caminho.exists():
+                data = decodificar_binario(self.caminho.read_bytes())
+                logger.info(f"Cache carregado do arquivo binário: {len(data['jogos'])} jogos")
+                return data
+        except Exception as e:
+            logger.error(f"Erro ao carregar cache binário: {e}")
+        return None
+
+    def salvar(self, snapshot: Snapshot) -> bool:
+        try:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            temporario = self.caminho.with_suffix(".tmp")
+            temporario.write_bytes(codificar_binario(snapshot))
+            os.replace(temporario, self.caminho)
+            logger.info(f"Cache salvo em arquivo binário: {len(snapshot.jogos)} jogos")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache binário: {e}")
+            return False
+
+    def atualizar_status(self, snapshot: Snapshot, jogo: Jogo) -> bool:
+        # O arquivo é reescrito inteiro (compacto: poucos KB)
+        return self.salvar(snapshot)
+
+    def limpar(self):
+        try:
+            if self.caminho.exists():
+                self.caminho.unlink()
+                logger.info("🗑️ Cache removido (arquivo deletado)")
+            else:
+                logger.info("📭 Nenhum cache para limpar")
+        except Exception as e:
+            logger.error(f"Erro ao limpar cache: {e}")
+
+
+def ler_arquivo_cache(caminho: Path) -> Optional[Dict[str, Any]]:
+    """
+    Lê um arquivo de cache pelo formato da extensão (.bin ou .json).
+
+    Returns:
+        Dados no formato do cache JSON (None se não existir ou for inválido)
+    """
+    if caminho.suffix == ".bin":
+        return ArmazenamentoBinario(caminho, arquivo_legado=None).carregar()
+    return ArmazenamentoJSON(caminho).carregar()
+
+
+class ArmazenamentoSQLite(ArmazenamentoJogos):
+    """
+    Backend SQLite (modo WAL).
+
+    Tabelas:
+    - jogos: uma linha por jogo, com inicio_epoch para buscas por intervalo
+    - meta: ultima_atualizacao, revisao e controle da migração
+    """
+
+    def __init__(self, caminho: Path = SQLITE_FILE, arquivo_legado: Optional[Path] = CACHE_FILE):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._criar_schema()
+        if arquivo_legado is not None:
+            self._migrar_json(arquivo_legado)
+
+    def _criar_schema(self):
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            colunas = ", ".join(
+                f"{campo} {'INTEGER' if campo in ('mandante', 'criado_no_calendario') else 'TEXT'}"
+                for campo in CAMPOS_JOGO
+            )
+            self._conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS jogos (
+                    jogo_id TEXT PRIMARY KEY,
+                    inicio_epoch INTEGER,
+                    {colunas}
+                );
+                CREATE INDEX IF NOT EXISTS idx_jogos_inicio ON jogos (inicio_epoch);
+                CREATE INDEX IF NOT EXISTS idx_jogos_competicao ON jogos (competicao, inicio_epoch);
+                CREATE TABLE IF NOT EXISTS meta (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT
+                );
+            """)
+            # Bancos criados antes de uma coluna nova
+            existentes = {linha["name"] for linha in self._conn.execute("PRAGMA table_info(jogos)")}
+            for campo in CAMPOS_JOGO:
+                if campo not in existentes:
+                    self._conn.execute(f"ALTER TABLE jogos ADD COLUMN {campo} TEXT")
+
+    def _meta(self, chave: str) -> Optional[str]:
+        linha = self._conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha["valor"] if linha else None
+
+    def _set_meta(self, chave: str, valor: str):
+        self._conn.execute(
+            "INSERT INTO meta (chave, valor) VALUES (?, ?) "
+            "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+            (chave, valor),
+        )
+
+    def _incrementar_revisao(self):
+        self._conn.execute(
+            "INSERT INTO meta (chave, valor) VALUES ('revisao', '1') "
+            "ON CONFLICT(chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"
+        )
+
+    def _migrar_json(self, arquivo_legado: Path):
+        """Importa o cache_jogos.json uma única vez."""
+        with self._lock:
+            if self._meta("migrado_de_json") is not None or not arquivo_legado.exists():
+                return
+
+        data = ArmazenamentoJSON(arquivo_legado).carregar()
+        if not data:
+            return
+
+        # Import tardio: o scraper depende deste módulo
+        from app.scraper import _converter_cache_para_jogos, _criar_snapshot
+
+        snapshot = _criar_snapshot(_converter_cache_para_jogos(data), data.get("ultima_atualizacao"))
+        gravou = self.salvar(snapshot)
+        with self._lock:
+            # Sem as linhas gravadas, o JSON fica onde está e a migração é
+            # tentada de novo no próximo start
+            gravados = self._conn.execute("SELECT COUNT(*) FROM jogos").fetchone()[0]
+            if not gravou or self._meta("ultima_atualizacao") is None or gravados != len(snapshot.por_id):
+                logger.error(
+                    f"❌ Migração do cache JSON para SQLite falhou ({gravados} de {len(snapshot.por_id)} jogos); "
+                    f"{arquivo_legado.name} mantido"
+                )
+                return
+            self._set_meta("migrado_de_json", datetime.now().isoformat())
+
+        backup = arquivo_legado.with_suffix(".json.migrado")
+        arquivo_legado.rename(backup)
+        logger.info(f"📦 Cache JSON migrado para SQLite: {len(snapshot.jogos)} jogos (backup em {backup.name})")
+
+    @staticmethod
+    def _linha(jogo: Jogo) -> tuple:
+        valores = jogo.model_dump(include=set(CAMPOS_JOGO))
+        return (
+            jogo.jogo_id,
+            jogo.inicio_epoch,
+            *(valores[campo] for campo in CAMPOS_JOGO),
+        )
+
+    @staticmethod
+    def _jogo_dict(linha: sqlite3.Row) -> Dict[str, Any]:
+        jogo = {campo: linha[campo] for campo in CAMPOS_JOGO}
+        jogo["jogo_id"] = linha["jogo_id"]
+        if jogo["mandante"] is not None:
+            jogo["mandante"] = bool(jogo["mandante"])
+        jogo["criado_no_calendario"] = bool(jogo["criado_no_calendario"])
+        return jogo
+
+    def revisao(self) -> Optional[int]:
+        with self._lock:
+            valor = self._meta("revisao")
+        return int(valor) if valor is not None else None
+
+    def carregar(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            ultima_atualizacao = self._meta("ultima_atualizacao")
+            if ultima_atualizacao is None:
+                return None
+            linhas = self._conn.execute(
+                "SELECT * FROM jogos ORDER BY inicio_epoch IS NULL, inicio_epoch"
+            ).fetchall()
+        logger.info(f"Cache carregado do SQLite: {len(linhas)} jogos")
+        return {
+            "ultima_atualizacao": ultima_atualizacao,
+            "jogos": [self._jogo_dict(linha) for linha in linhas],
+        }
+
+    def salvar(self, snapshot: Snapshot) -> bool:
+        linhas = [self._linha(jogo) for jogo in snapshot.jogos]
+        colunas = ", ".join(["jogo_id", "inicio_epoch", *CAMPOS_JOGO])
+        marcadores = ", ".join("?" * (len(CAMPOS_JOGO) + 2))
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute("DELETE FROM jogos")
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO jogos ({colunas}) VALUES ({marcadores})", linhas
+                    )
+                    self._set_meta("ultima_atualizacao", snapshot.ultima_atualizacao.isoformat())
+                    self._incrementar_revisao()
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            logger.info(f"Cache salvo no SQLite: {len(linhas)} jogos")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache no SQLite: {e}")
+            return False
+
+    def atualizar_status(self, snapshot: Snapshot, jogo: Jogo) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(_SQL_STATUS, _valores_status(jogo))
+                    self._incrementar_revisao()
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao atualizar jogo {jogo.jogo_id} no SQLite: {e}")
+            return False
+
+    def atualizar_status_lote(self, snapshot: Snapshot, jogos: List[Jogo]) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany(_SQL_STATUS, [_valores_status(j) for j in jogos])
+                    self._incrementar_revisao()
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao atualizar {len(jogos)} jogo(s) no SQLite: {e}")
+            return False
+
+    def limpar(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM jogos")
+            self._conn.execute("DELETE FROM meta WHERE chave = 'ultima_atualizacao'")
+            self._incrementar_revisao()
+            self._conn.execute("COMMIT")
+        logger.info("🗑️ Cache removido (tabela de jogos esvaziada)")
+
+
+@lru_cache()
+def get_armazenamento() -> ArmazenamentoJogos:
+    """Retorna o backend de armazenamento configurado (STORAGE_BACKEND)."""
+    settings = get_settings()
+    backend = settings.storage_backend.lower()
+    if backend == "sqlite":
+        caminho = Path(settings.sqlite_path) if settings.sqlite_path else SQLITE_FILE
+        return ArmazenamentoSQLite(caminho)
+    if backend == "binario":
+        return ArmazenamentoBinario()
+    if backend != "json":
+        logger.warning(f"STORAGE_BACKEND desconhecido '{settings.storage_backend}', usando json")
+    return ArmazenamentoJSON()
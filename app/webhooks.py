@@ -0,0 +1,359 @@
+"""
+Webhooks de mudanças nos jogos.
+
+Em vez de o n8n consultar a API periodicamente, assinaturas registradas
+recebem um POST quando algo muda:
+
+- jogo.adicionado: um scraping encontrou um jogo novo
+- jogo.reagendado: um jogo mudou de data/horário
+- jogo.removido: um jogo saiu do site
+- calendario.marcado / calendario.desmarcado: estado do Google Calendar mudou
+
+As assinaturas ficam em data/webhooks.json (volume Docker). A entrega é
+feita por uma tarefa em segundo plano: os eventos são agrupados em lotes,
+enviados fora do caminho da requisição e reenviados com backoff em caso
+de falha.
+"""
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import urllib.error
+import urllib.request
+
+from app.config import get_settings
+from app.execucao import executar_io
+from app.models import Jogo
+from app.snapshot import Snapshot
+from app.storage import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Arquivo das assinaturas (volume Docker em /app/data)
+WEBHOOKS_FILE = DATA_DIR / "webhooks.json"
+
+EVENTOS = (
+    "jogo.adicionado",
+    "jogo.reagendado",
+    "jogo.removido",
+    "calendario.marcado",
+    "calendario.desmarcado",
+)
+
+# Header com a assinatura HMAC-SHA256 do corpo (quando a assinatura tem segredo)
+HEADER_ASSINATURA = "X-SPFC-Assinatura"
+
+
+class RegistroWebhooks:
+    """Assinaturas de webhooks persistidas em JSON."""
+
+    def __init__(self, caminho: Path = WEBHOOKS_FILE):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._assinaturas: Optional[List[Dict[str, Any]]] = None
+
+    def _carregar(self) -> List[Dict[str, Any]]:
+        if self._assinaturas is None:
+            try:
+                with open(self.caminho, "r", encoding="utf-8") as f:
+                    self._assinaturas = json.load(f).get("assinaturas", [])
+            except FileNotFoundError:
+                self._assinaturas = []
+            except Exception as e:
+                logger.error(f"Erro ao ler webhooks: {e}")
+                self._assinaturas = []
+        return self._assinaturas
+
+    def _salvar(self):
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho.with_suffix(".tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"assinaturas": self._assinaturas}, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho)
+
+    def listar(self) -> List[Dict[str, Any]]:
+        """Lista as assinaturas registradas."""
+        with self._lock:
+            return [dict(a) for a in self._carregar()]
+
+    def adicionar(self, url: str, eventos: Optional[List[str]] = None, segredo: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Registra uma assinatura.
+
+        Args:
+            url: URL que receberá os POSTs
+            eventos: Eventos de interesse (vazio = todos)
+            segredo: Segredo para assinar o corpo (HMAC-SHA256)
+
+        Returns:
+            Assinatura criada
+        """
+        assinatura = {
+            "id": secrets.token_hex(6),
+            "url": url,
+            "eventos": sorted(set(eventos or [])),
+            "segredo": segredo,
+            "criado_em": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self._carregar().append(assinatura)
+            self._salvar()
+        logger.info(f"🪝 Webhook {assinatura['id']} registrado: {url}")
+        return dict(assinatura)
+
+    def remover(self, assinatura_id: str) -> bool:
+        """Remove uma assinatura (False se não existir)."""
+        with self._lock:
+            assinaturas = self._carregar()
+            restantes = [a for a in assinaturas if a["id"] != assinatura_id]
+            if len(restantes) == len(assinaturas):
+                return False
+            self._assinaturas = restantes
+            self._salvar()
+        logger.info(f"🗑️ Webhook {assinatura_id} removido")
+        return True
+
+    def obter(self, assinatura_id: str) -> Optional[Dict[str, Any]]:
+        """Busca uma assinatura pelo id."""
+        with self._lock:
+            for assinatura in self._carregar():
+                if assinatura["id"] == assinatura_id:
+                    return dict(assinatura)
+        return None
+
+
+def _evento(tipo: str, jogo: Jogo, **extras) -> Dict[str, Any]:
+    evento = {"tipo": tipo, "jogo_id": jogo.jogo_id, "jogo": jogo.model_dump(mode="json")}
+    evento.update(extras)
+    return evento
+
+
+def detectar_mudancas(anterior: Snapshot, atual: Snapshot) -> List[Dict[str, Any]]:
+    """
+    Compara dois snapshots e gera os eventos de jogos adicionados,
+    reagendados e removidos.
+
+    Reagendamentos reconhecidos no scraping (app.identidade) mantêm o
+    jogo_id e só mudam a data. Os demais aparecem como um jogo removido e
+    outro adicionado com o mesmo adversário e a mesma competição; esses
+    pares também viram um evento jogo.reagendado.
+
+    Args:
+        anterior: Snapshot antes do scraping
+        atual: Snapshot novo
+
+    Returns:
+        Lista de eventos
+    """
+    eventos = []
+    for jogo in atual.jogos:
+        antigo = anterior.por_id.get(jogo.jogo_id)
+        if antigo is not None and antigo.data_iso != jogo.data_iso:
+            eventos.append(_evento(
+                "jogo.reagendado",
+                jogo,
+                jogo_id_anterior=antigo.jogo_id,
+                data_iso_anterior=antigo.data_iso,
+            ))
+
+    removidos = [j for j in anterior.jogos if j.jogo_id not in atual.por_id]
+    adicionados = [j for j in atual.jogos if j.jogo_id not in anterior.por_id]
+
+    pendentes_remocao: Dict[Tuple[str, str], List[Jogo]] = defaultdict(list)
+    for jogo in removidos:
+        pendentes_remocao[(jogo.adversario, jogo.competicao)].append(jogo)
+
+    for jogo in adicionados:
+        candidatos = pendentes_remocao.get((jogo.adversario, jogo.competicao))
+        if candidatos:
+            antigo = candidatos.pop(0)
+            eventos.append(_evento(
+                "jogo.reagendado",
+                jogo,
+                jogo_id_anterior=antigo.jogo_id,
+                data_iso_anterior=antigo.data_iso,
+            ))
+        else:
+            eventos.append(_evento("jogo.adicionado", jogo))
+
+    for candidatos in pendentes_remocao.values():
+        for jogo in candidatos:
+            eventos.append(_evento("jogo.removido", jogo))
+
+    return eventos
+
+
+def evento_calendario(jogo: Jogo, marcado: bool, alvo: Optional[str] = None) -> Dict[str, Any]:
+    """Evento de mudança no estado do Google Calendar de um jogo (com o alvo, se não for o principal)."""
+    extras = {"alvo": alvo} if alvo else {}
+    return _evento("calendario.marcado" if marcado else "calendario.desmarcado", jogo, **extras)
+
+
+def assinar_corpo(corpo: bytes, segredo: str) -> str:
+    """Assinatura HMAC-SHA256 do corpo (header X-SPFC-Assinatura)."""
+    return "sha256=" + hmac.new(segredo.encode("utf-8"), corpo, hashlib.sha256).hexdigest()
+
+
+def _enviar(url: str, corpo: bytes, segredo: Optional[str], timeout: float) -> int:
+    """POST síncrono (executado no pool de I/O, app.execucao)."""
+    headers = {"Content-Type": "application/json; charset=utf-8", "User-Agent": "API-SPFC-Webhooks"}
+    if segredo:
+        headers[HEADER_ASSINATURA] = assinar_corpo(corpo, segredo)
+    requisicao = urllib.request.Request(url, data=corpo, headers=headers, method="POST")
+    with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+        return resposta.status
+
+
+class DespachanteWebhooks:
+    """
+    Entrega assíncrona dos eventos.
+
+    `publicar` só enfileira (pode ser chamado de qualquer thread); a tarefa
+    iniciada no lifespan agrupa os eventos por uma janela curta e envia um
+    lote por assinatura.
+    """
+
+    def __init__(self, registro: RegistroWebhooks):
+        self.registro = registro
+        self._pendentes: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sinal: Optional[asyncio.Event] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._entregas: set = set()
+
+    def publicar(self, eventos: Iterable[Dict[str, Any]]):
+        """Enfileira eventos para entrega (não bloqueia)."""
+        eventos = list(eventos)
+        if not eventos or not get_settings().webhooks_ativo:
+            return
+        agora = datetime.now().isoformat()
+        for evento in eventos:
+            evento.setdefault("ocorrido_em", agora)
+        with self._lock:
+            self._pendentes.extend(eventos)
+        if self._loop is not None and self._sinal is not None:
+            self._loop.call_soon_threadsafe(self._sinal.set)
+
+    def iniciar(self):
+        """Inicia a tarefa de entrega (chamado no lifespan)."""
+        self._loop = asyncio.get_running_loop()
+        self._sinal = asyncio.Event()
+        self._tarefa = asyncio.create_task(self._executar())
+        if self._pendentes:
+            self._sinal.set()
+
+    async def parar(self):
+        """
+        Envia o que estiver pendente e encerra a tarefa.
+
+        As entregas têm até WEBHOOKS_ESPERA_SHUTDOWN segundos: um destino
+        fora do ar (em retry com backoff) não segura o shutdown além do
+        prazo do Docker; o que restar é cancelado e registrado.
+        """
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+        await self._despachar()
+        if not self._entregas:
+            return
+        espera = get_settings().webhooks_espera_shutdown
+        _, restantes = await asyncio.wait(set(self._entregas), timeout=espera)
+        if not restantes:
+            return
+        for entrega in restantes:
+            entrega.cancel()
+        await asyncio.gather(*restantes, return_exceptions=True)
+        logger.warning(
+            f"⚠️ Shutdown: {len(restantes)} lote(s) de webhook descartado(s) (entrega não terminou em {espera}s)"
+        )
+
+    async def _executar(self):
+        settings = get_settings()
+        while True:
+            await self._sinal.wait()
+            # Janela curta para agrupar eventos do mesmo scraping/workflow
+            await asyncio.sleep(settings.webhooks_janela_lote)
+            self._sinal.clear()
+            await self._despachar()
+
+    async def _despachar(self):
+        with self._lock:
+            eventos, self._pendentes = self._pendentes, []
+        if not eventos:
+            return
+
+        assinaturas = await executar_io(self.registro.listar)
+        for assinatura in assinaturas:
+            filtro = set(assinatura.get("eventos") or [])
+            lote = [e for e in eventos if not filtro or e["tipo"] in filtro]
+            if lote:
+                self.agendar_entrega(assinatura, lote)
+
+    def agendar_entrega(self, assinatura: Dict[str, Any], eventos: List[Dict[str, Any]]):
+        """Agenda a entrega de um lote em segundo plano (chamar no event loop)."""
+        entrega = asyncio.create_task(self.entregar(assinatura, eventos))
+        self._entregas.add(entrega)
+        entrega.add_done_callback(self._entregas.discard)
+
+    async def entregar(self, assinatura: Dict[str, Any], eventos: List[Dict[str, Any]]) -> bool:
+        """
+        Envia um lote para uma assinatura, com retry e backoff exponencial.
+
+        Returns:
+            True se foi entregue
+        """
+        settings = get_settings()
+        corpo = json.dumps(
+            {"webhook_id": assinatura["id"], "enviado_em": datetime.now().isoformat(), "eventos": eventos},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        espera = 1.0
+        for tentativa in range(1, settings.webhooks_max_tentativas + 1):
+            try:
+                status = await executar_io(
+                    _enviar, assinatura["url"], corpo, assinatura.get("segredo"), settings.webhooks_timeout
+                )
+                logger.info(
+                    f"🪝 Webhook {assinatura['id']}: {len(eventos)} evento(s) entregue(s) (HTTP {status})"
+                )
+                return True
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                logger.warning(
+                    f"⚠️ Webhook {assinatura['id']} tentativa {tentativa}/{settings.webhooks_max_tentativas} falhou: {e}"
+                )
+            if tentativa < settings.webhooks_max_tentativas:
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, 60)
+
+        logger.error(f"❌ Webhook {assinatura['id']}: lote com {len(eventos)} evento(s) descartado")
+        return False
+
+
+@lru_cache()
+def get_despachante() -> DespachanteWebhooks:
+    """Retorna o despachante de webhooks (registro em data/webhooks.json)."""
+    return DespachanteWebhooks(RegistroWebhooks())
+
+
+def publicar(eventos: Iterable[Dict[str, Any]]):
+    """Enfileira eventos para os webhooks registrados (falhas não interrompem a requisição)."""
+    try:
+        get_despachante().publicar(eventos)
+    except Exception as e:
+        logger.error(f"Erro ao publicar eventos de webhook: {e}")
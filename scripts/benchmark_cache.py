@@ -0,0 +1,100 @@
+"""
+Benchmark dos formatos do cache de jogos.
+
+Compara o cache JSON legado (indentado, jogos revalidados ao carregar) com
+o formato binário (colunas compactadas, carga sem revalidação) em
+tamanho de arquivo, tempo de gravação e tempo de carga até os objetos
+Jogo prontos.
+
+Uso:
+    python scripts/benchmark_cache.py [--jogos 1000 --jogos 10000] [--repeticoes 5]
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from app.models import Jogo  # noqa: E402
+from app.scraper import _converter_cache_para_jogos, _criar_snapshot  # noqa: E402
+from app.snapshot import Snapshot  # noqa: E402
+from app.storage import ArmazenamentoBinario, ArmazenamentoJSON  # noqa: E402
+
+ADVERSARIOS = ["Palmeiras", "Corinthians", "Santos", "Flamengo", "Grêmio", "Internacional", "Bahia", "Fortaleza"]
+COMPETICOES = ["Brasileirão", "Copa do Brasil", "Libertadores", "Paulistão"]
+
+
+def gerar_jogos(total: int, rng: random.Random) -> Snapshot:
+    """Snapshot sintético com `total` jogos (um a cada ~3 dias)."""
+    inicio = datetime(2026, 1, 10, 16, 0)
+    jogos = []
+    for i in range(total):
+        data = inicio + timedelta(days=3 * i, hours=rng.choice((0, 3, 5)))
+        adversario = rng.choice(ADVERSARIOS)
+        jogos.append(Jogo(
+            competicao=f"{rng.choice(COMPETICOES)} {data.year}",
+            adversario=adversario,
+            adversario_logo=f"https://cdn.saopaulofc.net/escudos/{adversario.lower()}.png",
+            data=data.strftime("%d/%m/%Y"),
+            dia_semana="Domingo",
+            horario=data.strftime("%H:%M"),
+            local=rng.choice(["MorumBIS", "Allianz Parque", "Neo Química Arena", "Maracanã"]),
+            mandante=rng.random() < 0.5,
+            criado_no_calendario=rng.random() < 0.3,
+        ))
+    return _criar_snapshot(jogos, datetime.now().isoformat())
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Mediana do tempo de `funcao` em milissegundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def comparar(total: int, repeticoes: int, diretorio: Path):
+    snapshot = gerar_jogos(total, random.Random(total))
+    backends = {
+        "json": ArmazenamentoJSON(diretorio / f"cache_{total}.json"),
+        "binario": ArmazenamentoBinario(diretorio / f"cache_{total}.bin", arquivo_legado=None),
+    }
+    resultados = {}
+    for nome, backend in backends.items():
+        gravar = medir(lambda: backend.salvar(snapshot), repeticoes)
+        carregar = medir(lambda: _converter_cache_para_jogos(backend.carregar()), repeticoes)
+        resultados[nome] = (backend.caminho.stat().st_size, gravar, carregar)
+
+    print(f"\n{total} jogos")
+    print(f"  {'formato':<8} {'tamanho':>12} {'gravar':>10} {'carregar':>10}")
+    for nome, (tamanho, gravar, carregar) in resultados.items():
+        print(f"  {nome:<8} {tamanho / 1024:>9.1f} KB {gravar:>7.1f} ms {carregar:>7.1f} ms")
+    (tamanho_json, _, carga_json), (tamanho_bin, _, carga_bin) = resultados["json"], resultados["binario"]
+    print(f"  binário: {tamanho_json / tamanho_bin:.1f}x menor, carga {carga_json / carga_bin:.1f}x mais rápida")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jogos", type=int, action="append", help="Quantidade de jogos (repetível)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    # Logs de cada gravação/carga atrapalham a leitura do resultado
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for total in args.jogos or [1000, 10000]:
+            comparar(total, args.repeticoes, Path(diretorio))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark de inicialização da API.
+
+Mede, em processos novos (como num restart do container):
+- tempo de `import app.main`
+- tempo até o /health responder com o uvicorn rodando
+- se o SDK do Firecrawl foi importado no start (não deveria)
+
+Uso:
+    python scripts/benchmark_startup.py [--repeticoes 5] [--porta 8011]
+"""
+from pathlib import Path
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+CODIGO_IMPORT = (
+    "import time, sys;"
+    "t = time.perf_counter();"
+    "import app.main;"
+    "print(time.perf_counter() - t);"
+    "print('firecrawl' in sys.modules)"
+)
+
+
+def medir_import() -> tuple[float, bool]:
+    """Mede o tempo de import de app.main em um processo novo."""
+    saida = subprocess.run(
+        [sys.executable, "-c", CODIGO_IMPORT],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(saida[0]), saida[1] == "True"
+
+
+def medir_ate_pronto(porta: int, timeout: float = 30.0) -> float:
+    """Sobe o uvicorn e mede o tempo até o /health responder."""
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - inicio < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{porta}/health", timeout=1):
+                    return time.perf_counter() - inicio
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("A API não respondeu dentro do timeout")
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--porta", type=int, default=8011)
+    args = parser.parse_args()
+
+    tempos_import = []
+    firecrawl_no_start = False
+    for _ in range(args.repeticoes):
+        tempo, firecrawl_importado = medir_import()
+        tempos_import.append(tempo)
+        firecrawl_no_start = firecrawl_no_start or firecrawl_importado
+
+    tempos_pronto = [medir_ate_pronto(args.porta) for _ in range(args.repeticoes)]
+
+    print(f"import app.main   mediana {statistics.median(tempos_import) * 1000:8.1f}ms  "
+          f"min {min(tempos_import) * 1000:8.1f}ms")
+    print(f"até /health ok    mediana {statistics.median(tempos_pronto) * 1000:8.1f}ms  "
+          f"min {min(tempos_pronto) * 1000:8.1f}ms")
+    print(f"Firecrawl importado no start: {'SIM' if firecrawl_no_start else 'não'}")
+
+
+if __name__ == "__main__":
+    main()
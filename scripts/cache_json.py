@@ -0,0 +1,75 @@
+"""
+Exporta/importa o cache de jogos em JSON legível.
+
+Com STORAGE_BACKEND=binario, o cache (data/cache_jogos.bin) é binário; use
+este script para inspecionar ou editar os jogos à mão. A importação valida todos os jogos
+antes de gravar o arquivo binário.
+
+Uso:
+    python scripts/cache_json.py exportar [--origem data/cache_jogos.bin] [--saida jogos.json]
+    python scripts/cache_json.py importar jogos.json [--destino data/cache_jogos.bin]
+"""
+from pathlib import Path
+import argparse
+import json
+import sys
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from app.scraper import _converter_cache_para_jogos, _criar_snapshot  # noqa: E402
+from app.storage import BINARIO_FILE, ArmazenamentoBinario, ler_arquivo_cache  # noqa: E402
+
+
+def exportar(origem: Path, saida: Path | None):
+    """Grava o cache em JSON indentado (stdout se `saida` for None)."""
+    dados = ler_arquivo_cache(origem)
+    if dados is None:
+        sys.exit(f"Cache não encontrado ou inválido: {origem}")
+    for chave in ("confiavel", "inicio_epoch", "fim_epoch"):
+        dados.pop(chave, None)
+    texto = json.dumps(dados, ensure_ascii=False, indent=2)
+    if saida is None:
+        print(texto)
+    else:
+        saida.write_text(texto + "\n", encoding="utf-8")
+        print(f"{len(dados['jogos'])} jogos exportados para {saida}")
+
+
+def importar(entrada: Path, destino: Path):
+    """Valida os jogos de um JSON e grava o cache binário."""
+    with open(entrada, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    # Jogos de um arquivo editado à mão sempre passam pela validação
+    dados.pop("confiavel", None)
+    total = len(dados.get("jogos", []))
+    jogos = _converter_cache_para_jogos(dados)
+    if len(jogos) != total:
+        sys.exit(f"{total - len(jogos)} jogo(s) inválido(s) em {entrada}; nada foi gravado")
+    ArmazenamentoBinario(destino, arquivo_legado=None).salvar(
+        _criar_snapshot(jogos, dados.get("ultima_atualizacao"))
+    )
+    print(f"{len(jogos)} jogos importados para {destino}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_exportar = comandos.add_parser("exportar", help="Cache (.bin/.json) -> JSON legível")
+    parser_exportar.add_argument("--origem", type=Path, default=BINARIO_FILE)
+    parser_exportar.add_argument("--saida", type=Path, help="Arquivo de saída (padrão: stdout)")
+
+    parser_importar = comandos.add_parser("importar", help="JSON -> cache binário (com validação)")
+    parser_importar.add_argument("entrada", type=Path)
+    parser_importar.add_argument("--destino", type=Path, default=BINARIO_FILE)
+
+    args = parser.parse_args()
+    if args.comando == "exportar":
+        exportar(args.origem, args.saida)
+    else:
+        importar(args.entrada, args.destino)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+"""
+Simulador de temporada para comparar políticas de atualização do cache.
+
+Reproduz uma temporada de capturas do site contra um relógio virtual, com
+um Firecrawl falso (latência e falhas configuráveis, sem rede) e uma carga
+sintética de requisições. Para cada política informa:
+
+- créditos gastos e scrapings por motivo
+- janelas de dados desatualizados (tempo em que a API servia algo
+  diferente do site)
+- latência de atualização vista pelos clientes (requisições que esperaram
+  um scraping)
+- reagendamentos perdidos (a API só soube depois do horário do jogo)
+
+A temporada pode vir de capturas gravadas (um diretório de arquivos no
+formato do cache_jogos.json, com `ultima_atualizacao` = momento da
+captura) ou ser gerada a partir de um cache, com reagendamentos e jogos
+publicados aos poucos.
+
+Uso:
+    python scripts/simular_politicas.py --cache data/cache_jogos.json
+    python scripts/simular_politicas.py --capturas capturas/ --politica ultimo_jogo \\
+        --politica rodada --politica "rodada:horas_antes_jogo=3,orcamento_creditos=500"
+
+    # Gravar a temporada sintética (para editar e reproduzir depois)
+    python scripts/simular_politicas.py --cache data/cache_jogos.json --salvar-capturas capturas/
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import argparse
+import bisect
+import json
+import random
+import statistics
+import sys
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from app.fuso_horario import localizar  # noqa: E402
+from app.models import Jogo  # noqa: E402
+from app.refresh_policy import PoliticaAtualizacao, RegistroCreditos, criar_politica  # noqa: E402
+from app.scraper import _criar_snapshot  # noqa: E402
+from app.snapshot import Snapshot  # noqa: E402
+from app.storage import ler_arquivo_cache  # noqa: E402
+from app.webhooks import detectar_mudancas  # noqa: E402
+
+
+# =============================================================================
+# Temporada (estado do site ao longo do tempo)
+# =============================================================================
+
+@dataclass
+class Captura:
+    """Estado do site a partir de um momento."""
+
+    em: datetime
+    jogos: List[Jogo]
+    snapshot: Optional[Snapshot] = None
+
+    def __post_init__(self):
+        self.snapshot = _criar_snapshot(self.jogos, self.em.isoformat())
+
+    @property
+    def assinatura(self) -> FrozenSet[Tuple[str, Optional[str]]]:
+        """Conteúdo comparável (jogo_id já inclui data, horário e adversário)."""
+        return frozenset((jogo.jogo_id, jogo.local) for jogo in self.jogos)
+
+
+class Temporada:
+    """Capturas ordenadas; `em(t)` devolve o que o site mostrava em t."""
+
+    def __init__(self, capturas: List[Captura]):
+        if not capturas:
+            raise ValueError("Temporada sem capturas")
+        self.capturas = sorted(capturas, key=lambda c: c.em)
+        self._momentos = [c.em for c in self.capturas]
+
+    @property
+    def inicio(self) -> datetime:
+        return self.capturas[0].em
+
+    @property
+    def fim(self) -> datetime:
+        ultima = self.capturas[-1]
+        if not ultima.jogos:
+            # Site vazio no fim da temporada: nada mais a simular
+            return ultima.em
+        ultimo = max((j.fim for j in ultima.jogos if j.fim), default=ultima.em)
+        return max(ultimo, ultima.em) + timedelta(days=1)
+
+    def em(self, momento: datetime) -> Captura:
+        posicao = bisect.bisect_right(self._momentos, momento) - 1
+        return self.capturas[max(posicao, 0)]
+
+    def reagendamentos(self) -> List[Dict[str, Any]]:
+        """Reagendamentos entre capturas consecutivas (mesmo critério dos webhooks)."""
+        encontrados = []
+        for anterior, atual in zip(self.capturas, self.capturas[1:]):
+            for evento in detectar_mudancas(anterior.snapshot, atual.snapshot):
+                if evento["tipo"] != "jogo.reagendado":
+                    continue
+                antigo = anterior.snapshot.obter(evento["jogo_id_anterior"])
+                novo = atual.snapshot.obter(evento["jogo_id"])
+                prazos = [d for d in (antigo.inicio, novo.inicio) if d is not None]
+                encontrados.append({
+                    "anunciado_em": atual.em,
+                    "jogo_id": novo.jogo_id,
+                    "adversario": novo.adversario,
+                    "prazo": min(prazos) if prazos else atual.em,
+                })
+        return encontrados
+
+
+def carregar_capturas(diretorio: Path) -> Temporada:
+    """Lê capturas gravadas (arquivos *.json no formato do cache_jogos.json)."""
+    capturas = []
+    for arquivo in sorted(diretorio.glob("*.json")):
+        with open(arquivo, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        capturas.append(Captura(
+            em=localizar(datetime.fromisoformat(dados["ultima_atualizacao"])),
+            jogos=[Jogo(**j) for j in dados.get("jogos", [])],
+        ))
+    return Temporada(capturas)
+
+
+def _reagendar(jogo: Jogo, novo_inicio: datetime) -> Jogo:
+    fim = novo_inicio + (jogo.fim - jogo.inicio)
+    return Jogo(**{
+        **jogo.model_dump(exclude={"jogo_id"}),
+        "data": novo_inicio.strftime("%d/%m/%Y"),
+        "horario": novo_inicio.strftime("%H:%M"),
+        "data_iso": novo_inicio.isoformat(timespec="seconds"),
+        "data_fim_iso": fim.isoformat(timespec="seconds"),
+    })
+
+
+def gerar_temporada(
+    jogos: List[Jogo],
+    rng: random.Random,
+    prob_reagendamento: float = 0.15,
+    horizonte_dias: int = 90,
+    dias_apos_jogo: int = 7,
+) -> Temporada:
+    """
+    Gera uma temporada sintética a partir dos jogos de um cache.
+
+    O site publica cada jogo `horizonte_dias` antes, tira do ar
+    `dias_apos_jogo` depois e, com probabilidade `prob_reagendamento`,
+    anuncia um novo horário entre 1 e 10 dias antes do jogo.
+
+    Returns:
+        Temporada com uma captura a cada mudança do site
+    """
+    datados = [j for j in jogos if j.inicio is not None]
+    if not datados:
+        raise ValueError("O cache não tem jogos com data")
+
+    versoes = []  # (jogo original, anúncio do reagendamento, jogo reagendado)
+    for jogo in datados:
+        if rng.random() < prob_reagendamento:
+            anuncio = jogo.inicio - timedelta(days=rng.uniform(1, 10))
+            deslocamento = rng.choice([timedelta(hours=rng.choice([-3, -2, 2, 3]))]
+                                      + [timedelta(days=rng.choice([-2, -1, 1, 2, 3]))])
+            versoes.append((jogo, anuncio, _reagendar(jogo, jogo.inicio + deslocamento)))
+        else:
+            versoes.append((jogo, None, None))
+
+    def estado(momento: datetime) -> List[Jogo]:
+        visiveis = []
+        for original, anuncio, reagendado in versoes:
+            atual = reagendado if anuncio is not None and momento >= anuncio else original
+            if original.inicio - timedelta(days=horizonte_dias) <= momento <= atual.fim + timedelta(days=dias_apos_jogo):
+                visiveis.append(atual)
+        return visiveis
+
+    inicio = min(j.inicio for j in datados) - timedelta(days=horizonte_dias)
+    mudancas = {inicio}
+    for original, anuncio, reagendado in versoes:
+        mudancas.add(original.inicio - timedelta(days=horizonte_dias))
+        mudancas.add((reagendado or original).fim + timedelta(days=dias_apos_jogo, seconds=1))
+        if anuncio is not None:
+            mudancas.add(anuncio)
+
+    capturas = []
+    anterior = None
+    for momento in sorted(m for m in mudancas if m >= inicio):
+        jogos_visiveis = estado(momento)
+        chave = tuple(j.jogo_id for j in jogos_visiveis)
+        if chave != anterior:
+            capturas.append(Captura(em=momento, jogos=jogos_visiveis))
+            anterior = chave
+    return Temporada(capturas)
+
+
+def salvar_capturas(temporada: Temporada, diretorio: Path):
+    """Grava as capturas no formato do cache_jogos.json (uma por arquivo)."""
+    diretorio.mkdir(parents=True, exist_ok=True)
+    for numero, captura in enumerate(temporada.capturas, start=1):
+        with open(diretorio / f"{numero:04d}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "ultima_atualizacao": captura.em.isoformat(),
+                "jogos": [j.model_dump(mode="json", exclude={"jogo_id"}, context={"logos_originais": True}) for j in captura.jogos],
+            }, f, ensure_ascii=False, indent=2)
+
+
+# =============================================================================
+# Firecrawl falso e carga de requisições
+# =============================================================================
+
+class FirecrawlFalso:
+    """
+    Responde com o estado da temporada no momento do scraping.
+
+    Cada tentativa leva `latencia` segundos (± 50%) e falha com
+    probabilidade `prob_falha`; falhas esperam `intervalo_retry` e tentam de
+    novo até `max_tentativas` (como o retry do scraper). Só scrapings bem
+    sucedidos gastam créditos.
+    """
+
+    def __init__(
+        self,
+        temporada: Temporada,
+        rng: random.Random,
+        latencia: float = 8.0,
+        prob_falha: float = 0.05,
+        max_tentativas: int = 3,
+        intervalo_retry: float = 5.0,
+    ):
+        self.temporada = temporada
+        self.rng = rng
+        self.latencia = latencia
+        self.prob_falha = prob_falha
+        self.max_tentativas = max_tentativas
+        self.intervalo_retry = intervalo_retry
+
+    def scrape(self, momento: datetime) -> Tuple[Optional[Captura], float]:
+        """
+        Returns:
+            Tupla (captura ou None se todas as tentativas falharam, segundos gastos)
+        """
+        duracao = 0.0
+        for tentativa in range(1, self.max_tentativas + 1):
+            duracao += self.latencia * self.rng.uniform(0.5, 1.5)
+            if self.rng.random() >= self.prob_falha:
+                return self.temporada.em(momento + timedelta(seconds=duracao)), duracao
+            if tentativa < self.max_tentativas:
+                duracao += self.intervalo_retry
+        return None, duracao
+
+
+def gerar_requisicoes(
+    temporada: Temporada,
+    rng: random.Random,
+    intervalo_polling_min: float = 30,
+    requisicoes_por_hora: float = 0.5,
+    pico_antes_jogo_horas: float = 3,
+    requisicoes_por_hora_pico: float = 6,
+) -> List[datetime]:
+    """
+    Carga sintética: polling do n8n em intervalo fixo, requisições avulsas
+    (Poisson) e um pico nas horas antes de cada jogo.
+    """
+    inicio, fim = temporada.inicio, temporada.fim
+    momentos = []
+
+    if intervalo_polling_min > 0:
+        momento = inicio
+        while momento < fim:
+            momentos.append(momento)
+            momento += timedelta(minutes=intervalo_polling_min)
+
+    def poisson(de: datetime, ate: datetime, por_hora: float):
+        if por_hora <= 0:
+            return
+        momento = de
+        while True:
+            momento += timedelta(hours=rng.expovariate(por_hora))
+            if momento >= ate:
+                return
+            momentos.append(momento)
+
+    poisson(inicio, fim, requisicoes_por_hora)
+    inicios = {j.inicio for c in temporada.capturas for j in c.jogos if j.inicio}
+    for kickoff in inicios:
+        poisson(kickoff - timedelta(hours=pico_antes_jogo_horas), kickoff, requisicoes_por_hora_pico)
+
+    return sorted(m for m in momentos if inicio <= m < fim)
+
+
+# =============================================================================
+# Simulação
+# =============================================================================
+
+@dataclass
+class Resultado:
+    nome: str
+    creditos: int = 0
+    scrapings_por_motivo: Dict[str, int] = field(default_factory=dict)
+    falhas: int = 0
+    requisicoes: int = 0
+    latencias: List[float] = field(default_factory=list)
+    janelas_desatualizado: List[float] = field(default_factory=list)
+    reagendamentos: int = 0
+    reagendamentos_perdidos: int = 0
+    atrasos_deteccao: List[float] = field(default_factory=list)
+
+    def resumo(self) -> Dict[str, Any]:
+        esperas = [l for l in self.latencias if l > 0]
+        ordenadas = sorted(self.latencias) or [0.0]
+
+        def percentil(p: float) -> float:
+            return ordenadas[min(int(p * len(ordenadas)), len(ordenadas) - 1)]
+
+        return {
+            "politica": self.nome,
+            "creditos": self.creditos,
+            "scrapings": sum(self.scrapings_por_motivo.values()),
+            "scrapings_por_motivo": self.scrapings_por_motivo,
+            "scrapings_falhos": self.falhas,
+            "requisicoes": self.requisicoes,
+            "requisicoes_com_espera": len(esperas),
+            "latencia_p50_s": round(percentil(0.50), 2),
+            "latencia_p95_s": round(percentil(0.95), 2),
+            "latencia_p99_s": round(percentil(0.99), 2),
+            "latencia_max_s": round(max(self.latencias, default=0.0), 2),
+            "horas_desatualizado": round(sum(self.janelas_desatualizado) / 3600, 2),
+            "janelas_desatualizado": len(self.janelas_desatualizado),
+            "maior_janela_h": round(max(self.janelas_desatualizado, default=0.0) / 3600, 2),
+            "reagendamentos": self.reagendamentos,
+            "reagendamentos_perdidos": self.reagendamentos_perdidos,
+            "atraso_medio_deteccao_h": (
+                round(statistics.mean(self.atrasos_deteccao) / 3600, 2) if self.atrasos_deteccao else None
+            ),
+        }
+
+
+def simular(
+    nome: str,
+    politica: PoliticaAtualizacao,
+    temporada: Temporada,
+    requisicoes: List[datetime],
+    firecrawl: FirecrawlFalso,
+    single_flight: bool = False,
+) -> Resultado:
+    """
+    Reproduz a temporada para uma política.
+
+    O cache começa com a primeira captura. Cada requisição aplica a
+    política ao snapshot servido naquele instante; como no scraper, sem
+    `single_flight` requisições que chegam durante um scraping decidem
+    sobre o snapshot antigo (e podem disparar outro scraping).
+
+    Returns:
+        Resultado com as métricas
+    """
+    resultado = Resultado(nome=nome, requisicoes=len(requisicoes))
+    registro = RegistroCreditos()
+
+    servido = temporada.capturas[0]
+    # Quando o conteúdo servido muda: (momento, assinatura, jogo_ids)
+    linha_servida = [(temporada.inicio, servido.assinatura, set(servido.snapshot.por_id))]
+    pendentes: List[Tuple[datetime, Captura]] = []  # scrapings em andamento (fim, captura)
+
+    def concluir_ate(momento: datetime):
+        nonlocal servido
+        pendentes.sort(key=lambda p: p[0])
+        while pendentes and pendentes[0][0] <= momento:
+            fim, captura = pendentes.pop(0)
+            # Snapshot como o scraper gravaria: ultima_atualizacao = fim do scraping
+            captura = Captura(em=fim, jogos=captura.jogos)
+            servido = captura
+            linha_servida.append((fim, captura.assinatura, set(captura.snapshot.por_id)))
+
+    for momento in requisicoes:
+        concluir_ate(momento)
+
+        if single_flight and pendentes:
+            resultado.latencias.append((pendentes[0][0] - momento).total_seconds())
+            continue
+
+        decisao = politica.decidir(servido.snapshot, momento, registro)
+        if not decisao.atualizar:
+            resultado.latencias.append(0.0)
+            continue
+
+        captura, duracao = firecrawl.scrape(momento)
+        resultado.latencias.append(duracao)
+        fim = momento + timedelta(seconds=duracao)
+        if captura is None:
+            # Todas as tentativas falharam: o scraper devolve o cache antigo
+            resultado.falhas += 1
+            continue
+        registro.registrar(politica.creditos_por_scrape, decisao.motivo, fim)
+        resultado.creditos += politica.creditos_por_scrape
+        resultado.scrapings_por_motivo[decisao.motivo] = resultado.scrapings_por_motivo.get(decisao.motivo, 0) + 1
+        pendentes.append((fim, captura))
+
+    concluir_ate(temporada.fim)
+
+    # Janelas em que o conteúdo servido diferia do site
+    eventos = sorted(
+        [(c.em, "site", c.assinatura) for c in temporada.capturas]
+        + [(em, "api", assinatura) for em, assinatura, _ in linha_servida],
+        key=lambda e: e[0],
+    )
+    site = api = None
+    inicio_janela = None
+    for momento, origem, assinatura in eventos:
+        if origem == "site":
+            site = assinatura
+        else:
+            api = assinatura
+        if site != api and inicio_janela is None:
+            inicio_janela = momento
+        elif site == api and inicio_janela is not None:
+            resultado.janelas_desatualizado.append((momento - inicio_janela).total_seconds())
+            inicio_janela = None
+    if inicio_janela is not None:
+        resultado.janelas_desatualizado.append((temporada.fim - inicio_janela).total_seconds())
+
+    # Reagendamentos: quando a API passou a servir o novo horário
+    for reagendamento in temporada.reagendamentos():
+        resultado.reagendamentos += 1
+        detectado = next(
+            (em for em, _, ids in linha_servida
+             if em >= reagendamento["anunciado_em"] and reagendamento["jogo_id"] in ids),
+            None,
+        )
+        if detectado is None or detectado > reagendamento["prazo"]:
+            resultado.reagendamentos_perdidos += 1
+        if detectado is not None:
+            resultado.atrasos_deteccao.append((detectado - reagendamento["anunciado_em"]).total_seconds())
+
+    return resultado
+
+
+def parse_politica(especificacao: str, creditos_por_scrape: int) -> Tuple[str, PoliticaAtualizacao]:
+    """
+    Converte "nome" ou "nome:param=valor,param=valor" em uma política.
+
+    Raises:
+        ValueError: Se a política ou um parâmetro forem inválidos
+    """
+    nome, _, parametros = especificacao.partition(":")
+    valores: Dict[str, Any] = {"creditos_por_scrape": creditos_por_scrape}
+    for item in filter(None, parametros.split(",")):
+        chave, _, valor = item.partition("=")
+        valores[chave.strip()] = float(valor) if "." in valor else int(valor)
+    try:
+        return especificacao, criar_politica(nome.strip(), **valores)
+    except TypeError as e:
+        raise ValueError(f"Parâmetro inválido em '{especificacao}': {e}")
+
+
+COLUNAS = (
+    ("creditos", "créditos"),
+    ("scrapings", "scrapings"),
+    ("scrapings_falhos", "scrapings falhos"),
+    ("requisicoes_com_espera", "requisições com espera"),
+    ("latencia_p95_s", "latência p95 (s)"),
+    ("latencia_max_s", "latência máx (s)"),
+    ("horas_desatualizado", "horas desatualizado"),
+    ("janelas_desatualizado", "janelas desatualizado"),
+    ("maior_janela_h", "maior janela (h)"),
+    ("reagendamentos_perdidos", "reagendamentos perdidos"),
+    ("atraso_medio_deteccao_h", "atraso médio detecção (h)"),
+)
+
+
+def imprimir_tabela(resumos: List[Dict[str, Any]], temporada: Temporada, total_requisicoes: int):
+    print(
+        f"Temporada: {temporada.inicio:%d/%m/%Y} a {temporada.fim:%d/%m/%Y}, "
+        f"{len(temporada.capturas)} captura(s), {resumos[0]['reagendamentos']} reagendamento(s), "
+        f"{total_requisicoes} requisição(ões)\n"
+    )
+    largura_rotulo = max(len(rotulo) for _, rotulo in COLUNAS)
+    larguras = [max(len(r["politica"]), 10) for r in resumos]
+    print(" " * largura_rotulo + "  " + "  ".join(r["politica"].rjust(l) for r, l in zip(resumos, larguras)))
+    for chave, rotulo in COLUNAS:
+        valores = ["-" if r[chave] is None else str(r[chave]) for r in resumos]
+        print(rotulo.ljust(largura_rotulo) + "  " + "  ".join(v.rjust(l) for v, l in zip(valores, larguras)))
+    print()
+    for resumo in resumos:
+        motivos = ", ".join(f"{m}={n}" for m, n in sorted(resumo["scrapings_por_motivo"].items())) or "-"
+        print(f"{resumo['politica']}: {motivos}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    origem = parser.add_mutually_exclusive_group()
+    origem.add_argument("--capturas", type=Path, help="Diretório com capturas gravadas (*.json)")
+    origem.add_argument("--cache", type=Path, default=RAIZ / "data" / "cache_jogos.json",
+                        help="Cache base (.bin ou .json) para gerar uma temporada sintética")
+    parser.add_argument("--politica", action="append",
+                        help='Política a comparar, ex: "rodada:horas_antes_jogo=3" (repetível)')
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prob-reagendamento", type=float, default=0.15)
+    parser.add_argument("--horizonte-dias", type=int, default=90, help="Dias antes do jogo em que ele aparece no site")
+    parser.add_argument("--creditos-por-scrape", type=int, default=87)
+    parser.add_argument("--latencia", type=float, default=8.0, help="Latência média do Firecrawl em segundos")
+    parser.add_argument("--prob-falha", type=float, default=0.05)
+    parser.add_argument("--intervalo-polling", type=float, default=30, help="Minutos entre consultas do n8n (0 = sem)")
+    parser.add_argument("--requisicoes-por-hora", type=float, default=0.5)
+    parser.add_argument("--requisicoes-por-hora-pico", type=float, default=6,
+                        help="Requisições por hora nas 3h antes de cada jogo")
+    parser.add_argument("--single-flight", action="store_true",
+                        help="Requisições durante um scraping esperam por ele em vez de disparar outro")
+    parser.add_argument("--salvar-capturas", type=Path, help="Grava a temporada usada neste diretório")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.capturas:
+        temporada = carregar_capturas(args.capturas)
+    else:
+        dados = ler_arquivo_cache(args.cache)
+        if dados is None:
+            parser.error(f"Cache não encontrado ou inválido: {args.cache}")
+        jogos = [Jogo(**j) for j in dados.get("jogos", [])]
+        temporada = gerar_temporada(jogos, rng, args.prob_reagendamento, args.horizonte_dias)
+
+    if args.salvar_capturas:
+        salvar_capturas(temporada, args.salvar_capturas)
+
+    requisicoes = gerar_requisicoes(
+        temporada, rng,
+        intervalo_polling_min=args.intervalo_polling,
+        requisicoes_por_hora=args.requisicoes_por_hora,
+        requisicoes_por_hora_pico=args.requisicoes_por_hora_pico,
+    )
+
+    resumos = []
+    for especificacao in args.politica or ["ultimo_jogo", "rodada"]:
+        nome, politica = parse_politica(especificacao, args.creditos_por_scrape)
+        # Mesma sequência de latências/falhas para todas as políticas
+        firecrawl = FirecrawlFalso(temporada, random.Random(args.seed), args.latencia, args.prob_falha)
+        resultado = simular(nome, politica, temporada, requisicoes, firecrawl, args.single_flight)
+        resumos.append(resultado.resumo())
+
+    if args.json:
+        print(json.dumps(resumos, ensure_ascii=False, indent=2))
+    else:
+        imprimir_tabela(resumos, temporada, len(requisicoes))
+
+
+if __name__ == "__main__":
+    main()
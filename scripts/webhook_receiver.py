@@ -0,0 +1,66 @@
+"""
+Receptor local de webhooks para testes.
+
+Sobe um servidor HTTP que imprime cada lote recebido e, com --segredo,
+confere a assinatura X-SPFC-Assinatura.
+
+Uso:
+    python scripts/webhook_receiver.py --porta 9000 --segredo meu-segredo
+
+    # Em outro terminal, registrar o receptor na API:
+    curl -X POST http://localhost:8001/api/webhooks \\
+      -H "Authorization: Bearer SUA_API_KEY" -H "Content-Type: application/json" \\
+      -d '{"url": "http://localhost:9000/", "segredo": "meu-segredo"}'
+
+Com --falhar N, as N primeiras entregas respondem 500 (para testar o retry).
+"""
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import argparse
+import hashlib
+import hmac
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receptor local de webhooks da API SPFC")
+    parser.add_argument("--porta", type=int, default=9000)
+    parser.add_argument("--segredo", default=None, help="Segredo do webhook (confere a assinatura)")
+    parser.add_argument("--falhar", type=int, default=0, help="Responder 500 às N primeiras entregas")
+    args = parser.parse_args()
+
+    falhas_restantes = [args.falhar]
+
+    class Receptor(BaseHTTPRequestHandler):
+        def do_POST(self):
+            corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            if falhas_restantes[0] > 0:
+                falhas_restantes[0] -= 1
+                print(f"✖ Entrega recusada de propósito ({falhas_restantes[0]} restante(s))")
+                self.send_response(500)
+                self.end_headers()
+                return
+
+            if args.segredo:
+                esperado = "sha256=" + hmac.new(args.segredo.encode(), corpo, hashlib.sha256).hexdigest()
+                valida = hmac.compare_digest(esperado, self.headers.get("X-SPFC-Assinatura", ""))
+                print(f"Assinatura {'válida' if valida else 'INVÁLIDA'}")
+
+            lote = json.loads(corpo)
+            print(f"📨 Lote do webhook {lote.get('webhook_id')}: {len(lote.get('eventos', []))} evento(s)")
+            for evento in lote.get("eventos", []):
+                jogo = evento.get("jogo") or {}
+                print(f"   - {evento['tipo']}: {jogo.get('adversario', '')} {jogo.get('data_iso', '')}")
+
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"Aguardando webhooks em http://localhost:{args.porta}/")
+    HTTPServer(("", args.porta), Receptor).serve_forever()
+
+
+if __name__ == "__main__":
+    main()